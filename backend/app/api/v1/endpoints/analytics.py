@@ -0,0 +1,73 @@
+from typing import Optional
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_session
+from app.core.deps import get_tenant_vacancy, require_roles
+from app.models.user import User, UserRole
+from app.models.vacancy import Vacancy
+from app.services.analytics_service import AnalyticsService
+
+router = APIRouter()
+
+# Dashboards are for directors; admins keep access for support
+analytics_user = require_roles(UserRole.HR_DIRECTOR, UserRole.ADMIN)
+
+
+async def _read(method, *args, **kwargs):
+    try:
+        return await method(*args, **kwargs)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+
+@router.get("/vacancies/{vacancy_id}/funnel")
+async def get_funnel(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(analytics_user),
+    vacancy: Vacancy = Depends(get_tenant_vacancy),
+):
+    """Stage entries and conversion rates for a vacancy"""
+    return await _read(AnalyticsService.funnel, session, vacancy.id, date_from, date_to)
+
+
+@router.get("/vacancies/{vacancy_id}/time-in-stage")
+async def get_time_in_stage(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(analytics_user),
+    vacancy: Vacancy = Depends(get_tenant_vacancy),
+):
+    """Mean and median time candidates spend in each stage"""
+    return await _read(AnalyticsService.time_in_stage, session, vacancy.id, date_from, date_to)
+
+
+@router.get("/vacancies/{vacancy_id}/daily")
+async def get_daily_movements(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(analytics_user),
+    vacancy: Vacancy = Depends(get_tenant_vacancy),
+):
+    """Stage entries per day for time-series charts"""
+    return await _read(AnalyticsService.daily, session, vacancy.id, date_from, date_to)
+
+
+@router.get("/sources")
+async def get_sources(
+    vacancy_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(analytics_user),
+):
+    """Applications and offers per candidate source"""
+    return await _read(AnalyticsService.sources, session, current_user.organization_id, vacancy_id, date_from, date_to)
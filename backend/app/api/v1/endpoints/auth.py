@@ -12,12 +12,20 @@ from app.core.security import (
     decode_token,
 )
 from app.core.config import settings
-from app.models.user import User, UserCreate, UserRead
+from app.models.organization import Organization
+from app.models.user import User, UserRead, UserRole
 from pydantic import BaseModel
 
 router = APIRouter()
 
 
+class RegisterRequest(BaseModel):
+    email: str
+    password: str
+    full_name: str
+    organization_name: str
+
+
 class LoginRequest(BaseModel):
     email: str
     password: str
@@ -36,10 +44,13 @@ class RefreshRequest(BaseModel):
 
 @router.post("/register", response_model=UserRead)
 async def register(
-    user_data: UserCreate,
+    user_data: RegisterRequest,
     session: AsyncSession = Depends(get_session),
 ):
-    """Register new user"""
+    """Register a new organization with its first user as admin
+
+    Further users are added by the organization's admins.
+    """
     # Check if user exists
     result = await session.execute(
         select(User).where(User.email == user_data.email)
@@ -52,12 +63,17 @@ async def register(
             detail="Email already registered",
         )
     
+    organization = Organization(name=user_data.organization_name)
+    session.add(organization)
+    await session.flush()
+    
     # Create user
     user = User(
         email=user_data.email,
         hashed_password=get_password_hash(user_data.password),
         full_name=user_data.full_name,
-        role=user_data.role,
+        organization_id=organization.id,
+        role=UserRole.ADMIN,
     )
     
     session.add(user)
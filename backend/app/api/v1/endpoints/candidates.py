@@ -1,20 +1,28 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status, UploadFile, File, Form
 from sqlmodel import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import response_cache, vacancy_scope
 from app.core.database import get_session
-from app.core.deps import get_current_user
+from app.core.responses import RowsResponse
+from app.core.sse import sse_response
+from app.core.config import settings
+from app.core.task_queue import Lane, task_queue
+from app.core.deps import ensure_tenant_vacancy, get_current_user, get_tenant_candidate
 from app.models.user import User
 from app.models.candidate import (
     Candidate,
     CandidateCreate,
     CandidateRead,
     CandidateUpdate,
-    Resume,
 )
+from app.models.resume import Resume
 from app.services.storage_service import StorageService
+from app.services.analytics_service import AnalyticsService
+from app.services.stage_service import StageService
 from app.services.resume_parser import ResumeParser
+from app.services.processing_status import processing_status
 from app.tasks.resume_tasks import process_resume_task
 
 router = APIRouter()
@@ -31,7 +39,7 @@ async def get_candidates(
     current_user: User = Depends(get_current_user),
 ):
     """Get all candidates with filters"""
-    query = select(Candidate)
+    query = select(Candidate).where(Candidate.organization_id == current_user.organization_id)
     
     if vacancy_id:
         query = query.where(Candidate.vacancy_id == vacancy_id)
@@ -42,9 +50,8 @@ async def get_candidates(
     
     query = query.offset(skip).limit(limit).order_by(Candidate.match_score.desc())
     result = await session.execute(query)
-    candidates = result.scalars().all()
     
-    return candidates
+    return RowsResponse(CandidateRead, result.scalars().all())
 
 
 @router.post("", response_model=CandidateRead)
@@ -54,26 +61,38 @@ async def create_candidate(
     current_user: User = Depends(get_current_user),
 ):
     """Create new candidate"""
+    await ensure_tenant_vacancy(session, candidate_data.vacancy_id, current_user.organization_id)
+    
     candidate = Candidate(
         **candidate_data.model_dump(),
-        user_id=current_user.id,
+        organization_id=current_user.organization_id,
+        uploaded_by=current_user.id,
     )
     
     session.add(candidate)
+    await AnalyticsService.record_application(session, candidate)
+    await StageService.start(session, candidate, moved_by=current_user.id)
     await session.commit()
     await session.refresh(candidate)
+    await response_cache.invalidate(vacancy_scope(candidate.vacancy_id))
     
     return candidate
 
 
 @router.post("/upload")
 async def upload_resume(
+    background_tasks: BackgroundTasks,
     vacancy_id: int = Form(...),
     file: UploadFile = File(...),
+    batch: Optional[str] = Form(None, max_length=64),
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ):
-    """Upload resume and create candidate"""
+    """Upload resume and create candidate
+    
+    Files of one multi-file upload share a client-chosen `batch` ID; its
+    progress is available from /processing/status and /processing/stream.
+    """
     # Validate file type
     allowed_types = ["application/pdf", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"]
     if file.content_type not in allowed_types:
@@ -82,14 +101,18 @@ async def upload_resume(
             detail="Only PDF and DOCX files are allowed",
         )
     
+    await ensure_tenant_vacancy(session, vacancy_id, current_user.organization_id)
+    
     # Create candidate
     candidate = Candidate(
         full_name="Parsing...",
+        organization_id=current_user.organization_id,
         vacancy_id=vacancy_id,
-        user_id=current_user.id,
-        current_stage="new",
+        uploaded_by=current_user.id,
     )
     session.add(candidate)
+    await AnalyticsService.record_application(session, candidate)
+    await StageService.start(session, candidate, moved_by=current_user.id)
     await session.commit()
     await session.refresh(candidate)
     
@@ -105,68 +128,90 @@ async def upload_resume(
     # Create resume record
     resume = Resume(
         candidate_id=candidate.id,
-        file_name=file.filename,
+        filename=file.filename,
         file_path=file_path,
-        file_type=file.content_type,
+        mime_type=file.content_type,
         file_size=len(file_content),
-        parse_status="pending",
+        upload_batch=batch,
     )
     session.add(resume)
     await session.commit()
     await session.refresh(resume)
+    await response_cache.invalidate(vacancy_scope(vacancy_id))
     
-    # Queue background task for parsing
-    # In production, use RQ: process_resume_task.delay(resume.id)
-    # For MVP, we'll parse synchronously (can be optimized later)
+    # Interactive lane: ahead of imports and backfill; without the queue,
+    # process in the background of this request
+    if await task_queue.enqueue("process_resume", [resume.id], Lane.INTERACTIVE) is None:
+        background_tasks.add_task(process_resume_task, resume.id)
     
     return {
         "candidate_id": candidate.id,
         "resume_id": resume.id,
+        "batch": batch,
         "status": "processing",
         "message": "Resume uploaded and queued for processing",
     }
 
 
+def _tracked(batch: Optional[str], candidate_ids: Optional[List[int]]) -> None:
+    """Status requests track either one upload batch or a list of candidates"""
+    if (batch is None) == (not candidate_ids):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Pass either batch or candidate_ids",
+        )
+    if candidate_ids and len(candidate_ids) > settings.PROCESSING_STATUS_MAX_CANDIDATES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.PROCESSING_STATUS_MAX_CANDIDATES} candidate_ids; use an upload batch",
+        )
+
+
+@router.get("/processing/status")
+async def get_processing_status(
+    batch: Optional[str] = Query(None, max_length=64),
+    candidate_ids: Optional[List[int]] = Query(None),
+    current_user: User = Depends(get_current_user),
+):
+    """Processing progress of an upload batch or of candidates: counts per
+    status and one compact item per candidate"""
+    _tracked(batch, candidate_ids)
+    return await processing_status.summary(current_user.organization_id, candidate_ids, batch)
+
+
+@router.get("/processing/stream")
+async def stream_processing_status(
+    batch: Optional[str] = Query(None, max_length=64),
+    candidate_ids: Optional[List[int]] = Query(None),
+    current_user: User = Depends(get_current_user),
+):
+    """Server-sent processing status instead of polling each candidate
+    
+    `status` events carry the current state of every tracked candidate,
+    then each stage transition (parsing, screening, parsed / deferred /
+    error); `done` follows once all are final. Open it after the uploads
+    of a batch have returned.
+    """
+    _tracked(batch, candidate_ids)
+    return sse_response(processing_status.stream(current_user.organization_id, candidate_ids, batch))
+
+
 @router.get("/{candidate_id}", response_model=CandidateRead)
 async def get_candidate(
-    candidate_id: int,
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    candidate: Candidate = Depends(get_tenant_candidate),
 ):
     """Get candidate by ID"""
-    result = await session.execute(
-        select(Candidate).where(Candidate.id == candidate_id)
-    )
-    candidate = result.scalar_one_or_none()
-    
-    if not candidate:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Candidate not found",
-        )
-    
     return candidate
 
 
 @router.patch("/{candidate_id}", response_model=CandidateRead)
 async def update_candidate(
-    candidate_id: int,
     candidate_data: CandidateUpdate,
+    candidate: Candidate = Depends(get_tenant_candidate),
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ):
     """Update candidate"""
-    result = await session.execute(
-        select(Candidate).where(Candidate.id == candidate_id)
-    )
-    candidate = result.scalar_one_or_none()
-    
-    if not candidate:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Candidate not found",
-        )
-    
     update_data = candidate_data.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(candidate, key, value)
@@ -174,36 +219,33 @@ async def update_candidate(
     session.add(candidate)
     await session.commit()
     await session.refresh(candidate)
+    await response_cache.invalidate(vacancy_scope(candidate.vacancy_id))
     
     return candidate
 
 
 @router.post("/{candidate_id}/move-stage")
 async def move_candidate_stage(
-    candidate_id: int,
     stage: str,
     notes: Optional[str] = None,
+    candidate: Candidate = Depends(get_tenant_candidate),
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ):
     """Move candidate to different stage"""
-    result = await session.execute(
-        select(Candidate).where(Candidate.id == candidate_id)
+    await StageService.move(
+        session,
+        candidate,
+        stage,
+        moved_by=current_user.id,
+        notes=notes,
     )
-    candidate = result.scalar_one_or_none()
     
-    if not candidate:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Candidate not found",
-        )
-    
-    candidate.current_stage = stage
-    session.add(candidate)
     await session.commit()
+    await response_cache.invalidate(vacancy_scope(candidate.vacancy_id))
     
     return {
-        "candidate_id": candidate_id,
+        "candidate_id": candidate.id,
         "stage": stage,
         "message": "Candidate moved successfully",
     }
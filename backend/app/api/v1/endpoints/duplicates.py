@@ -0,0 +1,117 @@
+from typing import List, Optional
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlmodel import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import response_cache, vacancy_scope
+from app.core.database import get_session
+from app.core.responses import RowsResponse
+from app.core.deps import get_current_user
+from app.models.user import User
+from app.models.candidate import Candidate
+from app.models.duplicate import (
+    DuplicateCandidate,
+    DuplicateCandidateRead,
+    DuplicateStatus,
+)
+from app.services.dedup_service import DedupService
+
+router = APIRouter()
+
+
+async def _get_suggestion(
+    session: AsyncSession,
+    duplicate_id: int,
+    organization_id: int,
+) -> DuplicateCandidate:
+    result = await session.execute(
+        select(DuplicateCandidate)
+        .join(Candidate, Candidate.id == DuplicateCandidate.candidate_id)
+        .where(DuplicateCandidate.id == duplicate_id)
+        .where(Candidate.organization_id == organization_id)
+    )
+    suggestion = result.scalar_one_or_none()
+    
+    if not suggestion:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Duplicate suggestion not found",
+        )
+    
+    return suggestion
+
+
+@router.get("", response_model=List[DuplicateCandidateRead])
+async def get_duplicates(
+    vacancy_id: Optional[int] = None,
+    suggestion_status: DuplicateStatus = Query(DuplicateStatus.PENDING, alias="status"),
+    min_score: float = 0.0,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=500),
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """List merge suggestions, most confident first"""
+    query = (
+        select(DuplicateCandidate)
+        .join(Candidate, Candidate.id == DuplicateCandidate.candidate_id)
+        .where(Candidate.organization_id == current_user.organization_id)
+        .where(DuplicateCandidate.status == suggestion_status)
+        .where(DuplicateCandidate.score >= min_score)
+    )
+    
+    if vacancy_id:
+        query = query.where(Candidate.vacancy_id == vacancy_id)
+    
+    query = query.order_by(DuplicateCandidate.score.desc()).offset(skip).limit(limit)
+    result = await session.execute(query)
+    
+    return RowsResponse(DuplicateCandidateRead, result.scalars().all())
+
+
+@router.post("/{duplicate_id}/merge")
+async def merge_duplicate(
+    duplicate_id: int,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """Merge the duplicate application into the earlier one"""
+    suggestion = await _get_suggestion(session, duplicate_id, current_user.organization_id)
+    merged_id = suggestion.candidate_id
+    
+    try:
+        kept = await DedupService.merge(session, suggestion)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    
+    await session.commit()
+    await response_cache.invalidate(vacancy_scope(kept.vacancy_id))
+    
+    return {
+        "candidate_id": kept.id,
+        "merged_candidate_id": merged_id,
+        "message": "Candidates merged successfully",
+    }
+
+
+@router.post("/{duplicate_id}/dismiss", response_model=DuplicateCandidateRead)
+async def dismiss_duplicate(
+    duplicate_id: int,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """Mark suggestion as not a duplicate; it will not be suggested again"""
+    suggestion = await _get_suggestion(session, duplicate_id, current_user.organization_id)
+    
+    suggestion.status = DuplicateStatus.DISMISSED
+    suggestion.reviewed_by = current_user.id
+    suggestion.updated_at = datetime.utcnow()
+    session.add(suggestion)
+    await session.commit()
+    await session.refresh(suggestion)
+    
+    return suggestion
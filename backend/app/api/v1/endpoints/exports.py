@@ -0,0 +1,63 @@
+from typing import Optional
+from datetime import datetime
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+
+from app.core.deps import get_current_user
+from app.models.user import User
+from app.models.candidate import CandidateStatus
+from app.services.export_service import (
+    CANDIDATE_COLUMNS,
+    MEDIA_TYPES,
+    STAGE_HISTORY_COLUMNS,
+    ExportFormat,
+    ExportService,
+    candidates_query,
+    stage_history_query,
+)
+
+router = APIRouter()
+
+
+def _attachment(name: str, export_format: ExportFormat) -> dict:
+    filename = f"{name}_{datetime.utcnow():%Y%m%d_%H%M%S}.{export_format.value}"
+    return {"Content-Disposition": f'attachment; filename="{filename}"'}
+
+
+@router.get("/candidates")
+async def export_candidates(
+    vacancy_id: Optional[int] = None,
+    candidate_status: Optional[CandidateStatus] = Query(None, alias="status"),
+    export_format: ExportFormat = Query(ExportFormat.CSV, alias="format"),
+    current_user: User = Depends(get_current_user),
+):
+    """Stream candidates with current stage and latest stage move"""
+    name = f"candidates_vacancy_{vacancy_id}" if vacancy_id else "candidates"
+
+    return StreamingResponse(
+        ExportService.stream(
+            candidates_query(current_user.organization_id, vacancy_id, candidate_status),
+            CANDIDATE_COLUMNS,
+            export_format,
+        ),
+        media_type=MEDIA_TYPES[export_format],
+        headers=_attachment(name, export_format),
+    )
+
+
+@router.get("/pipeline/{vacancy_id}")
+async def export_pipeline_history(
+    vacancy_id: int,
+    export_format: ExportFormat = Query(ExportFormat.CSV, alias="format"),
+    current_user: User = Depends(get_current_user),
+):
+    """Stream full stage movement history for a vacancy"""
+    return StreamingResponse(
+        ExportService.stream(
+            stage_history_query(current_user.organization_id, vacancy_id),
+            STAGE_HISTORY_COLUMNS,
+            export_format,
+        ),
+        media_type=MEDIA_TYPES[export_format],
+        headers=_attachment(f"pipeline_vacancy_{vacancy_id}", export_format),
+    )
@@ -0,0 +1,70 @@
+import io
+from typing import Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, HTTPException, UploadFile, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import response_cache, vacancy_scope
+from app.core.database import get_session
+from app.core.deps import get_current_user
+from app.models.user import User
+from app.services.import_service import ImportFormat, ImportService, read_rows
+from app.tasks.import_tasks import dispatch_imported_resumes_task
+from app.tasks.analytics_tasks import rebuild_analytics_task
+
+router = APIRouter()
+
+
+@router.post("/candidates")
+async def import_candidates(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    source: str = Form(..., min_length=1, max_length=50),
+    import_format: Optional[ImportFormat] = Form(None, alias="format"),
+    vacancy_id: Optional[int] = Form(None),
+    enqueue: bool = Form(True),
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """Import candidates, resumes and stages from an ATS export (CSV or JSONL)
+
+    Rows are matched on (organization, source, external_id), so re-uploading the same
+    export updates candidates instead of duplicating them. With `enqueue`,
+    only resumes still missing text or embedding are processed afterwards.
+    """
+    if import_format is None:
+        name = (file.filename or "").lower()
+        import_format = ImportFormat.JSONL if name.endswith((".jsonl", ".ndjson")) else ImportFormat.CSV
+
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        report = await ImportService.import_candidates(
+            session,
+            read_rows(stream, import_format),
+            organization_id=current_user.organization_id,
+            source=source,
+            moved_by=current_user.id,
+            default_vacancy_id=vacancy_id,
+        )
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Import file must be UTF-8 encoded",
+        )
+    finally:
+        stream.detach()
+    await session.commit()
+    await response_cache.invalidate(*(vacancy_scope(vacancy_id) for vacancy_id in report["vacancy_ids"]))
+
+    to_parse = report.pop("resumes_to_parse")
+    to_embed = report.pop("resumes_to_embed")
+    report["resumes_to_parse"] = len(to_parse)
+    report["resumes_to_embed"] = len(to_embed)
+
+    # Imported stage history bypasses the incremental analytics updates
+    background_tasks.add_task(rebuild_analytics_task, report["vacancy_ids"])
+    
+    if enqueue and (to_parse or to_embed):
+        background_tasks.add_task(dispatch_imported_resumes_task, to_parse, to_embed)
+    report["enqueued"] = enqueue and bool(to_parse or to_embed)
+
+    return report
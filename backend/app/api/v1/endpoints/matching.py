@@ -1,17 +1,32 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
 from sqlmodel import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_session
-from app.core.deps import get_current_user
-from app.models.user import User
+from app.core.quotas import QuotaExceededError
+from app.core.responses import RowsResponse
+from app.core.sse import sse_event, sse_response
+from app.core.deps import get_current_user, get_tenant_candidate, get_tenant_vacancy, require_roles
+from app.models.user import User, UserRole
 from app.models.vacancy import Vacancy
 from app.models.candidate import Candidate
+from app.models.scoring_batch import ScoringBatch, ScoringBatchRead
+from app.models.talent_pool import TalentSuggestion, TalentSuggestionRead
+from app.services.ai_service import AIService
+from app.services.batch_scoring_service import BatchScoringService
+from app.services.screening_service import ScreeningService
+from app.services.skill_service import SkillService, normalize_skills, skill_overlap, skills_list
+from app.services.llm_errors import LLMError
+from app.services.usage_service import BudgetExceededError
+from app.tasks.talent_tasks import rediscover_talent_task
 from pydantic import BaseModel
 
 router = APIRouter()
 
+# Batch jobs spend the vacancy's AI budget in bulk
+batch_user = require_roles(UserRole.HR_DIRECTOR, UserRole.ADMIN)
+
 
 class MatchResult(BaseModel):
     candidate_id: int
@@ -23,31 +38,28 @@ class MatchResult(BaseModel):
     weaknesses: str = None
 
 
+class SkillMatchResult(BaseModel):
+    candidate_id: int
+    full_name: Optional[str] = None
+    skill_score: float
+    matched_skills: List[str]
+    missing_skills: List[str]
+
+
 @router.get("/vacancies/{vacancy_id}/matches", response_model=List[MatchResult])
 async def get_matches(
-    vacancy_id: int,
     min_score: float = 0.0,
     limit: int = 50,
+    vacancy: Vacancy = Depends(get_tenant_vacancy),
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ):
     """Get matched candidates for vacancy"""
-    # Verify vacancy exists
-    result = await session.execute(
-        select(Vacancy).where(Vacancy.id == vacancy_id)
-    )
-    vacancy = result.scalar_one_or_none()
-    
-    if not vacancy:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Vacancy not found",
-        )
-    
     # Get candidates sorted by match score
     result = await session.execute(
         select(Candidate)
-        .where(Candidate.vacancy_id == vacancy_id)
+        .where(Candidate.organization_id == vacancy.organization_id)
+        .where(Candidate.vacancy_id == vacancy.id)
         .where(Candidate.match_score >= min_score)
         .where(Candidate.status == "active")
         .order_by(Candidate.match_score.desc())
@@ -69,3 +81,211 @@ async def get_matches(
     ]
     
     return matches
+
+
+@router.get("/vacancies/{vacancy_id}/skill-matches", response_model=List[SkillMatchResult])
+async def get_skill_matches(
+    min_score: float = 0.0,
+    limit: int = Query(50, ge=1, le=500),
+    vacancy: Vacancy = Depends(get_tenant_vacancy),
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """Rank vacancy candidates by deterministic skill overlap (no LLM calls)"""
+    ranked = await SkillService.rank_by_overlap(
+        session, vacancy.organization_id, vacancy.skills, vacancy_id=vacancy.id, limit=limit
+    )
+    ranked = [r for r in ranked if r["score"] >= min_score]
+    if not ranked:
+        return []
+    
+    result = await session.execute(
+        select(Candidate).where(Candidate.id.in_([r["candidate_id"] for r in ranked]))
+    )
+    candidates = {c.id: c for c in result.scalars().all()}
+    
+    matches = []
+    for r in ranked:
+        candidate = candidates.get(r["candidate_id"])
+        if not candidate:
+            continue
+        overlap = skill_overlap(candidate.skills, vacancy.skills)
+        matches.append(
+            SkillMatchResult(
+                candidate_id=candidate.id,
+                full_name=candidate.full_name,
+                skill_score=overlap["score"],
+                matched_skills=overlap["matched"],
+                missing_skills=overlap["missing"],
+            )
+        )
+    
+    return matches
+
+
+@router.get("/skills/candidates")
+async def find_candidates_by_skills(
+    skills: List[str] = Query(..., min_length=1),
+    vacancy_id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """Find candidates having all of the given skills"""
+    candidate_ids = await SkillService.find_candidates_with_all(
+        session, current_user.organization_id, skills, vacancy_id=vacancy_id, limit=limit, offset=skip
+    )
+    
+    return {
+        "skills": normalize_skills(skills),
+        "candidate_ids": candidate_ids,
+    }
+
+
+@router.get("/vacancies/{vacancy_id}/talent-pool", response_model=List[TalentSuggestionRead])
+async def get_talent_pool(
+    min_score: float = 0.0,
+    limit: int = Query(50, ge=1, le=200),
+    vacancy: Vacancy = Depends(get_tenant_vacancy),
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """Past applicants of other vacancies ranked for this vacancy"""
+    result = await session.execute(
+        select(
+            TalentSuggestion.candidate_id,
+            TalentSuggestion.source_vacancy_id,
+            Candidate.full_name,
+            Candidate.email,
+            TalentSuggestion.score,
+            TalentSuggestion.semantic_similarity,
+            TalentSuggestion.skill_score,
+            TalentSuggestion.matched_skills,
+            TalentSuggestion.missing_skills,
+            TalentSuggestion.ai_match_score,
+            TalentSuggestion.ai_summary,
+        )
+        .join(Candidate, Candidate.id == TalentSuggestion.candidate_id)
+        .where(TalentSuggestion.vacancy_id == vacancy.id)
+        .where(TalentSuggestion.score >= min_score)
+        .order_by(TalentSuggestion.score.desc())
+        .limit(limit)
+    )
+    
+    return RowsResponse(TalentSuggestionRead, result.all())
+
+
+@router.post("/vacancies/{vacancy_id}/talent-pool/refresh")
+async def refresh_talent_pool(
+    background_tasks: BackgroundTasks,
+    vacancy: Vacancy = Depends(get_tenant_vacancy),
+    current_user: User = Depends(get_current_user),
+):
+    """Re-run talent rediscovery for the vacancy"""
+    background_tasks.add_task(rediscover_talent_task, vacancy.id)
+    
+    return {"vacancy_id": vacancy.id, "status": "queued"}
+
+
+@router.post("/vacancies/{vacancy_id}/candidates/{candidate_id}/score")
+async def score_candidate(
+    stream: bool = False,
+    vacancy: Vacancy = Depends(get_tenant_vacancy),
+    candidate: Candidate = Depends(get_tenant_candidate),
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """LLM match of a candidate (of this or another vacancy) against the vacancy
+
+    Scores the stored resume extraction, so the resume text is not sent
+    again. Stored on the candidate for its own vacancy, on the talent
+    pool suggestion otherwise.
+
+    With `stream` the answer is a server-sent event stream: `summary`
+    events with the analysis text as it is generated, then `done` with the
+    full result once it is stored (or `error`).
+    """
+    ai_service = AIService(
+        organization_id=vacancy.organization_id,
+        vacancy_id=vacancy.id,
+        candidate_id=candidate.id,
+        user_id=current_user.id,
+    )
+    try:
+        if not stream:
+            match = await ScreeningService.score_candidate(session, ai_service, candidate, vacancy)
+        else:
+            profile = await ScreeningService.candidate_profile(session, ai_service, candidate)
+            await session.commit()
+            chunks = await ai_service.stream_score_profile(
+                profile, vacancy.requirements or "", skills_list(vacancy.skills)
+            )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e),
+        )
+    except (QuotaExceededError, BudgetExceededError, LLMError) as e:
+        raise e.as_http()
+    
+    if not stream:
+        await ScreeningService.save_match(session, candidate, vacancy.id, match)
+        return {"candidate_id": candidate.id, "vacancy_id": vacancy.id, **match}
+    
+    async def events():
+        try:
+            async for event, data in ScreeningService.relay_match(candidate.id, vacancy.id, chunks):
+                yield sse_event(event, data)
+        except Exception as e:
+            # Headers are sent; report the failure in the stream
+            yield sse_event("error", {"detail": f"Failed to score candidate: {e}"})
+    
+    return sse_response(events())
+
+
+@router.post("/vacancies/{vacancy_id}/batch-scoring", response_model=ScoringBatchRead)
+async def submit_batch_scoring(
+    operation: str = Query("score", pattern="^(score|extract)$"),
+    vacancy: Vacancy = Depends(get_tenant_vacancy),
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(batch_user),
+):
+    """Re-score (or extract) all parsed candidates of the vacancy in an offline LLM batch
+
+    Results are applied when the batch completes; poll
+    GET /matching/batches/{batch_id}.
+    """
+    try:
+        return await BatchScoringService.submit(
+            session, vacancy, operation, user_id=current_user.id
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e),
+        )
+    except BudgetExceededError as e:
+        raise e.as_http()
+
+
+@router.get("/batches/{batch_id}", response_model=ScoringBatchRead)
+async def get_batch_scoring(
+    batch_id: int,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """Status of a scoring batch; applies its results if it has finished"""
+    result = await session.execute(
+        select(ScoringBatch)
+        .where(ScoringBatch.id == batch_id)
+        .where(ScoringBatch.organization_id == current_user.organization_id)
+    )
+    batch = result.scalar_one_or_none()
+    if not batch:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Batch not found",
+        )
+    
+    return await BatchScoringService.poll(session, batch)
@@ -0,0 +1,79 @@
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlmodel import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_session
+from app.core.deps import get_current_user, require_roles
+from app.core.quotas import tenant_quotas
+from app.core.responses import RowsResponse
+from app.core.security import get_password_hash
+from app.models.organization import Organization, OrganizationRead
+from app.models.user import User, UserCreate, UserRead, UserRole
+
+router = APIRouter()
+
+admin_user = require_roles(UserRole.ADMIN)
+
+
+@router.get("/me", response_model=OrganizationRead)
+async def get_my_organization(
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """Organization of the current user"""
+    return await session.get(Organization, current_user.organization_id)
+
+
+@router.get("/me/quotas")
+async def get_my_quotas(
+    current_user: User = Depends(get_current_user),
+):
+    """Effective quotas and current usage of the organization"""
+    return await tenant_quotas.usage(current_user.organization_id)
+
+
+@router.get("/me/users", response_model=List[UserRead])
+async def get_my_users(
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(admin_user),
+):
+    """Users of the organization"""
+    result = await session.execute(
+        select(User)
+        .where(User.organization_id == current_user.organization_id)
+        .order_by(User.id)
+    )
+
+    return RowsResponse(UserRead, result.scalars().all())
+
+
+@router.post("/me/users", response_model=UserRead)
+async def add_user(
+    user_data: UserCreate,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(admin_user),
+):
+    """Add a user to the organization"""
+    result = await session.execute(
+        select(User.id).where(User.email == user_data.email)
+    )
+    if result.scalar_one_or_none() is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered",
+        )
+
+    user = User(
+        email=user_data.email,
+        hashed_password=get_password_hash(user_data.password),
+        full_name=user_data.full_name,
+        organization_id=current_user.organization_id,
+        role=user_data.role,
+    )
+
+    session.add(user)
+    await session.commit()
+    await session.refresh(user)
+
+    return user
@@ -1,13 +1,15 @@
-from typing import List, Dict
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Dict, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlmodel import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import response_cache, vacancy_scope
 from app.core.database import get_session
-from app.core.deps import get_current_user
+from app.core.deps import ensure_tenant_vacancy, get_current_user
 from app.models.user import User
 from app.models.candidate import Candidate
-from app.models.pipeline import PipelineStage, CandidateStage, CandidateStageCreate
+from app.models.pipeline import PipelineStage, CandidateStageCreate, DEFAULT_STAGES
+from app.services.stage_service import StageService
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -20,53 +22,81 @@ class MoveCandidateRequest(BaseModel):
     notes: str = None
 
 
+@router.get("/stale")
+async def get_stale_candidates(
+    stage: str,
+    days: Optional[float] = Query(None, gt=0),
+    vacancy_id: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """Candidates stuck in a stage longer than `days` (default: the stage SLA)"""
+    try:
+        candidates = await StageService.stale_candidates(
+            session,
+            current_user.organization_id,
+            stage,
+            older_than_days=days,
+            vacancy_id=vacancy_id,
+            limit=limit,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    
+    return {"stage": stage, "candidates": candidates}
+
+
 @router.get("/{vacancy_id}")
 async def get_pipeline(
     vacancy_id: int,
+    request: Request,
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ):
     """Get pipeline with candidates grouped by stage"""
-    # Get all candidates for this vacancy
-    result = await session.execute(
-        select(Candidate)
-        .where(Candidate.vacancy_id == vacancy_id)
-        .where(Candidate.status == "active")
-        .order_by(Candidate.match_score.desc())
-    )
-    candidates = result.scalars().all()
-    
-    # Group by stage
-    pipeline = {
-        "new": [],
-        "selected": [],
-        "screening": [],
-        "interview": [],
-        "offer": [],
-    }
-    
-    for candidate in candidates:
-        stage = candidate.current_stage
-        if stage in pipeline:
-            pipeline[stage].append({
-                "id": candidate.id,
-                "full_name": candidate.full_name,
-                "email": candidate.email,
-                "match_score": candidate.match_score,
-                "skills": candidate.skills,
-                "experience_years": candidate.experience_years,
-            })
+    async def build():
+        await ensure_tenant_vacancy(session, vacancy_id, current_user.organization_id)
+        
+        # Get all candidates for this vacancy
+        result = await session.execute(
+            select(Candidate)
+            .where(Candidate.organization_id == current_user.organization_id)
+            .where(Candidate.vacancy_id == vacancy_id)
+            .where(Candidate.status == "active")
+            .order_by(Candidate.match_score.desc())
+        )
+        candidates = result.scalars().all()
+        
+        # Group by stage
+        pipeline = {slug: [] for slug, _ in DEFAULT_STAGES}
+        
+        for candidate in candidates:
+            stage = candidate.current_stage
+            if stage in pipeline:
+                pipeline[stage].append({
+                    "id": candidate.id,
+                    "full_name": candidate.full_name,
+                    "email": candidate.email,
+                    "match_score": candidate.match_score,
+                    "skills": candidate.skills,
+                    "experience_years": candidate.experience_years,
+                })
+        
+        return {
+            "vacancy_id": vacancy_id,
+            "stages": [
+                {"name": name, "slug": slug, "candidates": pipeline[slug]}
+                for slug, name in DEFAULT_STAGES
+            ],
+        }
     
-    return {
-        "vacancy_id": vacancy_id,
-        "stages": [
-            {"name": "Новые", "slug": "new", "candidates": pipeline["new"]},
-            {"name": "Отобранные", "slug": "selected", "candidates": pipeline["selected"]},
-            {"name": "Скрининг", "slug": "screening", "candidates": pipeline["screening"]},
-            {"name": "Интервью", "slug": "interview", "candidates": pipeline["interview"]},
-            {"name": "Оффер", "slug": "offer", "candidates": pipeline["offer"]},
-        ],
-    }
+    return await response_cache.respond(
+        request, current_user.organization_id, [vacancy_scope(vacancy_id)], build
+    )
 
 
 @router.post("/move")
@@ -78,7 +108,9 @@ async def move_candidate(
     """Move candidate between stages"""
     # Get candidate
     result = await session.execute(
-        select(Candidate).where(Candidate.id == move_data.candidate_id)
+        select(Candidate)
+        .where(Candidate.id == move_data.candidate_id)
+        .where(Candidate.organization_id == current_user.organization_id)
     )
     candidate = result.scalar_one_or_none()
     
@@ -88,20 +120,17 @@ async def move_candidate(
             detail="Candidate not found",
         )
     
-    # Update stage
-    candidate.current_stage = move_data.to_stage
-    session.add(candidate)
-    
-    # Log stage change
-    stage_history = CandidateStage(
-        candidate_id=candidate.id,
-        stage_slug=move_data.to_stage,
-        notes=move_data.notes,
+    # Log stage change and time-in-stage interval
+    await StageService.move(
+        session,
+        candidate,
+        move_data.to_stage,
         moved_by=current_user.id,
+        notes=move_data.notes,
     )
-    session.add(stage_history)
     
     await session.commit()
+    await response_cache.invalidate(vacancy_scope(candidate.vacancy_id))
     
     return {
         "candidate_id": candidate.id,
@@ -0,0 +1,77 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_session
+from app.core.deps import get_current_user
+from app.models.user import User
+from app.models.candidate import CandidateStatus
+from app.services.search_service import SearchService
+from app.services.hybrid_search_service import HybridSearchService
+
+router = APIRouter()
+
+
+@router.get("/resumes")
+async def search_resumes(
+    q: str = Query(..., min_length=1, max_length=500),
+    vacancy_id: Optional[int] = None,
+    candidate_status: Optional[CandidateStatus] = Query(None, alias="status"),
+    language: Optional[str] = Query(None, pattern="^(english|russian)$"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """Full-text search over resume text with highlighted snippets
+
+    Query syntax: "exact phrase", prefix*, -exclude, OR.
+    Pass `next_cursor` from the previous page as `cursor` to continue.
+    """
+    try:
+        return await SearchService.search_resumes(
+            session,
+            current_user.organization_id,
+            q,
+            vacancy_id=vacancy_id,
+            status=candidate_status,
+            language=language,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+
+@router.get("/candidates")
+async def search_candidates(
+    q: str = Query(..., min_length=1, max_length=500),
+    vacancy_id: Optional[int] = None,
+    candidate_status: Optional[CandidateStatus] = Query(None, alias="status"),
+    limit: int = Query(20, ge=1, le=100),
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """Hybrid keyword + semantic candidate search (reciprocal rank fusion)
+
+    While embeddings are unavailable, results are keyword-only with
+    `"degraded": true`.
+    """
+    try:
+        return await HybridSearchService.search(
+            session,
+            current_user.organization_id,
+            q,
+            vacancy_id=vacancy_id,
+            status=candidate_status,
+            limit=limit,
+            user_id=current_user.id,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
@@ -0,0 +1,71 @@
+from typing import Optional
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_session
+from app.core.deps import get_tenant_candidate, get_tenant_vacancy, require_roles
+from app.models.candidate import Candidate
+from app.models.user import User, UserRole
+from app.models.vacancy import Vacancy
+from app.services.usage_service import UsageService
+
+router = APIRouter()
+
+# AI spend is a budget matter: directors and admins only
+usage_user = require_roles(UserRole.HR_DIRECTOR, UserRole.ADMIN)
+
+
+@router.get("")
+async def get_usage(
+    group_by: str = "vacancy",
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(usage_user),
+):
+    """LLM calls, tokens and cost of the organization
+
+    group_by: vacancy, candidate, user, model, operation or day.
+    """
+    try:
+        return await UsageService.summary(
+            session, current_user.organization_id, group_by, date_from, date_to
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+
+@router.get("/vacancies/{vacancy_id}")
+async def get_vacancy_usage(
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(usage_user),
+    vacancy: Vacancy = Depends(get_tenant_vacancy),
+):
+    """AI spend of a vacancy against its budget, by operation and model"""
+    breakdown = await UsageService.breakdown(
+        session, current_user.organization_id, vacancy_id=vacancy.id
+    )
+    return {
+        "vacancy_id": vacancy.id,
+        **await UsageService.budget_status(session, vacancy),
+        **breakdown,
+    }
+
+
+@router.get("/candidates/{candidate_id}")
+async def get_candidate_usage(
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(usage_user),
+    candidate: Candidate = Depends(get_tenant_candidate),
+):
+    """AI spend on processing one candidate, by operation and model"""
+    return {
+        "candidate_id": candidate.id,
+        **await UsageService.breakdown(
+            session, current_user.organization_id, candidate_id=candidate.id
+        ),
+    }
@@ -1,20 +1,43 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, status
 from sqlmodel import select
 from sqlalchemy.ext.asyncio import AsyncSession
-import json
 
+from app.core.cache import response_cache, vacancies_scope, vacancy_scope
 from app.core.database import get_session
-from app.core.deps import get_current_user
-from app.models.user import User
+from app.core.responses import dump_row, dump_rows
+from app.core.sse import single_chunk, sse_event, sse_response
+from app.core.deps import get_current_user, get_tenant_vacancy
+from app.core.quotas import QuotaExceededError
+from app.models.user import User, UserRole
 from app.models.vacancy import Vacancy, VacancyCreate, VacancyRead, VacancyUpdate
 from app.services.ai_service import AIService
+from app.services.llm_errors import LLMError
+from app.services.usage_service import BudgetExceededError
+from app.services.vacancy_description_service import VacancyDescriptionService
+from app.services.skill_service import skills_list
+from app.tasks.talent_tasks import rediscover_talent_task
 
 router = APIRouter()
 
+# Changing any of these invalidates the vacancy embedding and talent suggestions
+MATCHING_FIELDS = {"title", "description", "requirements", "skills"}
+
+# Only directors and admins decide how much AI spend a vacancy may use
+BUDGET_ROLES = {UserRole.HR_DIRECTOR, UserRole.ADMIN}
+
+
+def check_budget_access(current_user: User) -> None:
+    if current_user.role not in BUDGET_ROLES:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions to set the AI budget",
+        )
+
 
 @router.get("", response_model=List[VacancyRead])
 async def get_vacancies(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
     status: Optional[str] = None,
@@ -22,34 +45,45 @@ async def get_vacancies(
     current_user: User = Depends(get_current_user),
 ):
     """Get all vacancies"""
-    query = select(Vacancy)
-    
-    if status:
-        query = query.where(Vacancy.status == status)
-    
-    query = query.offset(skip).limit(limit)
-    result = await session.execute(query)
-    vacancies = result.scalars().all()
-    
-    return vacancies
+    async def build():
+        query = select(Vacancy).where(Vacancy.organization_id == current_user.organization_id)
+        
+        if status:
+            query = query.where(Vacancy.status == status)
+        
+        query = query.offset(skip).limit(limit)
+        result = await session.execute(query)
+        return dump_rows(VacancyRead, result.scalars().all())
+    
+    return await response_cache.respond(
+        request, current_user.organization_id, [vacancies_scope(current_user.organization_id)], build
+    )
 
 
 @router.post("", response_model=VacancyRead)
 async def create_vacancy(
     vacancy_data: VacancyCreate,
+    background_tasks: BackgroundTasks,
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ):
     """Create new vacancy"""
+    if vacancy_data.ai_budget_usd is not None:
+        check_budget_access(current_user)
+    
     vacancy = Vacancy(
-        **vacancy_data.model_dump(exclude={"skills"}),
-        skills=json.dumps(vacancy_data.skills) if vacancy_data.skills else None,
-        user_id=current_user.id,
+        **vacancy_data.model_dump(),
+        organization_id=current_user.organization_id,
+        created_by=current_user.id,
     )
     
     session.add(vacancy)
     await session.commit()
     await session.refresh(vacancy)
+    await response_cache.invalidate(vacancies_scope(vacancy.organization_id))
+    
+    # Surface past applicants for the new vacancy
+    background_tasks.add_task(rediscover_talent_task, vacancy.id)
     
     return vacancy
 
@@ -57,108 +91,132 @@ async def create_vacancy(
 @router.get("/{vacancy_id}", response_model=VacancyRead)
 async def get_vacancy(
     vacancy_id: int,
+    request: Request,
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ):
     """Get vacancy by ID"""
-    result = await session.execute(
-        select(Vacancy).where(Vacancy.id == vacancy_id)
-    )
-    vacancy = result.scalar_one_or_none()
-    
-    if not vacancy:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Vacancy not found",
+    async def build():
+        result = await session.execute(
+            select(Vacancy)
+            .where(Vacancy.id == vacancy_id)
+            .where(Vacancy.organization_id == current_user.organization_id)
         )
-    
-    return vacancy
+        vacancy = result.scalar_one_or_none()
+        
+        if not vacancy:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Vacancy not found",
+            )
+        
+        return dump_row(VacancyRead, vacancy)
+    
+    return await response_cache.respond(
+        request, current_user.organization_id, [vacancy_scope(vacancy_id)], build
+    )
 
 
 @router.patch("/{vacancy_id}", response_model=VacancyRead)
 async def update_vacancy(
-    vacancy_id: int,
     vacancy_data: VacancyUpdate,
+    background_tasks: BackgroundTasks,
+    vacancy: Vacancy = Depends(get_tenant_vacancy),
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ):
     """Update vacancy"""
-    result = await session.execute(
-        select(Vacancy).where(Vacancy.id == vacancy_id)
-    )
-    vacancy = result.scalar_one_or_none()
-    
-    if not vacancy:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Vacancy not found",
-        )
-    
     update_data = vacancy_data.model_dump(exclude_unset=True)
-    if "skills" in update_data and update_data["skills"]:
-        update_data["skills"] = json.dumps(update_data["skills"])
+    if "ai_budget_usd" in update_data:
+        check_budget_access(current_user)
+    if "skills" in update_data and update_data["skills"] is None:
+        update_data["skills"] = []
     
     for key, value in update_data.items():
         setattr(vacancy, key, value)
     
+    matching_changed = bool(MATCHING_FIELDS & update_data.keys())
+    if matching_changed:
+        vacancy.embedding = None
+    
     session.add(vacancy)
     await session.commit()
     await session.refresh(vacancy)
+    await response_cache.invalidate(vacancies_scope(vacancy.organization_id), vacancy_scope(vacancy.id))
+    
+    if matching_changed:
+        background_tasks.add_task(rediscover_talent_task, vacancy.id)
     
     return vacancy
 
 
 @router.post("/{vacancy_id}/generate")
 async def generate_vacancy_description(
-    vacancy_id: int,
+    stream: bool = False,
+    fresh: bool = False,
+    vacancy: Vacancy = Depends(get_tenant_vacancy),
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ):
-    """Generate vacancy description using AI"""
-    result = await session.execute(
-        select(Vacancy).where(Vacancy.id == vacancy_id)
-    )
-    vacancy = result.scalar_one_or_none()
-    
-    if not vacancy:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Vacancy not found",
-        )
-    
-    ai_service = AIService()
-    generated_description = await ai_service.generate_vacancy_description(
-        title=vacancy.title,
-        requirements=vacancy.requirements,
-        skills=json.loads(vacancy.skills) if vacancy.skills else [],
+    """Generate vacancy description using AI
+    
+    Reuses a cached description of the same or a similar vacancy unless
+    `fresh`. With `stream` the answer is a server-sent event stream:
+    `delta` events with text as it is generated, then `done` with the
+    whole description once it is saved (or `error`).
+    """
+    ai_service = AIService(
+        organization_id=vacancy.organization_id,
+        vacancy_id=vacancy.id,
+        user_id=current_user.id,
     )
-    
-    vacancy.ai_generated_description = generated_description
-    session.add(vacancy)
-    await session.commit()
-    
-    return {"description": generated_description}
+    try:
+        if not stream:
+            probe = await VacancyDescriptionService.generate(session, ai_service, vacancy, fresh)
+            return {"description": probe.description, "cached": probe.source != "generated"}
+        
+        probe = await VacancyDescriptionService.lookup(session, ai_service, vacancy, fresh)
+        if probe.description is not None:
+            await VacancyDescriptionService.save(session, vacancy, probe, probe.description)
+            chunks = single_chunk(probe.description)
+        else:
+            chunks = VacancyDescriptionService.relay(
+                vacancy.id,
+                probe,
+                await ai_service.stream_vacancy_description(
+                    title=vacancy.title,
+                    requirements=vacancy.requirements,
+                    skills=skills_list(vacancy.skills),
+                ),
+            )
+    except (QuotaExceededError, BudgetExceededError, LLMError) as e:
+        raise e.as_http()
+    
+    async def events():
+        parts = []
+        try:
+            async for chunk in chunks:
+                parts.append(chunk)
+                yield sse_event("delta", {"text": chunk})
+        except Exception as e:
+            # Headers are sent; report the failure in the stream
+            yield sse_event("error", {"detail": f"Failed to generate description: {e}"})
+            return
+        yield sse_event("done", {"description": "".join(parts), "cached": probe.source != "generated"})
+    
+    return sse_response(events(), **{"X-Description-Cache": probe.source})
 
 
 @router.delete("/{vacancy_id}")
 async def delete_vacancy(
-    vacancy_id: int,
+    vacancy: Vacancy = Depends(get_tenant_vacancy),
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ):
     """Delete vacancy"""
-    result = await session.execute(
-        select(Vacancy).where(Vacancy.id == vacancy_id)
-    )
-    vacancy = result.scalar_one_or_none()
-    
-    if not vacancy:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Vacancy not found",
-        )
-    
+    vacancy_id, organization_id = vacancy.id, vacancy.organization_id
     await session.delete(vacancy)
     await session.commit()
+    await response_cache.invalidate(vacancies_scope(organization_id), vacancy_scope(vacancy_id))
     
     return {"message": "Vacancy deleted"}
@@ -1,10 +1,18 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, vacancies, candidates, pipeline, matching
+from app.core.responses import FastJSONResponse
+from app.api.v1.endpoints import auth, organizations, vacancies, candidates, pipeline, matching, search, duplicates, exports, imports, analytics, usage
 
-api_router = APIRouter()
+api_router = APIRouter(default_response_class=FastJSONResponse)
 
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
+api_router.include_router(organizations.router, prefix="/organizations", tags=["organizations"])
 api_router.include_router(vacancies.router, prefix="/vacancies", tags=["vacancies"])
 api_router.include_router(candidates.router, prefix="/candidates", tags=["candidates"])
 api_router.include_router(pipeline.router, prefix="/pipeline", tags=["pipeline"])
 api_router.include_router(matching.router, prefix="/matching", tags=["matching"])
+api_router.include_router(search.router, prefix="/search", tags=["search"])
+api_router.include_router(duplicates.router, prefix="/duplicates", tags=["duplicates"])
+api_router.include_router(exports.router, prefix="/exports", tags=["exports"])
+api_router.include_router(imports.router, prefix="/imports", tags=["imports"])
+api_router.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
+api_router.include_router(usage.router, prefix="/usage", tags=["usage"])
@@ -0,0 +1,143 @@
+"""Redis-backed response cache with ETags and versioned invalidation
+
+Every cached response belongs to one or more scopes ("vacancies",
+"vacancy:42"). Each scope has a version counter in Redis; writes bump the
+counter instead of deleting keys, so all responses built from the old
+state become unreachable at once and simply expire.
+
+The ETag is derived from the request, the caller's organization and the
+scope versions, so a matching If-None-Match is answered with 304 after a
+single MGET, without touching the database or the cached body, and one
+tenant can never be served another tenant's entry.
+"""
+import hashlib
+import json
+import logging
+from typing import Any, Awaitable, Callable, Iterable, List, Optional
+
+from fastapi import Request, Response, status
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.responses import dumps
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "cache:version:{scope}"
+BODY_KEY = "cache:response:{digest}"
+
+def vacancies_scope(organization_id: int) -> str:
+    """Scope of an organization's vacancy lists"""
+    return f"organization:{organization_id}:vacancies"
+
+
+def vacancy_scope(vacancy_id: int) -> str:
+    """Scope of everything rendered from one vacancy (detail, pipeline board)"""
+    return f"vacancy:{vacancy_id}"
+
+
+class ResponseCache:
+    """Versioned JSON response cache; Redis outages degrade to no caching"""
+
+    def __init__(self, redis_url: str, ttl_seconds: int, enabled: bool = True):
+        self.redis_url = redis_url
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._redis: Optional[aioredis.Redis] = None
+
+    @property
+    def redis(self) -> aioredis.Redis:
+        if self._redis is None:
+            self._redis = aioredis.from_url(self.redis_url)
+        return self._redis
+
+    async def versions(self, scopes: List[str]) -> List[int]:
+        values = await self.redis.mget([VERSION_KEY.format(scope=scope) for scope in scopes])
+        return [int(value or 0) for value in values]
+
+    async def invalidate(self, *scopes: str) -> None:
+        """Bump scope versions; call after the write is committed"""
+        if not self.enabled or not scopes:
+            return
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for scope in scopes:
+                    pipe.incr(VERSION_KEY.format(scope=scope))
+                await pipe.execute()
+        except RedisError:
+            logger.warning("Response cache invalidation failed for %s", scopes, exc_info=True)
+
+    @staticmethod
+    def digest(request: Request, organization_id: int, scopes: List[str], versions: List[int]) -> str:
+        query = sorted(request.query_params.multi_items())
+        material = json.dumps([request.url.path, query, organization_id, scopes, versions])
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()[:32]
+
+    async def respond(
+        self,
+        request: Request,
+        organization_id: int,
+        scopes: Iterable[str],
+        build: Callable[[], Awaitable[Any]],
+    ) -> Response:
+        """Serve from cache (or 304) when the scopes are unchanged, else build and store
+
+        `build` must apply the same tenant filter as `organization_id`.
+        """
+        scopes = list(scopes)
+        if not self.enabled:
+            return self._response(dumps(await build()))
+
+        try:
+            versions = await self.versions(scopes)
+        except RedisError:
+            logger.warning("Response cache unavailable", exc_info=True)
+            return self._response(dumps(await build()))
+
+        digest = self.digest(request, organization_id, scopes, versions)
+        etag = f'W/"{digest}"'
+
+        if etag in _parse_if_none_match(request.headers.get("if-none-match")):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=_cache_headers(etag))
+
+        key = BODY_KEY.format(digest=digest)
+        try:
+            body = await self.redis.get(key)
+        except RedisError:
+            body = None
+
+        if body is None:
+            body = dumps(await build())
+            try:
+                await self.redis.set(key, body, ex=self.ttl_seconds)
+            except RedisError:
+                logger.warning("Response cache write failed", exc_info=True)
+
+        return self._response(body, etag)
+
+    @staticmethod
+    def _response(body: bytes, etag: Optional[str] = None) -> Response:
+        return Response(
+            content=body,
+            media_type="application/json",
+            headers=_cache_headers(etag) if etag else None,
+        )
+
+
+def _parse_if_none_match(header: Optional[str]) -> List[str]:
+    if not header:
+        return []
+    return [tag.strip() for tag in header.split(",")]
+
+
+def _cache_headers(etag: str) -> dict:
+    # Per-user auth: browsers may keep it but must revalidate every time
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
+response_cache = ResponseCache(
+    redis_url=settings.REDIS_URL,
+    ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+    enabled=settings.RESPONSE_CACHE_ENABLED,
+)
@@ -1,4 +1,4 @@
-from typing import List
+from typing import Dict, List, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import validator
 import json
@@ -36,10 +36,43 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str
+    SQL_ECHO: bool = False  # log every statement; use metrics/traces instead
 
     # Redis
     REDIS_URL: str
 
+    # Response cache
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_TTL_SECONDS: int = 300
+
+    # Per-organization quotas (defaults; organizations may override)
+    TENANT_QUOTAS_ENABLED: bool = True
+    TENANT_LLM_CALLS_PER_MINUTE: int = 120
+    TENANT_MAX_CONCURRENT_TASKS: int = 4
+    # Background work waits this long for quota before failing
+    TENANT_QUOTA_MAX_WAIT_SECONDS: int = 300
+    # Slots of crashed workers are reclaimed after this long
+    TENANT_TASK_SLOT_TTL_SECONDS: int = 900
+    TENANT_LIMITS_CACHE_TTL_SECONDS: int = 60
+
+    # Resume processing queue, served by `python -m app.tasks.worker`;
+    # disabled, work runs in the requesting process as before
+    TASK_QUEUE_ENABLED: bool = True
+    TASK_QUEUE_WORKER_CONCURRENCY: int = 8
+    TASK_QUEUE_POLL_SECONDS: float = 1.0
+    # Jobs of a worker that died are re-queued after this long without a
+    # heartbeat; running jobs are refreshed several times per period
+    TASK_QUEUE_VISIBILITY_SECONDS: int = 1800
+    # Runs of a failing job before its unfinished resumes are marked as errors
+    TASK_QUEUE_MAX_ATTEMPTS: int = 3
+
+    # Processing status streams (GET /candidates/processing/stream)
+    PROCESSING_STREAM_MAX_SECONDS: int = 900
+    PROCESSING_STREAM_HEARTBEAT_SECONDS: float = 15.0
+    # Database re-read interval when the Redis status channel is unavailable
+    PROCESSING_STREAM_POLL_SECONDS: float = 3.0
+    PROCESSING_STATUS_MAX_CANDIDATES: int = 1000
+
     # S3 / MinIO
     S3_ENDPOINT_URL: str
     S3_ACCESS_KEY: str
@@ -51,6 +84,115 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: str
     OPENAI_MODEL: str = "gpt-4-turbo-preview"
     OPENAI_EMBEDDING_MODEL: str = "text-embedding-3-small"
+    EMBEDDING_DIMENSIONS: int = 1536
+    # OpenAI-compatible server (vLLM, Ollama, ...) instead of api.openai.com
+    OPENAI_BASE_URL: Optional[str] = None
+    # Model backends, see app/services/llm_backends.py
+    LLM_BACKEND: str = "openai"  # openai | stub
+    EMBEDDING_BACKEND: str = "openai"  # openai | sentence-transformers | stub
+    LOCAL_EMBEDDING_MODEL: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+    LOCAL_EMBEDDING_DEVICE: str = "cpu"
+    # Texts per embedding call/inference batch
+    EMBEDDING_BATCH_SIZE: int = 32
+    # Extract and score a new resume in one chat call instead of two
+    LLM_COMBINED_SCREENING: bool = True
+    # Offline batch scoring through the provider batch API (or the local stand-in)
+    BATCH_BACKEND: str = "openai"  # openai | local
+    BATCH_LOCAL_DIR: str = "/tmp/hr-saas-batches"
+    BATCH_COMPLETION_WINDOW: str = "24h"
+    BATCH_MAX_REQUESTS: int = 50000
+    # Batch calls are billed at this share of the realtime price
+    LLM_BATCH_PRICE_FACTOR: float = 0.5
+    # Re-asks for invalid fields of a structured answer before defaulting them
+    LLM_REPAIR_ATTEMPTS: int = 1
+    # Background tasks retry transient LLM failures (timeouts, rate limits, 5xx)
+    LLM_TASK_MAX_ATTEMPTS: int = 3
+    LLM_RETRY_BASE_SECONDS: float = 5.0
+    # Provider timeouts; the client retries once, tasks retry with backoff
+    LLM_TIMEOUT_SECONDS: float = 60.0
+    EMBEDDING_TIMEOUT_SECONDS: float = 30.0
+    LLM_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    LLM_CLIENT_MAX_RETRIES: int = 1
+    # Circuit breaker: consecutive transient failures that open it, seconds it
+    # stays open, calls let through as probes once it is half-open
+    LLM_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    LLM_CIRCUIT_OPEN_SECONDS: float = 30.0
+    LLM_CIRCUIT_HALF_OPEN_PROBES: int = 1
+    # Resumes with deferred AI stages replayed per run of the replay task
+    LLM_REPLAY_BATCH_SIZE: int = 200
+    # Prompt budgets: tokens of resume/vacancy text per call
+    PROMPT_EXTRACT_RESUME_TOKENS: int = 3000
+    PROMPT_MATCH_RESUME_TOKENS: int = 2000
+    PROMPT_VACANCY_TOKENS: int = 1000
+    # Directory with pre-seeded tiktoken encodings for installs without network
+    # access; exported as TIKTOKEN_CACHE_DIR before the first encoding loads
+    TIKTOKEN_CACHE_DIR: Optional[str] = None
+    # text-embedding-3-* accept at most 8191 tokens
+    EMBEDDING_MAX_TOKENS: int = 8000
+
+    # Reuse generated vacancy descriptions for the same title/skills/requirements
+    DESCRIPTION_CACHE_ENABLED: bool = True
+    DESCRIPTION_CACHE_TTL_SECONDS: int = 30 * 24 * 3600
+    # Cosine similarity for reusing a description of a similar vacancy;
+    # None turns the embedding lookup off
+    DESCRIPTION_CACHE_SIMILARITY: Optional[float] = 0.95
+
+    # LLM cost accounting: USD per 1M tokens, [prompt, completion]
+    LLM_PRICES_PER_MILLION: Dict[str, List[float]] = {
+        "gpt-4-turbo-preview": [10.0, 30.0],
+        "gpt-4o": [2.5, 10.0],
+        "gpt-4o-mini": [0.15, 0.6],
+        "text-embedding-3-small": [0.02, 0.0],
+        "text-embedding-3-large": [0.13, 0.0],
+        "stub": [0.0, 0.0],
+        "stub-hashing": [0.0, 0.0],
+    }
+    # Default AI allowance per vacancy; None means unlimited
+    LLM_VACANCY_BUDGET_USD: Optional[float] = None
+    # Past this share of the allowance chat calls use the fallback model;
+    # at 100% they are refused
+    LLM_BUDGET_FALLBACK_RATIO: float = 0.8
+    LLM_FALLBACK_MODEL: str = "gpt-4o-mini"
+
+    # Search
+    HYBRID_SEARCH_CANDIDATES_PER_LEG: int = 100
+    HYBRID_SEARCH_RRF_K: int = 60
+    QUERY_EMBEDDING_CACHE_SIZE: int = 1024
+    QUERY_EMBEDDING_CACHE_TTL_SECONDS: int = 3600
+
+    # Talent rediscovery
+    TALENT_POOL_CANDIDATES_PER_LEG: int = 200
+    TALENT_POOL_SEMANTIC_WEIGHT: float = 0.6
+    TALENT_POOL_MIN_SCORE: float = 40.0
+    TALENT_POOL_MAX_SUGGESTIONS: int = 100
+
+    # Candidate deduplication
+    DEFAULT_PHONE_COUNTRY_CODE: str = "7"
+    # Pair score to flag a duplicate; an exact email match alone reaches it
+    # (weights in app/services/dedup_service.py)
+    DEDUP_MIN_SCORE: float = 0.6
+    DEDUP_MAX_BLOCK_SIZE: int = 50
+
+    # Bulk import
+    IMPORT_COPY_CHUNK_SIZE: int = 10000
+
+    # Analytics
+    ANALYTICS_DEFAULT_PERIOD_DAYS: int = 90
+
+    # Stage SLA: max days a candidate may stay in a stage (JSON object in env)
+    STAGE_SLA_DAYS: Dict[str, int] = {
+        "new": 3,
+        "selected": 3,
+        "screening": 5,
+        "interview": 7,
+        "offer": 5,
+    }
+    SLA_SCAN_BATCH_SIZE: int = 1000
+
+    # Observability; traces are exported only if OpenTelemetry is installed
+    TRACING_ENABLED: bool = False
+    OTEL_EXPORTER_OTLP_ENDPOINT: Optional[str] = None  # e.g. http://localhost:4317
+    OTEL_SERVICE_NAME: str = "hr-saas-backend"
 
     # Frontend
     FRONTEND_URL: str = "http://localhost:3000"
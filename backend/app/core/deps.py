@@ -6,7 +6,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_session
 from app.core.security import decode_token
-from app.models.user import User
+from app.models.candidate import Candidate
+from app.models.organization import Organization
+from app.models.user import User, UserRole
+from app.models.vacancy import Vacancy
 
 security = HTTPBearer()
 
@@ -32,21 +35,32 @@ async def get_current_user(
             detail="Invalid token payload",
         )
     
-    result = await session.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    result = await session.execute(
+        select(User, Organization.is_active)
+        .join(Organization, Organization.id == User.organization_id)
+        .where(User.id == user_id)
+    )
+    row = result.one_or_none()
     
-    if user is None:
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found",
         )
     
+    user, organization_active = row
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Inactive user",
         )
     
+    if not organization_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Organization is disabled",
+        )
+    
     return user
 
 
@@ -55,3 +69,84 @@ async def get_current_active_user(
 ) -> User:
     """Get current active user"""
     return current_user
+
+
+def require_roles(*roles: UserRole):
+    """Dependency allowing only users with one of the given roles"""
+    async def check_role(
+        current_user: User = Depends(get_current_user),
+    ) -> User:
+        if current_user.role not in roles:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not enough permissions",
+            )
+        return current_user
+    
+    return check_role
+
+
+async def get_tenant_vacancy(
+    vacancy_id: int,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+) -> Vacancy:
+    """Vacancy from the path, if it belongs to the user's organization"""
+    result = await session.execute(
+        select(Vacancy)
+        .where(Vacancy.id == vacancy_id)
+        .where(Vacancy.organization_id == current_user.organization_id)
+    )
+    vacancy = result.scalar_one_or_none()
+    
+    # Other tenants' rows are indistinguishable from missing ones
+    if not vacancy:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Vacancy not found",
+        )
+    
+    return vacancy
+
+
+async def get_tenant_candidate(
+    candidate_id: int,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+) -> Candidate:
+    """Candidate from the path, if it belongs to the user's organization"""
+    result = await session.execute(
+        select(Candidate)
+        .where(Candidate.id == candidate_id)
+        .where(Candidate.organization_id == current_user.organization_id)
+    )
+    candidate = result.scalar_one_or_none()
+    
+    if not candidate:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Candidate not found",
+        )
+    
+    return candidate
+
+
+async def ensure_tenant_vacancy(
+    session: AsyncSession,
+    vacancy_id: Optional[int],
+    organization_id: int,
+) -> None:
+    """404 unless the vacancy (from a body or query filter) belongs to the organization"""
+    if vacancy_id is None:
+        return
+    
+    result = await session.execute(
+        select(Vacancy.id)
+        .where(Vacancy.id == vacancy_id)
+        .where(Vacancy.organization_id == organization_id)
+    )
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Vacancy not found",
+        )
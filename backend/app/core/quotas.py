@@ -0,0 +1,232 @@
+"""Per-organization quotas on LLM calls and background task concurrency
+
+LLM calls are counted in fixed one-minute windows per organization.
+Background tasks take a slot in a per-organization Redis sorted set
+(member = token, score = acquire time); slots older than the TTL are
+reclaimed, so a crashed worker cannot hold a slot forever.
+
+Interactive requests fail fast with QuotaExceededError (mapped to 429);
+background work waits for the next window or a free slot instead. The
+queue worker takes the slot itself without waiting and puts the job back
+when the organization is busy; the task's own slot request inside the
+job then reuses it. Like
+the response cache, Redis outages degrade to no limits rather than
+failing requests.
+"""
+import asyncio
+import logging
+import random
+import time
+import uuid
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Dict, FrozenSet, Optional, Tuple
+
+from fastapi import HTTPException, status
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.database import async_session
+from app.core.telemetry import TASKS_RUNNING, TASKS_WAITING
+from app.models.organization import Organization
+
+logger = logging.getLogger(__name__)
+
+LLM_WINDOW_KEY = "quota:llm:{organization_id}:{window}"
+TASK_SLOTS_KEY = "quota:tasks:{organization_id}"
+LLM_WINDOW_SECONDS = 60
+TASK_POLL_SECONDS = 0.5
+
+# Organizations whose task slot the current asyncio task already holds
+_held_task_slots: ContextVar[FrozenSet[int]] = ContextVar("held_task_slots", default=frozenset())
+
+
+class QuotaExceededError(Exception):
+    def __init__(self, organization_id: int, quota: str, retry_after: float):
+        self.organization_id = organization_id
+        self.quota = quota
+        self.retry_after = retry_after
+        super().__init__(
+            f"Organization {organization_id} exceeded its {quota} quota; retry in {retry_after:.0f}s"
+        )
+
+    def as_http(self) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"{self.quota} quota exceeded",
+            headers={"Retry-After": str(max(1, round(self.retry_after)))},
+        )
+
+
+class TenantQuotas:
+    def __init__(
+        self,
+        redis_url: str,
+        llm_calls_per_minute: int,
+        max_concurrent_tasks: int,
+        enabled: bool = True,
+    ):
+        self.redis_url = redis_url
+        self.llm_calls_per_minute = llm_calls_per_minute
+        self.max_concurrent_tasks = max_concurrent_tasks
+        self.enabled = enabled
+        self._redis: Optional[aioredis.Redis] = None
+        self._limits: Dict[int, Tuple[float, Tuple[int, int]]] = {}
+
+    @property
+    def redis(self) -> aioredis.Redis:
+        if self._redis is None:
+            self._redis = aioredis.from_url(self.redis_url)
+        return self._redis
+
+    async def limits(self, organization_id: int) -> Tuple[int, int]:
+        """(LLM calls per minute, concurrent tasks), cached in process briefly"""
+        cached = self._limits.get(organization_id)
+        if cached and time.monotonic() - cached[0] < settings.TENANT_LIMITS_CACHE_TTL_SECONDS:
+            return cached[1]
+
+        async with async_session() as session:
+            organization = await session.get(Organization, organization_id)
+
+        limits = (
+            (organization and organization.llm_calls_per_minute) or self.llm_calls_per_minute,
+            (organization and organization.max_concurrent_tasks) or self.max_concurrent_tasks,
+        )
+        self._limits[organization_id] = (time.monotonic(), limits)
+        return limits
+
+    async def _take_llm_call(self, organization_id: int, limit: int) -> Optional[float]:
+        """Count one call; seconds until the window resets if over the limit"""
+        now = time.time()
+        window = int(now // LLM_WINDOW_SECONDS)
+        key = LLM_WINDOW_KEY.format(organization_id=organization_id, window=window)
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.incr(key)
+            pipe.expire(key, LLM_WINDOW_SECONDS * 2)
+            count, _ = await pipe.execute()
+
+        if count <= limit:
+            return None
+        return (window + 1) * LLM_WINDOW_SECONDS - now
+
+    async def acquire_llm_call(self, organization_id: Optional[int], wait: bool = False) -> None:
+        """Count an LLM call against the organization's per-minute quota
+
+        Raises QuotaExceededError when over quota, unless `wait` is set, in
+        which case it sleeps until the next window (up to the max wait).
+        """
+        if not self.enabled or organization_id is None:
+            return
+
+        limit, _ = await self.limits(organization_id)
+        deadline = time.monotonic() + settings.TENANT_QUOTA_MAX_WAIT_SECONDS
+
+        while True:
+            try:
+                retry_after = await self._take_llm_call(organization_id, limit)
+            except RedisError:
+                logger.warning("Quota store unavailable; LLM call not counted", exc_info=True)
+                return
+
+            if retry_after is None:
+                return
+            if not wait or time.monotonic() + retry_after > deadline:
+                raise QuotaExceededError(organization_id, "LLM calls", retry_after)
+            # Spread waiting workers over the start of the next window
+            await asyncio.sleep(retry_after + random.uniform(0, 1))
+
+    async def _take_task_slot(self, key: str, token: str, limit: int) -> bool:
+        now = time.time()
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zremrangebyscore(key, "-inf", now - settings.TENANT_TASK_SLOT_TTL_SECONDS)
+            pipe.zadd(key, {token: now})
+            pipe.zrank(key, token)
+            pipe.expire(key, settings.TENANT_TASK_SLOT_TTL_SECONDS)
+            _, _, rank, _ = await pipe.execute()
+
+        if rank < limit:
+            return True
+        await self.redis.zrem(key, token)
+        return False
+
+    @asynccontextmanager
+    async def task_slot(self, organization_id: Optional[int], wait: bool = True) -> AsyncIterator[None]:
+        """Hold one of the organization's background task slots
+
+        Waits for a free slot (up to the max wait), or raises
+        QuotaExceededError at once if `wait` is not set. Nested calls for
+        the same organization reuse the slot already held.
+        """
+        if not self.enabled or organization_id is None or organization_id in _held_task_slots.get():
+            yield
+            return
+
+        _, limit = await self.limits(organization_id)
+        key = TASK_SLOTS_KEY.format(organization_id=organization_id)
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + settings.TENANT_QUOTA_MAX_WAIT_SECONDS
+        acquired = False
+
+        with TASKS_WAITING.track_inprogress():
+            while True:
+                try:
+                    acquired = await self._take_task_slot(key, token, limit)
+                except RedisError:
+                    logger.warning("Quota store unavailable; running task without a slot", exc_info=True)
+                    break
+                if acquired:
+                    break
+                if not wait or time.monotonic() > deadline:
+                    raise QuotaExceededError(organization_id, "concurrent tasks", TASK_POLL_SECONDS)
+                await asyncio.sleep(TASK_POLL_SECONDS * random.uniform(0.5, 1.5))
+
+        held = _held_task_slots.set(_held_task_slots.get() | {organization_id})
+        try:
+            with TASKS_RUNNING.track_inprogress():
+                yield
+        finally:
+            _held_task_slots.reset(held)
+            if acquired:
+                try:
+                    await self.redis.zrem(key, token)
+                except RedisError:
+                    logger.warning("Failed to release task slot %s", token, exc_info=True)
+
+    async def usage(self, organization_id: int) -> Dict:
+        """Current consumption against the organization's limits"""
+        llm_limit, task_limit = await self.limits(organization_id)
+        usage = {
+            "llm_calls_per_minute": llm_limit,
+            "max_concurrent_tasks": task_limit,
+            "llm_calls_this_minute": None,
+            "running_tasks": None,
+        }
+        if not self.enabled:
+            return usage
+
+        window = int(time.time() // LLM_WINDOW_SECONDS)
+        try:
+            calls = await self.redis.get(
+                LLM_WINDOW_KEY.format(organization_id=organization_id, window=window)
+            )
+            running = await self.redis.zcount(
+                TASK_SLOTS_KEY.format(organization_id=organization_id),
+                time.time() - settings.TENANT_TASK_SLOT_TTL_SECONDS,
+                "+inf",
+            )
+        except RedisError:
+            return usage
+
+        usage["llm_calls_this_minute"] = int(calls or 0)
+        usage["running_tasks"] = running
+        return usage
+
+
+tenant_quotas = TenantQuotas(
+    redis_url=settings.REDIS_URL,
+    llm_calls_per_minute=settings.TENANT_LLM_CALLS_PER_MINUTE,
+    max_concurrent_tasks=settings.TENANT_MAX_CONCURRENT_TASKS,
+    enabled=settings.TENANT_QUOTAS_ENABLED,
+)
@@ -0,0 +1,58 @@
+"""Fast JSON responses: orjson rendering and validation-free ORM row dumps
+
+FastAPI validates a returned object against `response_model` and then
+encodes it with the stdlib JSON encoder. Rows loaded from our own
+database already match the read models, so list endpoints can copy the
+read model's fields straight off the ORM objects and hand them to orjson,
+which serializes datetimes, enums and nested lists natively.
+"""
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Tuple, Type
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+@lru_cache(maxsize=None)
+def _fields(model: Type[BaseModel]) -> Tuple[str, ...]:
+    return tuple(model.model_fields)
+
+
+def dump_row(model: Type[BaseModel], row: Any) -> Dict[str, Any]:
+    """One trusted ORM row shaped like `model`, without validation"""
+    return {name: getattr(row, name, None) for name in _fields(model)}
+
+
+def dump_rows(model: Type[BaseModel], rows: Iterable[Any]) -> List[Dict[str, Any]]:
+    """Trusted ORM rows shaped like `model`, without validation"""
+    fields = _fields(model)
+    return [{name: getattr(row, name, None) for name in fields} for row in rows]
+
+
+class RowsResponse(FastJSONResponse):
+    """List endpoint response for trusted rows; keep `response_model` for the docs"""
+
+    def __init__(self, model: Type[BaseModel], rows: Iterable[Any], **kwargs):
+        super().__init__(dump_rows(model, rows), **kwargs)
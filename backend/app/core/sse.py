@@ -0,0 +1,38 @@
+"""Server-sent events over a streaming response
+
+Each event is `event: <name>` plus one `data:` line of JSON. Streams are
+sent uncompressed and unbuffered (X-Accel-Buffering for nginx), so every
+event reaches the client as soon as it is produced.
+"""
+from typing import Any, AsyncIterator
+
+from fastapi.responses import StreamingResponse
+
+from app.core.responses import dumps
+
+SSE_MEDIA_TYPE = "text/event-stream"
+
+# Comment line: ignored by clients, keeps idle connections open
+SSE_PING = b": ping\n\n"
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
+
+
+def sse_event(event: str, data: Any) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+async def single_chunk(text: str) -> AsyncIterator[str]:
+    """A ready answer as a one-chunk stream"""
+    yield text
+
+
+def sse_response(events: AsyncIterator[bytes], **headers: str) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type=SSE_MEDIA_TYPE,
+        headers={**SSE_HEADERS, **headers},
+    )
@@ -0,0 +1,334 @@
+"""Redis-backed resume processing queue with priority lanes and fair share
+
+Jobs wait in four lanes, served in strict priority order:
+
+    interactive (uploads) > rescoring > bulk (imports) > backfill
+
+so a large import never delays a resume a recruiter has just uploaded.
+Within a lane, jobs are kept in one FIFO list per (organization, vacancy)
+flow. Workers take the least recently served organization, then its
+least recently served vacancy; a 2,000-resume import of one vacancy
+gets one turn per round, like every other vacancy and tenant with work
+in the lane.
+
+Enqueue and pop are Lua scripts, so concurrent workers never see a
+half-updated lane. All keys share the `{queue}` hash tag, so they map
+to one Redis Cluster slot. Enqueue declares every key it touches; pop
+only learns which flow is next while it runs, so it declares the fixed
+and per-lane keys and derives the tenant and flow keys from the lane
+prefix. That works on Redis Cluster because the keys share the slot, but
+is outside what Redis guarantees for undeclared keys: proxies that route
+scripts strictly by KEYS (or a future Redis that enforces declarations)
+are not supported.
+
+A job is queued at most once at a time. Popped jobs stay in a running
+set until acknowledged, scored by their last heartbeat: the worker
+touches a job while it runs, and only jobs of a crashed worker go
+TASK_QUEUE_VISIBILITY_SECONDS without one and are re-queued. A worker
+puts a job back in its flow when the organization has no free task slot,
+and re-queues a failed job up to TASK_QUEUE_MAX_ATTEMPTS times. Like the
+quotas, a Redis outage degrades instead of failing: `enqueue` returns
+None and the caller processes the work itself.
+
+The worker is app/tasks/worker.py.
+"""
+import json
+import logging
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field, replace
+from enum import Enum
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+from sqlmodel import select
+
+from app.core.config import settings
+from app.core.database import async_session
+from app.models.candidate import Candidate
+from app.models.resume import Resume
+
+logger = logging.getLogger(__name__)
+
+# Hash tag: every queue key maps to the same Redis Cluster slot
+KEY_PREFIX = "{queue}"
+PENDING_KEY = f"{KEY_PREFIX}:pending"
+RUNNING_KEY = f"{KEY_PREFIX}:running"
+SEQ_KEY = f"{KEY_PREFIX}:seq"
+ENQUEUE_CHUNK = 500
+
+
+class Lane(str, Enum):
+    """Queue lanes, highest priority first"""
+    INTERACTIVE = "interactive"
+    RESCORING = "rescoring"
+    BULK = "bulk"
+    BACKFILL = "backfill"
+
+
+def lane_prefix(lane: Lane) -> str:
+    return f"{KEY_PREFIX}:{lane.value}"
+
+
+def lane_keys(lane: Lane) -> List[str]:
+    """The lane's tenant set and depth counter"""
+    return [f"{lane_prefix(lane)}:tenants", f"{lane_prefix(lane)}:depth"]
+
+
+def flow_keys(lane: Lane, organization_id: int, vacancy_id: int) -> List[str]:
+    """The flow's job list and its organization's vacancy set (as built by _POP)"""
+    tenant_key = f"{lane_prefix(lane)}:tenant:{organization_id}"
+    return [f"{lane_prefix(lane)}:flow:{organization_id}:{vacancy_id}", tenant_key]
+
+
+# KEYS: pending set, sequence, lane tenants, lane depth, then (flow, tenant) per job
+# ARGV: (organization, vacancy, dedupe key, job) per job
+_ENQUEUE = """
+local queued = 0
+for n = 0, #ARGV / 4 - 1 do
+    local tenant, vacancy, key, job = ARGV[4 * n + 1], ARGV[4 * n + 2], ARGV[4 * n + 3], ARGV[4 * n + 4]
+    if redis.call('SADD', KEYS[1], key) == 1 then
+        local seq = redis.call('INCR', KEYS[2])
+        redis.call('RPUSH', KEYS[5 + 2 * n], job)
+        redis.call('ZADD', KEYS[3], 'NX', seq, tenant)
+        redis.call('ZADD', KEYS[6 + 2 * n], 'NX', seq, vacancy)
+        queued = queued + 1
+    end
+end
+redis.call('INCRBY', KEYS[4], queued)
+return queued
+"""
+
+# KEYS: pending set, running set, sequence, then (tenants, depth) per lane
+# ARGV: lane prefixes by priority, then the current time; returns {job, lane depth}
+_POP = """
+local now = ARGV[#ARGV]
+for i = 1, #ARGV - 1 do
+    local p = ARGV[i]
+    local tenants = KEYS[2 + 2 * i]
+    local tenant = redis.call('ZRANGE', tenants, 0, 0)[1]
+    while tenant do
+        local tenant_key = p .. ':tenant:' .. tenant
+        local vacancy = redis.call('ZRANGE', tenant_key, 0, 0)[1]
+        local job = nil
+        if vacancy then
+            local flow = p .. ':flow:' .. tenant .. ':' .. vacancy
+            job = redis.call('LPOP', flow)
+            local seq = redis.call('INCR', KEYS[3])
+            if redis.call('LLEN', flow) == 0 then
+                redis.call('ZREM', tenant_key, vacancy)
+            else
+                redis.call('ZADD', tenant_key, seq, vacancy)
+            end
+            if redis.call('ZCARD', tenant_key) > 0 then
+                redis.call('ZADD', tenants, seq, tenant)
+            else
+                redis.call('ZREM', tenants, tenant)
+            end
+        else
+            redis.call('ZREM', tenants, tenant)
+        end
+        if job then
+            local depth = redis.call('DECR', KEYS[3 + 2 * i])
+            redis.call('SREM', KEYS[1], cjson.decode(job)['key'])
+            redis.call('ZADD', KEYS[2], now, job)
+            return {job, depth}
+        end
+        tenant = redis.call('ZRANGE', tenants, 0, 0)[1]
+    end
+end
+return false
+"""
+
+
+@dataclass
+class Job:
+    """Task run by the worker over resumes of one (organization, vacancy) flow"""
+    task: str
+    resume_ids: List[int]
+    lane: Lane
+    organization_id: int
+    vacancy_id: int
+    enqueued_at: float = field(default_factory=time.time)
+    # Failed runs so far; the job is given up after TASK_QUEUE_MAX_ATTEMPTS
+    attempts: int = 0
+    raw: str = field(default="", repr=False)
+
+    @property
+    def key(self) -> str:
+        return f"{self.task}:{','.join(map(str, self.resume_ids))}"
+
+    def dumps(self) -> str:
+        return json.dumps({
+            "task": self.task,
+            "resume_ids": self.resume_ids,
+            "lane": self.lane.value,
+            "organization_id": self.organization_id,
+            "vacancy_id": self.vacancy_id,
+            "enqueued_at": self.enqueued_at,
+            "attempts": self.attempts,
+            "key": self.key,
+        })
+
+    @classmethod
+    def loads(cls, raw: str) -> "Job":
+        data = json.loads(raw)
+        return cls(
+            task=data["task"],
+            resume_ids=data["resume_ids"],
+            lane=Lane(data["lane"]),
+            organization_id=data["organization_id"],
+            vacancy_id=data["vacancy_id"],
+            enqueued_at=data["enqueued_at"],
+            attempts=data.get("attempts", 0),
+            raw=raw,
+        )
+
+
+async def resume_flows(resume_ids: Sequence[int]) -> Dict[Tuple[int, int], List[int]]:
+    """Resume IDs by (organization, vacancy) of their candidates, in the given order"""
+    async with async_session() as session:
+        result = await session.execute(
+            select(Resume.id, Candidate.organization_id, Candidate.vacancy_id)
+            .join(Candidate, Candidate.id == Resume.candidate_id)
+            .where(Resume.id.in_(resume_ids))
+        )
+        flow_of = {resume_id: (organization_id, vacancy_id) for resume_id, organization_id, vacancy_id in result.all()}
+
+    flows: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+    for resume_id in resume_ids:
+        if resume_id in flow_of:
+            flows[flow_of[resume_id]].append(resume_id)
+    return flows
+
+
+class TaskQueue:
+    def __init__(self, redis_url: str, enabled: bool = True):
+        self.redis_url = redis_url
+        self.enabled = enabled
+        self._redis: Optional[aioredis.Redis] = None
+        self._enqueue = None
+        self._pop = None
+
+    @property
+    def redis(self) -> aioredis.Redis:
+        if self._redis is None:
+            self._redis = aioredis.from_url(self.redis_url)
+            self._enqueue = self._redis.register_script(_ENQUEUE)
+            self._pop = self._redis.register_script(_POP)
+        return self._redis
+
+    def _enqueue_call(self, lane: Lane, jobs: List[Job], client):
+        keys = [PENDING_KEY, SEQ_KEY, *lane_keys(lane)]
+        args: List = []
+        for job in jobs:
+            keys += flow_keys(lane, job.organization_id, job.vacancy_id)
+            args += [job.organization_id, job.vacancy_id, job.key, job.dumps()]
+        return self._enqueue(keys=keys, args=args, client=client)
+
+    async def _push(self, lane: Lane, jobs: List[Job]) -> int:
+        redis = self.redis
+        queued = 0
+        for start in range(0, len(jobs), ENQUEUE_CHUNK):
+            queued += await self._enqueue_call(lane, jobs[start:start + ENQUEUE_CHUNK], redis)
+        return queued
+
+    async def enqueue(
+        self,
+        task: str,
+        resume_ids: Sequence[int],
+        lane: Lane,
+        batch_size: int = 1,
+    ) -> Optional[int]:
+        """Queue `task` over resumes, `batch_size` resumes of a vacancy per job
+
+        Returns how many jobs were newly queued (already queued ones are
+        skipped), or None if the queue is disabled or unavailable - the
+        caller then runs the task itself.
+        """
+        if not self.enabled:
+            return None
+        if not resume_ids:
+            return 0
+
+        jobs = [
+            Job(task, ids[start:start + batch_size], lane, organization_id, vacancy_id)
+            for (organization_id, vacancy_id), ids in (await resume_flows(resume_ids)).items()
+            for start in range(0, len(ids), batch_size)
+        ]
+        try:
+            return await self._push(lane, jobs)
+        except RedisError:
+            logger.warning("Task queue unavailable; %s not queued", task, exc_info=True)
+            return None
+
+    async def pop(self) -> Optional[Tuple[Job, int]]:
+        """Next job by lane priority and fair share, with its lane's remaining depth"""
+        redis = self.redis
+        popped = await self._pop(
+            keys=[PENDING_KEY, RUNNING_KEY, SEQ_KEY] + [key for lane in Lane for key in lane_keys(lane)],
+            args=[lane_prefix(lane) for lane in Lane] + [time.time()],
+            client=redis,
+        )
+        if not popped:
+            return None
+        raw, depth = popped
+        return Job.loads(raw.decode() if isinstance(raw, bytes) else raw), int(depth)
+
+    async def touch(self, job: Job) -> bool:
+        """Heartbeat of a running job, so `reclaim` leaves it alone
+
+        False if the job is no longer in the running set (already
+        reclaimed as stale).
+        """
+        try:
+            return bool(await self.redis.zadd(RUNNING_KEY, {job.raw: time.time()}, xx=True, ch=True))
+        except RedisError:
+            logger.warning("Failed to refresh job %s", job.key, exc_info=True)
+            return True
+
+    async def requeue(self, job: Job, failed: bool = False) -> bool:
+        """Put a popped job back at the end of its flow
+
+        A `failed` run counts towards the job's attempts. Returns False if
+        Redis is unavailable; the job then stays running until reclaimed.
+        """
+        try:
+            # One transaction: the job is never lost, and never dropped from
+            # the running set after another worker has popped it again
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.zrem(RUNNING_KEY, job.raw)
+                await self._enqueue_call(job.lane, [replace(job, attempts=job.attempts + failed)], pipe)
+                await pipe.execute()
+        except RedisError:
+            logger.warning("Failed to re-queue job %s", job.key, exc_info=True)
+            return False
+        return True
+
+    async def ack(self, job: Job) -> None:
+        """Job done with (finished, or given up on); drop it from the running set"""
+        try:
+            await self.redis.zrem(RUNNING_KEY, job.raw)
+        except RedisError:
+            logger.warning("Failed to acknowledge job %s", job.key, exc_info=True)
+
+    async def reclaim(self) -> int:
+        """Re-queue jobs without a heartbeat for the visibility timeout (dead workers)"""
+        cutoff = time.time() - settings.TASK_QUEUE_VISIBILITY_SECONDS
+        reclaimed = 0
+        for raw in await self.redis.zrangebyscore(RUNNING_KEY, "-inf", cutoff):
+            # Only the worker that removes the entry re-queues it
+            if await self.redis.zrem(RUNNING_KEY, raw):
+                job = Job.loads(raw.decode() if isinstance(raw, bytes) else raw)
+                logger.warning("Re-queueing stale job %s (%s lane)", job.key, job.lane.value)
+                reclaimed += await self._push(job.lane, [job])
+        return reclaimed
+
+    async def depths(self) -> Dict[str, int]:
+        """Queued jobs per lane"""
+        values = await self.redis.mget([lane_keys(lane)[1] for lane in Lane])
+        return {lane.value: int(value or 0) for lane, value in zip(Lane, values)}
+
+
+task_queue = TaskQueue(redis_url=settings.REDIS_URL, enabled=settings.TASK_QUEUE_ENABLED)
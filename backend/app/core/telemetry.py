@@ -0,0 +1,288 @@
+"""Tracing and Prometheus metrics for the hot paths
+
+`span()` / `traced()` time an operation into the `hr_operation_duration_seconds`
+histogram and, when OpenTelemetry is installed and TRACING_ENABLED is set,
+also open a span (exported over OTLP to OTEL_EXPORTER_OTLP_ENDPOINT, e.g. a
+local collector on http://localhost:4317). Without OpenTelemetry only the
+metrics are recorded.
+
+Instrumented: every HTTP route (MetricsMiddleware), SQLAlchemy executions
+(instrument_engine), AIService, ResumeParser, StorageService and the
+per-organization background task slots and the resume processing queue
+(wait time and depth per lane).
+"""
+import functools
+import inspect
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+try:
+    from opentelemetry import trace
+    from opentelemetry.trace import Status, StatusCode
+except ImportError:  # optional dependency
+    trace = None
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "hr_http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_QUERY_DURATION = Histogram(
+    "hr_db_query_duration_seconds",
+    "SQL statement execution time",
+    ["statement"],
+    buckets=LATENCY_BUCKETS,
+)
+OPERATION_DURATION = Histogram(
+    "hr_operation_duration_seconds",
+    "Duration of instrumented operations (LLM, parsing, storage)",
+    ["operation", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "hr_llm_tokens_total",
+    "Tokens consumed by LLM calls",
+    ["model", "operation", "kind"],
+)
+PROMPT_TEXT_TOKENS = Histogram(
+    "hr_prompt_text_tokens",
+    "Resume/vacancy tokens sent per LLM call after cleaning and fitting",
+    ["operation"],
+    buckets=(250, 500, 1000, 2000, 3000, 4000, 6000, 8000, 16000),
+)
+PROMPT_TOKENS_SAVED = Counter(
+    "hr_prompt_tokens_saved_total",
+    "Tokens removed from prompts by cleaning and fitting",
+    ["operation"],
+)
+LLM_OUTPUT_VALIDATIONS = Counter(
+    "hr_llm_output_validations_total",
+    "Structured LLM answers by validation outcome",
+    ["operation", "outcome"],  # valid | repaired | defaulted | failed
+)
+DESCRIPTION_CACHE_LOOKUPS = Counter(
+    "hr_description_cache_lookups_total",
+    "Vacancy description cache lookups",
+    ["result"],  # exact | similar | miss
+)
+LLM_CIRCUIT_STATE = Gauge(
+    "hr_llm_circuit_state",
+    "AI provider circuit breaker state (0 closed, 1 half-open, 2 open)",
+    ["circuit"],  # chat | embedding
+)
+LLM_CIRCUIT_REJECTIONS = Counter(
+    "hr_llm_circuit_rejections_total",
+    "LLM calls refused by an open circuit breaker",
+    ["circuit"],
+)
+TASKS_WAITING = Gauge(
+    "hr_background_tasks_waiting",
+    "Background tasks waiting for an organization task slot",
+)
+TASKS_RUNNING = Gauge(
+    "hr_background_tasks_running",
+    "Background tasks holding an organization task slot",
+)
+
+TASK_QUEUE_WAIT = Histogram(
+    "hr_task_queue_wait_seconds",
+    "Time resume processing jobs wait in the queue",
+    ["lane"],  # interactive | rescoring | bulk | backfill
+    buckets=(0.5, 1, 5, 15, 30, 60, 300, 900, 1800, 3600, 4 * 3600, 12 * 3600),
+)
+TASK_QUEUE_DEPTH = Gauge(
+    "hr_task_queue_depth",
+    "Jobs queued per lane, as last seen by this worker",
+    ["lane"],
+)
+
+_tracer = None
+
+
+def setup_tracing() -> None:
+    """Configure the OTLP exporter once, if tracing is enabled and installed"""
+    global _tracer
+    if not settings.TRACING_ENABLED or trace is None:
+        return
+
+    try:
+        from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError:
+        logger.warning("TRACING_ENABLED is set but the OpenTelemetry SDK/OTLP exporter is not installed")
+        return
+
+    provider = TracerProvider(resource=Resource.create({"service.name": settings.OTEL_SERVICE_NAME}))
+    exporter = (
+        OTLPSpanExporter(endpoint=settings.OTEL_EXPORTER_OTLP_ENDPOINT)
+        if settings.OTEL_EXPORTER_OTLP_ENDPOINT else OTLPSpanExporter()
+    )
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    _tracer = trace.get_tracer("app")
+
+
+@contextmanager
+def span(operation: str, **attributes: Any) -> Iterator[Optional[Any]]:
+    """Time an operation; yields the OpenTelemetry span (or None)"""
+    started = time.perf_counter()
+    outcome = "ok"
+    otel_span = None
+    context = _tracer.start_as_current_span(operation, attributes=attributes) if _tracer else None
+
+    try:
+        if context is not None:
+            otel_span = context.__enter__()
+        yield otel_span
+    except BaseException as e:
+        outcome = "error"
+        if otel_span is not None:
+            otel_span.record_exception(e)
+            otel_span.set_status(Status(StatusCode.ERROR, str(e)))
+        raise
+    finally:
+        if context is not None:
+            context.__exit__(None, None, None)
+        OPERATION_DURATION.labels(operation, outcome).observe(time.perf_counter() - started)
+
+
+def traced(operation: str) -> Callable:
+    """Decorator form of span() for sync and async functions"""
+    def decorator(fn: Callable) -> Callable:
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(operation):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(operation):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def record_llm_usage(model: str, operation: str, usage: Any) -> None:
+    """Count prompt/completion tokens from an OpenAI `usage` object"""
+    if usage is None:
+        return
+    for kind in ("prompt_tokens", "completion_tokens"):
+        tokens = getattr(usage, kind, None)
+        if tokens:
+            LLM_TOKENS.labels(model, operation, kind.split("_")[0]).inc(tokens)
+
+
+def instrument_engine(engine) -> None:
+    """Histogram (and spans) for every statement executed by an async engine"""
+    from sqlalchemy import event
+
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started: Dict[str, Any] = {"time": time.perf_counter()}
+        if _tracer is not None:
+            started["span"] = _tracer.start_span(
+                "db.query",
+                attributes={"db.system": "postgresql", "db.statement": statement[:2000]},
+            )
+        conn.info.setdefault("query_timings", []).append(started)
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        timings = conn.info.get("query_timings")
+        if not timings:
+            return
+        started = timings.pop()
+        # Label by verb only; full statements would explode label cardinality
+        verb = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "UNKNOWN"
+        DB_QUERY_DURATION.labels(verb).observe(time.perf_counter() - started["time"])
+        if "span" in started:
+            started["span"].end()
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(exception_context):
+        conn = exception_context.connection
+        timings = conn.info.get("query_timings") if conn is not None else None
+        if timings:
+            started = timings.pop()
+            if "span" in started:
+                started["span"].set_status(Status(StatusCode.ERROR))
+                started["span"].end()
+
+
+def route_template(scope: Scope) -> str:
+    """Matched route as a template ("/vacancies/{vacancy_id}"), never the raw path
+
+    Rebuilt from the concrete path and path params, since routes of
+    included routers do not carry the prefix in every FastAPI version.
+    """
+    if scope.get("route") is None:
+        return "unmatched"
+    names = {str(value): name for name, value in (scope.get("path_params") or {}).items()}
+    return "/".join(
+        f"{{{names[segment]}}}" if segment in names else segment
+        for segment in scope["path"].split("/")
+    )
+
+
+class MetricsMiddleware:
+    """Per-route latency histogram and one server span per request"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        context = _tracer.start_as_current_span(
+            f"{scope['method']} {scope['path']}", kind=trace.SpanKind.SERVER
+        ) if _tracer else None
+        otel_span = context.__enter__() if context is not None else None
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Templates, not raw paths, keep label cardinality bounded
+            route_path = route_template(scope)
+            if otel_span is not None:
+                otel_span.update_name(f"{scope['method']} {route_path}")
+                otel_span.set_attribute("http.route", route_path)
+                otel_span.set_attribute("http.status_code", status_code)
+                context.__exit__(None, None, None)
+            HTTP_REQUEST_DURATION.labels(scope["method"], route_path, str(status_code)).observe(
+                time.perf_counter() - started
+            )
+
+
+def metrics_response() -> Response:
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
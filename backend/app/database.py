@@ -1,12 +1,14 @@
 from sqlmodel import SQLModel, create_engine, Session
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
+from app.core.telemetry import instrument_engine
 
 # Sync engine for migrations
 engine = create_engine(
     settings.DATABASE_URL,
-    echo=True,
+    echo=settings.SQL_ECHO,
     pool_pre_ping=True
 )
 
@@ -14,9 +16,10 @@ engine = create_engine(
 async_database_url = settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://")
 async_engine = create_async_engine(
     async_database_url,
-    echo=True,
+    echo=settings.SQL_ECHO,
     future=True
 )
+instrument_engine(async_engine)
 
 async_session_maker = sessionmaker(
     async_engine, 
@@ -29,12 +32,22 @@ async def init_db():
     """Initialize database tables"""
     async with async_engine.begin() as conn:
         # Import all models here to register them
+        from app.models.organization import Organization
         from app.models.user import User
         from app.models.vacancy import Vacancy
         from app.models.candidate import Candidate
         from app.models.resume import Resume
         from app.models.stage import Stage
+        from app.models.skill import CandidateSkill
+        from app.models.talent_pool import TalentSuggestion
+        from app.models.duplicate import CandidateIdentityKey, DuplicateCandidate
+        from app.models.pipeline import CandidateStage, CandidateStageInterval
+        from app.models.analytics import StageDailyStat, StageDurationBucket, SourceDailyStat
+        from app.models.llm_usage import LLMUsage
+        from app.models.scoring_batch import ScoringBatch
+        from app.models.description_cache import DescriptionCacheEntry
         
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
         await conn.run_sync(SQLModel.metadata.create_all)
 
 
@@ -3,6 +3,8 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from app.config import settings
+from app.core.compression import CompressionMiddleware
+from app.core.telemetry import MetricsMiddleware, metrics_response, setup_tracing
 from app.database import init_db
 from app.api import auth, vacancies, candidates, pipeline, matching
 
@@ -11,6 +13,7 @@ from app.api import auth, vacancies, candidates, pipeline, matching
 async def lifespan(app: FastAPI):
     """Lifecycle events"""
     # Startup
+    setup_tracing()
     await init_db()
     yield
     # Shutdown
@@ -32,6 +35,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compression (JSON boards and streamed exports)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_enabled=settings.COMPRESSION_BROTLI_ENABLED,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    )
+
+# Route latency histograms and request spans (outermost, so compression is timed too)
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 app.include_router(vacancies.router, prefix="/vacancies", tags=["Vacancies"])
@@ -49,6 +65,12 @@ async def root():
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return metrics_response()
+
+
 @app.get("/health")
 async def health():
     return {"status": "healthy"}
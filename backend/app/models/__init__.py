@@ -1,7 +1,20 @@
+from app.models.organization import Organization
 from app.models.user import User
 from app.models.vacancy import Vacancy
 from app.models.candidate import Candidate
 from app.models.resume import Resume
 from app.models.stage import Stage
+from app.models.skill import CandidateSkill
+from app.models.talent_pool import TalentSuggestion
+from app.models.duplicate import CandidateIdentityKey, DuplicateCandidate
+from app.models.analytics import StageDailyStat, StageDurationBucket, SourceDailyStat
+from app.models.llm_usage import LLMUsage
+from app.models.scoring_batch import ScoringBatch
+from app.models.description_cache import DescriptionCacheEntry
 
-__all__ = ["User", "Vacancy", "Candidate", "Resume", "Stage"]
+__all__ = [
+    "Organization", "User", "Vacancy", "Candidate", "Resume", "Stage",
+    "CandidateSkill", "TalentSuggestion", "CandidateIdentityKey", "DuplicateCandidate",
+    "StageDailyStat", "StageDurationBucket", "SourceDailyStat", "LLMUsage", "ScoringBatch",
+    "DescriptionCacheEntry",
+]
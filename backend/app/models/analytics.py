@@ -0,0 +1,44 @@
+from sqlmodel import SQLModel, Field
+from datetime import date, datetime
+
+
+class StageDailyStat(SQLModel, table=True):
+    """Per-vacancy, per-day stage movement counters (funnel aggregates)"""
+    __tablename__ = "stage_daily_stats"
+
+    vacancy_id: int = Field(foreign_key="vacancies.id", primary_key=True)
+    day: date = Field(primary_key=True)
+    stage_slug: str = Field(primary_key=True, max_length=50)
+
+    entries: int = Field(default=0)
+    exits: int = Field(default=0)
+    # Total time spent in the stage by candidates who left it that day
+    time_in_stage_seconds: float = Field(default=0.0)
+
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class StageDurationBucket(SQLModel, table=True):
+    """Histogram of time-in-stage per vacancy/day/stage, for median estimates"""
+    __tablename__ = "stage_duration_buckets"
+
+    vacancy_id: int = Field(foreign_key="vacancies.id", primary_key=True)
+    day: date = Field(primary_key=True)
+    stage_slug: str = Field(primary_key=True, max_length=50)
+    bucket: int = Field(primary_key=True)  # index into DURATION_BUCKET_EDGES_HOURS
+
+    count: int = Field(default=0)
+
+
+class SourceDailyStat(SQLModel, table=True):
+    """Per-vacancy, per-day applications and offers by candidate source"""
+    __tablename__ = "source_daily_stats"
+
+    vacancy_id: int = Field(foreign_key="vacancies.id", primary_key=True)
+    day: date = Field(primary_key=True)
+    source: str = Field(primary_key=True, max_length=100)
+
+    applications: int = Field(default=0)
+    offers: int = Field(default=0)
+
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -1,4 +1,5 @@
 from sqlmodel import SQLModel, Field, Column, JSON
+from sqlalchemy import Index, UniqueConstraint
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 from enum import Enum
@@ -15,17 +16,37 @@ class CandidateStatus(str, Enum):
 
 class Candidate(SQLModel, table=True):
     __tablename__ = "candidates"
+    __table_args__ = (
+        UniqueConstraint(
+            "organization_id", "source", "external_id",
+            name="uq_candidates_org_source_external_id",
+        ),
+        # Tenant-leading: every candidate query is scoped to one organization
+        Index("ix_candidates_org_vacancy_score", "organization_id", "vacancy_id", "match_score"),
+        Index("ix_candidates_org_score", "organization_id", "match_score"),
+        Index("ix_candidates_org_email", "organization_id", "email"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     
+    # Denormalized from the vacancy so tenant filters need no join
+    organization_id: int = Field(foreign_key="organizations.id")
+    
     # Basic info
     full_name: Optional[str] = None
-    email: Optional[str] = Field(default=None, index=True)
+    email: Optional[str] = None
     phone: Optional[str] = None
     
     # Vacancy relation
     vacancy_id: int = Field(foreign_key="vacancies.id", index=True)
     
+    # Origin: "upload" or "import:<ats>", with the record ID in that system
+    source: str = Field(default="upload")
+    external_id: Optional[str] = None
+    # User who created, uploaded or imported the application; LLM usage of
+    # its processing is attributed to them
+    uploaded_by: Optional[int] = Field(default=None, foreign_key="users.id")
+    
     # Status & Stage
     status: CandidateStatus = Field(default=CandidateStatus.NEW)
     current_stage_id: Optional[int] = Field(default=None, foreign_key="stages.id")
@@ -38,6 +59,8 @@ class Candidate(SQLModel, table=True):
     
     # AI Analysis
     match_score: Optional[float] = None  # 0-100
+    # Skill-overlap pre-score while AI screening is deferred (provider outage)
+    match_score_preliminary: bool = Field(default=False)
     ai_summary: Optional[str] = None
     strengths: List[str] = Field(default=[], sa_column=Column(JSON))
     weaknesses: List[str] = Field(default=[], sa_column=Column(JSON))
@@ -45,3 +68,41 @@ class Candidate(SQLModel, table=True):
     # Metadata
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class CandidateCreate(SQLModel):
+    vacancy_id: int
+    full_name: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+
+
+class CandidateUpdate(SQLModel):
+    full_name: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    status: Optional[CandidateStatus] = None
+    current_stage_id: Optional[int] = None
+
+
+class CandidateRead(SQLModel):
+    id: int
+    full_name: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    vacancy_id: int
+    source: str
+    uploaded_by: Optional[int] = None
+    status: CandidateStatus
+    current_stage_id: Optional[int] = None
+    skills: List[str] = []
+    experience_years: Optional[int] = None
+    education: Optional[List[Dict[str, Any]]] = None
+    work_experience: Optional[List[Dict[str, Any]]] = None
+    match_score: Optional[float] = None
+    match_score_preliminary: bool = False
+    ai_summary: Optional[str] = None
+    strengths: List[str] = []
+    weaknesses: List[str] = []
+    created_at: datetime
+    updated_at: datetime
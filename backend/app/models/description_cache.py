@@ -0,0 +1,38 @@
+from sqlmodel import SQLModel, Field, Column
+from sqlalchemy import Index, Text, UniqueConstraint
+from pgvector.sqlalchemy import Vector
+from datetime import datetime
+from typing import Optional, List
+from app.core.config import settings
+
+
+class DescriptionCacheEntry(SQLModel, table=True):
+    """Generated vacancy description, reused for the same or a similar vacancy"""
+    __tablename__ = "description_cache"
+    __table_args__ = (
+        UniqueConstraint("organization_id", "cache_key", name="uq_description_cache_org_key"),
+        Index(
+            "ix_description_cache_embedding_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+        ),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    organization_id: int = Field(foreign_key="organizations.id", index=True)
+
+    # sha256 of normalized title + sorted skills + requirements
+    cache_key: str = Field(max_length=64)
+    title: str = Field(max_length=255)
+    # Embedding of the same inputs, for the similarity lookup
+    embedding: Optional[List[float]] = Field(
+        default=None, sa_column=Column(Vector(settings.EMBEDDING_DIMENSIONS))
+    )
+
+    description: str = Field(sa_column=Column(Text, nullable=False))
+    hits: int = Field(default=0)
+
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    last_hit_at: Optional[datetime] = None
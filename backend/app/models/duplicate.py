@@ -0,0 +1,52 @@
+from sqlmodel import SQLModel, Field, Column, JSON
+from sqlalchemy import UniqueConstraint
+from datetime import datetime
+from typing import Optional, List
+from enum import Enum
+
+
+class CandidateIdentityKey(SQLModel, table=True):
+    """Blocking key -> candidate, used to find possible duplicates"""
+    __tablename__ = "candidate_identity_keys"
+
+    # Primary key is (key, candidate_id), so block lookups are index-only scans
+    key: str = Field(primary_key=True, max_length=320)
+    candidate_id: int = Field(foreign_key="candidates.id", primary_key=True, index=True)
+
+
+class DuplicateStatus(str, Enum):
+    PENDING = "pending"
+    DISMISSED = "dismissed"
+
+
+class DuplicateCandidate(SQLModel, table=True):
+    """Merge suggestion: candidate_id looks like the same person as duplicate_of_id"""
+    __tablename__ = "duplicate_candidates"
+    __table_args__ = (
+        UniqueConstraint("candidate_id", "duplicate_of_id", name="uq_duplicate_candidates_pair"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+
+    # Newer application and the earlier one it duplicates
+    candidate_id: int = Field(foreign_key="candidates.id", index=True)
+    duplicate_of_id: int = Field(foreign_key="candidates.id", index=True)
+
+    score: float  # 0-1
+    reasons: List[str] = Field(default=[], sa_column=Column(JSON))
+
+    status: DuplicateStatus = Field(default=DuplicateStatus.PENDING, index=True)
+    reviewed_by: Optional[int] = Field(default=None, foreign_key="users.id")
+
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class DuplicateCandidateRead(SQLModel):
+    id: int
+    candidate_id: int
+    duplicate_of_id: int
+    score: float
+    reasons: List[str]
+    status: DuplicateStatus
+    created_at: datetime
@@ -0,0 +1,31 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
+from datetime import datetime
+from typing import Optional
+
+
+class LLMUsage(SQLModel, table=True):
+    """Ledger of LLM calls: model, tokens, cost and latency per call"""
+    __tablename__ = "llm_usage"
+    __table_args__ = (
+        Index("ix_llm_usage_org_created", "organization_id", "created_at"),
+        # Budget checks sum a vacancy's spend before every chat call
+        Index("ix_llm_usage_vacancy_created", "vacancy_id", "created_at"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    organization_id: Optional[int] = Field(default=None, foreign_key="organizations.id")
+
+    # No foreign keys: spend history outlives deleted vacancies and candidates
+    vacancy_id: Optional[int] = None
+    candidate_id: Optional[int] = Field(default=None, index=True)
+    user_id: Optional[int] = Field(default=None, index=True)
+
+    operation: str = Field(max_length=100)  # extract_resume_data, embedding, ...
+    model: str = Field(max_length=100)
+    prompt_tokens: int = Field(default=0)
+    completion_tokens: int = Field(default=0)
+    cost_usd: float = Field(default=0.0)
+    latency_ms: int = Field(default=0)
+
+    created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,28 @@
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+from typing import Optional
+
+
+class Organization(SQLModel, table=True):
+    """Client company (tenant); every user, vacancy and candidate belongs to one"""
+    __tablename__ = "organizations"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    name: str
+    is_active: bool = Field(default=True)
+
+    # Quotas; None falls back to the TENANT_* defaults in settings
+    llm_calls_per_minute: Optional[int] = None
+    max_concurrent_tasks: Optional[int] = None
+
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class OrganizationRead(SQLModel):
+    id: int
+    name: str
+    is_active: bool
+    llm_calls_per_minute: Optional[int] = None
+    max_concurrent_tasks: Optional[int] = None
+    created_at: datetime
@@ -1,7 +1,22 @@
+from datetime import datetime
 from typing import Optional
+from sqlalchemy import Index, text
 from sqlmodel import Field, SQLModel
 from app.models.base import BaseModel
 
+# Default pipeline stages in funnel order: (slug, display name)
+DEFAULT_STAGES = [
+    ("new", "Новые"),
+    ("selected", "Отобранные"),
+    ("screening", "Скрининг"),
+    ("interview", "Интервью"),
+    ("offer", "Оффер"),
+]
+DEFAULT_STAGE_SLUGS = [slug for slug, _ in DEFAULT_STAGES]
+# Stage every application enters first
+INITIAL_STAGE = "new"
+OFFER_STAGE = "offer"
+
 
 class PipelineStage(BaseModel, table=True):
     """Pipeline stage configuration"""
@@ -17,6 +32,9 @@ class PipelineStage(BaseModel, table=True):
 class CandidateStage(BaseModel, table=True):
     """Track candidate movement through pipeline"""
     __tablename__ = "candidate_stages"
+    __table_args__ = (
+        Index("ix_candidate_stages_candidate_created", "candidate_id", "created_at"),
+    )
 
     candidate_id: int = Field(foreign_key="candidates.id")
     stage_slug: str
@@ -24,6 +42,47 @@ class CandidateStage(BaseModel, table=True):
     moved_by: int = Field(foreign_key="users.id")
 
 
+class CandidateStageInterval(SQLModel, table=True):
+    """Time a candidate spent in a stage; exited_at is NULL while still there"""
+    __tablename__ = "candidate_stage_intervals"
+    __table_args__ = (
+        # At most one open interval per candidate
+        Index(
+            "uq_candidate_stage_intervals_open",
+            "candidate_id",
+            unique=True,
+            postgresql_where=text("exited_at IS NULL"),
+        ),
+        # "Stuck in <stage> longer than N days" scans only open intervals
+        Index(
+            "ix_candidate_stage_intervals_open_stage",
+            "stage_slug",
+            "entered_at",
+            postgresql_where=text("exited_at IS NULL"),
+        ),
+        Index(
+            "ix_candidate_stage_intervals_open_vacancy",
+            "vacancy_id",
+            "stage_slug",
+            "entered_at",
+            postgresql_where=text("exited_at IS NULL"),
+        ),
+        Index("ix_candidate_stage_intervals_candidate", "candidate_id", "entered_at"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+
+    candidate_id: int = Field(foreign_key="candidates.id")
+    vacancy_id: int = Field(foreign_key="vacancies.id")
+    stage_slug: str
+
+    entered_at: datetime = Field(default_factory=datetime.utcnow)
+    exited_at: Optional[datetime] = None
+
+    # Set by the SLA scanner once the stage's time limit is exceeded
+    sla_breached_at: Optional[datetime] = None
+
+
 class PipelineStageRead(SQLModel):
     id: int
     name: str
@@ -1,18 +1,42 @@
 from sqlmodel import SQLModel, Field, Column, JSON
+from sqlalchemy import Computed, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from pgvector.sqlalchemy import Vector
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 from enum import Enum
+from app.core.config import settings
+
+# Languages indexed for full-text search over raw_text
+SEARCH_CONFIGS = ("english", "russian")
 
 
 class ResumeStatus(str, Enum):
     UPLOADED = "uploaded"
     PARSING = "parsing"
+    SCREENING = "screening"
     PARSED = "parsed"
+    # Stored and pre-scored; AI stages wait for the provider to recover
+    DEFERRED = "deferred"
     ERROR = "error"
 
 
+# Statuses a resume leaves only when processed again
+FINAL_RESUME_STATUSES = frozenset({ResumeStatus.PARSED, ResumeStatus.DEFERRED, ResumeStatus.ERROR})
+
+
 class Resume(SQLModel, table=True):
     __tablename__ = "resumes"
+    __table_args__ = (
+        Index("ix_resumes_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_resumes_embedding_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+        ),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     
@@ -27,12 +51,33 @@ class Resume(SQLModel, table=True):
     
     # Parsed content
     raw_text: Optional[str] = None
+    search_vector: Optional[Any] = Field(
+        default=None,
+        sa_column=Column(
+            TSVECTOR,
+            Computed(
+                "to_tsvector('english', coalesce(raw_text, '')) || "
+                "to_tsvector('russian', coalesce(raw_text, ''))",
+                persisted=True,
+            ),
+        ),
+    )
+    
+    # LLM extraction, reused when the candidate is scored against other vacancies
+    extracted_data: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON))
+    
+    # Set while AI stages (screening, embedding) wait for the provider to recover
+    llm_deferred_at: Optional[datetime] = Field(default=None, index=True)
     
     # Embeddings
-    embedding: Optional[List[float]] = Field(default=None, sa_column=Column(JSON))
+    embedding: Optional[List[float]] = Field(
+        default=None, sa_column=Column(Vector(settings.EMBEDDING_DIMENSIONS))
+    )
     
     # Status
     status: ResumeStatus = Field(default=ResumeStatus.UPLOADED)
+    # Client-chosen ID grouping the files of one multi-file upload
+    upload_batch: Optional[str] = Field(default=None, max_length=64, index=True)
     error_message: Optional[str] = None
     
     # Metadata
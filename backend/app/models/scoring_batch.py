@@ -0,0 +1,49 @@
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+from typing import Optional
+from enum import Enum
+
+
+class ScoringBatchStatus(str, Enum):
+    SUBMITTED = "submitted"
+    COMPLETED = "completed"  # results applied
+    FAILED = "failed"
+
+
+class ScoringBatch(SQLModel, table=True):
+    """Offline LLM batch job re-scoring or extracting a vacancy's candidates"""
+    __tablename__ = "scoring_batches"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    organization_id: int = Field(foreign_key="organizations.id", index=True)
+    vacancy_id: int = Field(foreign_key="vacancies.id", index=True)
+
+    operation: str = Field(max_length=50)  # score | extract
+    backend: str = Field(max_length=50)  # openai | local
+    external_id: str = Field(max_length=255)  # job ID at the backend
+    model: str = Field(max_length=100)
+
+    status: ScoringBatchStatus = Field(default=ScoringBatchStatus.SUBMITTED, index=True)
+    request_count: int = Field(default=0)
+    succeeded: int = Field(default=0)
+    failed: int = Field(default=0)
+    error: Optional[str] = None
+
+    created_by: Optional[int] = Field(default=None, foreign_key="users.id")
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    completed_at: Optional[datetime] = None
+
+
+class ScoringBatchRead(SQLModel):
+    id: int
+    vacancy_id: int
+    operation: str
+    backend: str
+    model: str
+    status: ScoringBatchStatus
+    request_count: int
+    succeeded: int
+    failed: int
+    error: Optional[str] = None
+    created_at: datetime
+    completed_at: Optional[datetime] = None
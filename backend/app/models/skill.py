@@ -0,0 +1,10 @@
+from sqlmodel import SQLModel, Field
+
+
+class CandidateSkill(SQLModel, table=True):
+    """Inverted index: normalized skill -> candidate"""
+    __tablename__ = "candidate_skills"
+
+    # Primary key is (skill, candidate_id), so lookups by skill are index-only scans
+    skill: str = Field(primary_key=True, max_length=100)
+    candidate_id: int = Field(foreign_key="candidates.id", primary_key=True, index=True)
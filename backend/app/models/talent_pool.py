@@ -0,0 +1,49 @@
+from sqlmodel import SQLModel, Field, Column, JSON
+from sqlalchemy import UniqueConstraint
+from datetime import datetime
+from typing import Optional, List
+
+
+class TalentSuggestion(SQLModel, table=True):
+    """Past applicant suggested for a new vacancy (talent rediscovery)"""
+    __tablename__ = "talent_suggestions"
+    __table_args__ = (
+        UniqueConstraint("vacancy_id", "identity_key", name="uq_talent_suggestions_vacancy_identity"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+
+    # Target vacancy and the historical application being suggested
+    vacancy_id: int = Field(foreign_key="vacancies.id", index=True)
+    candidate_id: int = Field(foreign_key="candidates.id", index=True)
+    source_vacancy_id: int = Field(foreign_key="vacancies.id")
+
+    # Person-level dedup key (normalized email / phone)
+    identity_key: str
+
+    # Scores
+    score: float = Field(index=True)  # 0-100
+    semantic_similarity: Optional[float] = None  # 0-1 cosine similarity
+    skill_score: Optional[float] = None  # 0-100
+    matched_skills: List[str] = Field(default=[], sa_column=Column(JSON))
+    missing_skills: List[str] = Field(default=[], sa_column=Column(JSON))
+
+    # On-demand LLM assessment against this vacancy (from the stored extraction)
+    ai_match_score: Optional[float] = None  # 0-100
+    ai_summary: Optional[str] = None
+
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class TalentSuggestionRead(SQLModel):
+    candidate_id: int
+    source_vacancy_id: int
+    full_name: Optional[str] = None
+    email: Optional[str] = None
+    score: float
+    semantic_similarity: Optional[float] = None
+    skill_score: Optional[float] = None
+    matched_skills: List[str] = []
+    missing_skills: List[str] = []
+    ai_match_score: Optional[float] = None
+    ai_summary: Optional[str] = None
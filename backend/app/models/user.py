@@ -18,7 +18,25 @@ class User(SQLModel, table=True):
     email: str = Field(unique=True, index=True)
     hashed_password: str
     full_name: str
+    organization_id: int = Field(foreign_key="organizations.id", index=True)
     role: UserRole = Field(default=UserRole.RECRUITER)
     is_active: bool = Field(default=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class UserCreate(SQLModel):
+    email: str
+    password: str
+    full_name: str
+    role: UserRole = UserRole.RECRUITER
+
+
+class UserRead(SQLModel):
+    id: int
+    email: str
+    full_name: str
+    organization_id: int
+    role: UserRole
+    is_active: bool
+    created_at: datetime
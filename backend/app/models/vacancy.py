@@ -1,7 +1,10 @@
 from sqlmodel import SQLModel, Field, Column, JSON
+from sqlalchemy import Index
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 from enum import Enum
+from pgvector.sqlalchemy import Vector
+from app.core.config import settings
 
 
 class VacancyStatus(str, Enum):
@@ -13,8 +16,13 @@ class VacancyStatus(str, Enum):
 
 class Vacancy(SQLModel, table=True):
     __tablename__ = "vacancies"
+    __table_args__ = (
+        # Tenant-leading: every vacancy query is scoped to one organization
+        Index("ix_vacancies_org_status_created", "organization_id", "status", "created_at"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
+    organization_id: int = Field(foreign_key="organizations.id")
     title: str = Field(index=True)
     description: Optional[str] = None
     requirements: Optional[str] = None
@@ -29,10 +37,62 @@ class Vacancy(SQLModel, table=True):
     
     # AI Generated
     ai_generated_description: Optional[str] = None
-    embedding: Optional[List[float]] = Field(default=None, sa_column=Column(JSON))
+    # AI spend allowance in USD; None falls back to LLM_VACANCY_BUDGET_USD
+    ai_budget_usd: Optional[float] = None
+    embedding: Optional[List[float]] = Field(
+        default=None, sa_column=Column(Vector(settings.EMBEDDING_DIMENSIONS))
+    )
     
     # Metadata
     status: VacancyStatus = Field(default=VacancyStatus.DRAFT)
     created_by: int = Field(foreign_key="users.id")
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class VacancyCreate(SQLModel):
+    title: str
+    description: Optional[str] = None
+    requirements: Optional[str] = None
+    skills: List[str] = []
+    required_experience_years: Optional[int] = None
+    location: Optional[str] = None
+    employment_type: Optional[str] = None
+    salary_min: Optional[int] = None
+    salary_max: Optional[int] = None
+    ai_budget_usd: Optional[float] = Field(default=None, ge=0)
+    status: VacancyStatus = VacancyStatus.DRAFT
+
+
+class VacancyUpdate(SQLModel):
+    title: Optional[str] = None
+    description: Optional[str] = None
+    requirements: Optional[str] = None
+    skills: Optional[List[str]] = None
+    required_experience_years: Optional[int] = None
+    location: Optional[str] = None
+    employment_type: Optional[str] = None
+    salary_min: Optional[int] = None
+    salary_max: Optional[int] = None
+    ai_budget_usd: Optional[float] = Field(default=None, ge=0)
+    status: Optional[VacancyStatus] = None
+
+
+class VacancyRead(SQLModel):
+    id: int
+    title: str
+    description: Optional[str] = None
+    requirements: Optional[str] = None
+    skills: List[str] = []
+    required_experience_years: Optional[int] = None
+    location: Optional[str] = None
+    employment_type: Optional[str] = None
+    salary_min: Optional[int] = None
+    salary_max: Optional[int] = None
+    ai_generated_description: Optional[str] = None
+    ai_budget_usd: Optional[float] = None
+    status: VacancyStatus
+    organization_id: int
+    created_by: int
+    created_at: datetime
+    updated_at: datetime
@@ -1,71 +1,404 @@
-from typing import List, Dict, Optional
-from openai import OpenAI
+from typing import Any, AsyncIterator, List, Dict, Optional, Tuple
+from dataclasses import dataclass
+import asyncio
 import json
+import threading
+import time
+from pydantic import BaseModel, ValidationError
 from app.core.config import settings
+from app.core.quotas import tenant_quotas
+from app.core.telemetry import LLM_OUTPUT_VALIDATIONS, OPERATION_DURATION, record_llm_usage, span
+from app.services.circuit_breaker import CircuitBreaker, chat_circuit, embedding_circuit
+from app.services.llm_backends import ChatResult, TokenUsage, get_chat_backend, get_embedding_backend
+from app.services.llm_errors import LLMError, LLMOutputError, LLMRequestError
+from app.services.llm_schemas import MatchResult, ResumeExtraction, coerce_output, invalid_fields, json_object
+from app.services.prompt_builder import count_tokens, fit_plain, fit_resume
+from app.services.usage_service import UsageService
+
+EXTRACTION_FIELDS = """- full_name: string
+- email: string or null
+- phone: string or null
+- location: string or null
+- skills: array of strings (technical and soft skills)
+- experience_years: integer (total years of experience)
+- education: array of objects with degree, institution, year
+- work_experience: array of objects with company, position, duration, responsibilities
+- summary: brief professional summary (2-3 sentences)"""
+
+MATCH_FIELDS = """- match_score: integer 0-100 (overall fit)
+- strengths: array of strings (what matches well)
+- weaknesses: array of strings (what's missing or weak)
+- summary: brief analysis (2-3 sentences)"""
+
+
+def _field_specs(fields: str) -> Dict[str, str]:
+    """'- name: description' lines by field name"""
+    return {line[2:].split(":", 1)[0]: line for line in fields.splitlines()}
+
+
+FIELD_SPECS = {
+    ResumeExtraction: _field_specs(EXTRACTION_FIELDS),
+    MatchResult: _field_specs(MATCH_FIELDS),
+}
+
+# Profile fields worth sending when scoring from a stored extraction
+PROFILE_SCORING_FIELDS = ("skills", "experience_years", "education", "work_experience", "summary")
+
+OPERATION_TEMPERATURES = {
+    "extract_resume_data": 0.1,
+    "extract_and_score": 0.1,
+    "calculate_match_score": 0.2,
+    "score_profile": 0.2,
+    "generate_vacancy_description": 0.7,
+}
+
+
+@dataclass
+class BatchResult:
+    """One line of a batch job's output"""
+    custom_id: str
+    result: Optional[Dict] = None
+    error: Optional[str] = None
+    model: Optional[str] = None
+    usage: Optional[Dict[str, int]] = None
 
 
 class AIService:
-    """AI service for resume screening and analysis"""
+    """AI service for resume screening and analysis
+
+    Calls are counted against the organization's LLM quota. Background
+    work passes `wait_for_quota=True` to wait for the next window instead
+    of failing with QuotaExceededError.
     
-    def __init__(self):
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+    Every call is written to the usage ledger, attributed to the given
+    vacancy, candidate and user. Chat calls for a vacancy follow its AI
+    budget: fallback model near the limit, BudgetExceededError past it.
+    
+    Models are reached through the LLM_BACKEND/EMBEDDING_BACKEND backends
+    (OpenAI, local or deterministic stub). Failures are typed (LLMError:
+    transient, request or output) so callers can tell what to retry.
+    JSON answers are validated against Pydantic schemas; invalid fields
+    are re-asked for alone (LLM_REPAIR_ATTEMPTS) instead of re-running
+    the whole call. While the provider keeps failing, per-process circuit
+    breakers refuse calls at once (CircuitOpenError) instead of letting
+    each one wait for its timeout.
+    """
+    
+    def __init__(
+        self,
+        organization_id: Optional[int] = None,
+        wait_for_quota: bool = False,
+        vacancy_id: Optional[int] = None,
+        candidate_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+    ):
+        self.chat_backend = get_chat_backend()
+        self.embedding_backend = get_embedding_backend()
         self.model = settings.OPENAI_MODEL
-        self.embedding_model = settings.OPENAI_EMBEDDING_MODEL
+        self.embedding_model = self.embedding_backend.model
+        self.organization_id = organization_id
+        self.wait_for_quota = wait_for_quota
+        self.vacancy_id = vacancy_id
+        self.candidate_id = candidate_id
+        self.user_id = user_id
     
-    async def extract_resume_data(self, raw_text: str) -> Dict:
-        """Extract structured data from resume text using LLM"""
+    async def _acquire_quota(self, circuit: CircuitBreaker = chat_circuit) -> None:
+        """Fail fast while the provider's circuit is open, else count the call"""
+        circuit.check(circuit.name)
+        await tenant_quotas.acquire_llm_call(self.organization_id, wait=self.wait_for_quota)
+    
+    async def _chat_model(self) -> str:
+        """Model for the next chat call under the vacancy's AI budget"""
+        return await UsageService.chat_model(self.vacancy_id, self.model)
+    
+    async def _record_usage(self, operation: str, model: str, usage: Any, started: float) -> None:
+        record_llm_usage(model, operation, usage)
+        await UsageService.record(
+            self.organization_id,
+            operation,
+            model,
+            usage,
+            latency_ms=int((time.perf_counter() - started) * 1000),
+            vacancy_id=self.vacancy_id,
+            candidate_id=self.candidate_id,
+            user_id=self.user_id,
+        )
+    
+    async def _chat(
+        self,
+        operation: str,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        json_mode: bool = False,
+    ) -> ChatResult:
+        """One chat completion with a span and usage accounting; caller takes the quota"""
+        with span(f"llm.{operation}", model=model) as otel_span:
+            started = time.perf_counter()
+            # Backends are blocking; keep the event loop free for other requests
+            try:
+                with chat_circuit.guard(operation):
+                    response = await asyncio.to_thread(
+                        self.chat_backend.complete,
+                        operation,
+                        model,
+                        messages,
+                        temperature,
+                        json_mode,
+                    )
+            except LLMError:
+                raise
+            except Exception as e:
+                raise LLMRequestError(operation, str(e)) from e
+            await self._record_usage(operation, response.model or model, response.usage, started)
+            if otel_span is not None and response.usage is not None:
+                otel_span.set_attribute("llm.prompt_tokens", response.usage.prompt_tokens)
+                otel_span.set_attribute("llm.completion_tokens", response.usage.completion_tokens)
+        
+        return response
+    
+    async def _repair(
+        self,
+        operation: str,
+        model: str,
+        messages: List[Dict[str, str]],
+        answer: str,
+        schema: Optional[type],
+        invalid: Dict[str, str],
+        scope: Optional[str],
+    ) -> Optional[Dict]:
+        """Ask again for just the invalid fields of an answer (or the whole
+        object if it was not JSON); the conversation is kept so the model
+        sees its previous answer
+        
+        With a `scope` (one key of a larger answer) only that object is
+        asked for; a reply wrapping it under the key is unwrapped, and one
+        without any of the schema's fields is discarded.
+        """
+        if "*" in invalid and scope:
+            specs = "\n".join(FIELD_SPECS[schema].values())
+            request = f"""Your previous answer has no valid "{scope}" object.
+
+Respond with the "{scope}" object only, a JSON object with the fields:
+{specs}"""
+        elif "*" in invalid:
+            request = "Your previous answer was not a valid JSON object. Respond with the complete JSON object only."
+        else:
+            problems = "\n".join(f"- {name}: {problem}" for name, problem in invalid.items())
+            specs = "\n".join(FIELD_SPECS[schema].get(name, f"- {name}") for name in invalid)
+            where = f' of the "{scope}" object' if scope else ""
+            request = f"""These fields{where} in your previous answer are invalid:
+{problems}
+
+Respond with a JSON object containing only these fields, corrected:
+{specs}"""
+        
+        await self._acquire_quota()
+        response = await self._chat(
+            f"{operation}.repair",
+            model,
+            [*messages, {"role": "assistant", "content": answer}, {"role": "user", "content": request}],
+            temperature=0.0,
+            json_mode=True,
+        )
+        fixed = json_object(response.content)
+        if fixed is not None and scope:
+            if scope in fixed:
+                fixed = fixed[scope] if isinstance(fixed[scope], dict) else None
+            elif not fixed.keys() & schema.model_fields.keys():
+                fixed = None
+        return fixed
+    
+    async def _validated(
+        self,
+        operation: str,
+        model: str,
+        messages: List[Dict[str, str]],
+        answer: str,
+        data: Optional[Dict],
+        schema: type,
+        scope: Optional[str] = None,
+        repaired: bool = False,
+    ) -> Dict:
+        """Answer validated against `schema`, repairing invalid fields
+        
+        After LLM_REPAIR_ATTEMPTS repairs, fields that are still invalid
+        fall back to their defaults; LLMOutputError if a required one is
+        among them. `repaired` marks an answer already repaired by the
+        caller, for the validation metric.
+        """
+        outcome = "repaired" if repaired else "valid"
+        for attempt in range(settings.LLM_REPAIR_ATTEMPTS + 1):
+            if data is None:
+                invalid = {"*": "not a JSON object"}
+            else:
+                try:
+                    result: BaseModel = schema.model_validate(data)
+                    LLM_OUTPUT_VALIDATIONS.labels(operation, outcome).inc()
+                    return result.model_dump()
+                except ValidationError as e:
+                    invalid = invalid_fields(e)
+            
+            if attempt == settings.LLM_REPAIR_ATTEMPTS:
+                break
+            outcome = "repaired"
+            fixed = await self._repair(operation, model, messages, answer, schema, invalid, scope)
+            if fixed is not None:
+                data = fixed if data is None else {**data, **fixed}
+        
+        defaulted = coerce_output(schema, data)
+        if defaulted is not None:
+            LLM_OUTPUT_VALIDATIONS.labels(operation, "defaulted").inc()
+            return defaulted
+        LLM_OUTPUT_VALIDATIONS.labels(operation, "failed").inc()
+        raise LLMOutputError(operation, invalid)
+    
+    async def _structured_chat(
+        self,
+        operation: str,
+        model: str,
+        messages: List[Dict[str, str]],
+        schema: type,
+    ) -> Dict:
+        """JSON chat call validated against `schema`; caller takes the quota"""
+        response = await self._chat(
+            operation,
+            model,
+            messages,
+            temperature=OPERATION_TEMPERATURES[operation],
+            json_mode=True,
+        )
+        return await self._validated(
+            operation, model, messages, response.content, json_object(response.content), schema
+        )
+    
+    async def _chat_stream(
+        self,
+        operation: str,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        json_mode: bool = False,
+    ) -> AsyncIterator[str]:
+        """Streamed chat completion: content deltas as they arrive; caller takes the quota
+        
+        The blocking backend runs in a thread feeding a queue. Usage is
+        recorded when the stream ends or the consumer goes away; a stream
+        cut short is counted from the text received so far.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+        
+        def produce() -> None:
+            try:
+                for chunk in self.chat_backend.stream(operation, model, messages, temperature, json_mode):
+                    if stop.is_set():
+                        break
+                    loop.call_soon_threadsafe(queue.put_nowait, chunk)
+            except LLMError as e:
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, LLMRequestError(operation, str(e)))
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, None)
+        
+        with chat_circuit.guard(operation):
+            started = time.perf_counter()
+            producer = asyncio.ensure_future(asyncio.to_thread(produce))
+            usage, answered_by, parts, outcome = None, None, [], "error"
+            try:
+                while True:
+                    chunk = await queue.get()
+                    if chunk is None:
+                        break
+                    if isinstance(chunk, Exception):
+                        raise chunk
+                    usage = chunk.usage if chunk.usage is not None else usage
+                    answered_by = chunk.model or answered_by
+                    if chunk.content:
+                        parts.append(chunk.content)
+                        yield chunk.content
+                outcome = "ok"
+            finally:
+                stop.set()
+                await producer
+                if usage is None:
+                    usage = TokenUsage(
+                        prompt_tokens=sum(count_tokens(message["content"], model) for message in messages),
+                        completion_tokens=count_tokens("".join(parts), model),
+                    )
+                OPERATION_DURATION.labels(f"llm.{operation}", outcome).observe(time.perf_counter() - started)
+                await self._record_usage(operation, answered_by or model, usage, started)
+    
+    def _extract_resume_messages(self, model: str, raw_text: str) -> List[Dict[str, str]]:
+        resume_text = fit_resume(
+            raw_text, settings.PROMPT_EXTRACT_RESUME_TOKENS, model, "extract_resume_data"
+        )
         prompt = f"""Analyze the following resume and extract structured information in JSON format.
 
 Resume text:
-{raw_text}
+{resume_text}
 
 Extract the following fields:
-- full_name: string
-- email: string or null
-- phone: string or null
-- location: string or null
-- skills: array of strings (technical and soft skills)
-- experience_years: integer (total years of experience)
-- education: array of objects with degree, institution, year
-- work_experience: array of objects with company, position, duration, responsibilities
-- summary: brief professional summary (2-3 sentences)
+{EXTRACTION_FIELDS}
 
 Respond only with valid JSON, no additional text."""
         
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an expert HR assistant that extracts structured data from resumes."},
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.1,
-                response_format={"type": "json_object"},
-            )
-            
-            result = json.loads(response.choices[0].message.content)
-            return result
-        except Exception as e:
-            raise Exception(f"Failed to extract resume data: {str(e)}")
+        return [
+            {"role": "system", "content": "You are an expert HR assistant that extracts structured data from resumes."},
+            {"role": "user", "content": prompt},
+        ]
+    
+    async def extract_resume_data(self, raw_text: str) -> Dict:
+        """Extract structured data from resume text using LLM"""
+        model = await self._chat_model()
+        messages = self._extract_resume_messages(model, raw_text)
+        
+        await self._acquire_quota()
+        return await self._structured_chat("extract_resume_data", model, messages, ResumeExtraction)
     
     async def generate_embedding(self, text: str) -> List[float]:
         """Generate embedding for text"""
-        try:
-            response = self.client.embeddings.create(
-                model=self.embedding_model,
-                input=text,
-            )
-            return response.data[0].embedding
-        except Exception as e:
-            raise Exception(f"Failed to generate embedding: {str(e)}")
+        embeddings = await self.generate_embeddings([text])
+        return embeddings[0]
     
-    async def calculate_match_score(
+    async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Embeddings of several texts, EMBEDDING_BATCH_SIZE texts per call"""
+        vectors: List[List[float]] = []
+        for start in range(0, len(texts), settings.EMBEDDING_BATCH_SIZE):
+            chunk = [
+                fit_plain(text, settings.EMBEDDING_MAX_TOKENS, self.embedding_model, "embedding")
+                for text in texts[start:start + settings.EMBEDDING_BATCH_SIZE]
+            ]
+            await self._acquire_quota(embedding_circuit)
+            with span("llm.embedding", model=self.embedding_model, texts=len(chunk)):
+                started = time.perf_counter()
+                # Run the blocking backend in a thread so concurrent searches don't stall the loop
+                try:
+                    with embedding_circuit.guard("embedding"):
+                        response = await asyncio.to_thread(self.embedding_backend.embed, chunk)
+                except LLMError:
+                    raise
+                except Exception as e:
+                    raise LLMRequestError("embedding", str(e)) from e
+                await self._record_usage("embedding", self.embedding_model, response.usage, started)
+            vectors.extend(response.vectors)
+        return vectors
+    
+    def _match_score_messages(
         self,
+        model: str,
         resume_text: str,
         vacancy_requirements: str,
         vacancy_skills: List[str],
-    ) -> Dict:
-        """Calculate match score between resume and vacancy"""
+    ) -> List[Dict[str, str]]:
+        resume_text = fit_resume(
+            resume_text, settings.PROMPT_MATCH_RESUME_TOKENS, model, "calculate_match_score"
+        )
+        vacancy_requirements = fit_plain(
+            vacancy_requirements, settings.PROMPT_VACANCY_TOKENS, model, "calculate_match_score"
+        )
         prompt = f"""Analyze the match between a candidate's resume and job vacancy requirements.
 
 Vacancy Requirements:
@@ -77,36 +410,237 @@ Candidate Resume:
 {resume_text}
 
 Provide analysis in JSON format:
-- match_score: integer 0-100 (overall fit)
-- strengths: array of strings (what matches well)
-- weaknesses: array of strings (what's missing or weak)
-- summary: brief analysis (2-3 sentences)
+{MATCH_FIELDS}
 
 Respond only with valid JSON."""
         
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an expert recruiter analyzing candidate-job fit."},
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.2,
-                response_format={"type": "json_object"},
+        return [
+            {"role": "system", "content": "You are an expert recruiter analyzing candidate-job fit."},
+            {"role": "user", "content": prompt},
+        ]
+    
+    async def calculate_match_score(
+        self,
+        resume_text: str,
+        vacancy_requirements: str,
+        vacancy_skills: List[str],
+    ) -> Dict:
+        """Calculate match score between resume and vacancy"""
+        model = await self._chat_model()
+        messages = self._match_score_messages(model, resume_text, vacancy_requirements, vacancy_skills)
+        
+        await self._acquire_quota()
+        return await self._structured_chat("calculate_match_score", model, messages, MatchResult)
+    
+    async def extract_and_score(
+        self,
+        raw_text: str,
+        vacancy_requirements: str,
+        vacancy_skills: List[str],
+    ) -> Tuple[Dict, Dict]:
+        """Extract structured data and score against the vacancy in one call
+
+        Returns (extracted data, match result) in the shapes of
+        extract_resume_data and calculate_match_score.
+        """
+        model = await self._chat_model()
+        resume_text = fit_resume(
+            raw_text, settings.PROMPT_EXTRACT_RESUME_TOKENS, model, "extract_and_score"
+        )
+        vacancy_requirements = fit_plain(
+            vacancy_requirements, settings.PROMPT_VACANCY_TOKENS, model, "extract_and_score"
+        )
+        prompt = f"""Analyze the following resume: extract structured information and assess its match with the job vacancy.
+
+Vacancy Requirements:
+{vacancy_requirements}
+
+Required Skills: {', '.join(vacancy_skills)}
+
+Resume text:
+{resume_text}
+
+Respond with a JSON object with two keys.
+
+"candidate": object with the fields
+{EXTRACTION_FIELDS}
+
+"match": object with the fields
+{MATCH_FIELDS}
+
+Respond only with valid JSON, no additional text."""
+        
+        messages = [
+            {"role": "system", "content": "You are an expert HR assistant that extracts structured data from resumes and analyzes candidate-job fit."},
+            {"role": "user", "content": prompt},
+        ]
+        
+        await self._acquire_quota()
+        response = await self._chat(
+            "extract_and_score",
+            model,
+            messages,
+            temperature=OPERATION_TEMPERATURES["extract_and_score"],
+            json_mode=True,
+        )
+        
+        answer = response.content
+        result = json_object(answer)
+        repaired = result is None
+        if repaired:
+            # Not JSON at all: one repair for both halves
+            result = await self._repair(
+                "extract_and_score", model, messages, answer, None, {"*": "not a JSON object"}, None
             )
+            if result is not None:
+                answer = json.dumps(result, ensure_ascii=False)
+        
+        # Each half is validated and repaired on its own
+        halves = []
+        for key, schema in (("candidate", ResumeExtraction), ("match", MatchResult)):
+            part = (result or {}).get(key)
+            halves.append(await self._validated(
+                "extract_and_score",
+                model,
+                messages,
+                answer,
+                part if isinstance(part, dict) else None,
+                schema,
+                scope=key,
+                repaired=repaired,
+            ))
+        return halves[0], halves[1]
+    
+    def _score_profile_messages(
+        self,
+        model: str,
+        profile: Dict,
+        vacancy_requirements: str,
+        vacancy_skills: List[str],
+    ) -> List[Dict[str, str]]:
+        vacancy_requirements = fit_plain(
+            vacancy_requirements, settings.PROMPT_VACANCY_TOKENS, model, "score_profile"
+        )
+        candidate_profile = json.dumps(
+            {key: profile.get(key) for key in PROFILE_SCORING_FIELDS if profile.get(key)},
+            ensure_ascii=False,
+        )
+        prompt = f"""Analyze the match between a candidate's profile and job vacancy requirements.
+
+Vacancy Requirements:
+{vacancy_requirements}
+
+Required Skills: {', '.join(vacancy_skills)}
+
+Candidate Profile (extracted from the resume):
+{candidate_profile}
+
+Provide analysis in JSON format:
+{MATCH_FIELDS}
+
+Respond only with valid JSON."""
+        
+        return [
+            {"role": "system", "content": "You are an expert recruiter analyzing candidate-job fit."},
+            {"role": "user", "content": prompt},
+        ]
+    
+    async def score_profile(
+        self,
+        profile: Dict,
+        vacancy_requirements: str,
+        vacancy_skills: List[str],
+    ) -> Dict:
+        """Score an already extracted profile against a vacancy, without the resume text"""
+        model = await self._chat_model()
+        messages = self._score_profile_messages(model, profile, vacancy_requirements, vacancy_skills)
+        
+        await self._acquire_quota()
+        return await self._structured_chat("score_profile", model, messages, MatchResult)
+    
+    async def stream_score_profile(
+        self,
+        profile: Dict,
+        vacancy_requirements: str,
+        vacancy_skills: List[str],
+    ) -> AsyncIterator[str]:
+        """score_profile as a stream of the JSON answer's text deltas
+        
+        Budget and quota are checked before the stream is returned.
+        """
+        model = await self._chat_model()
+        messages = self._score_profile_messages(model, profile, vacancy_requirements, vacancy_skills)
+        await self._acquire_quota()
+        return self._chat_stream(
+            "score_profile",
+            model,
+            messages,
+            temperature=OPERATION_TEMPERATURES["score_profile"],
+            json_mode=True,
+        )
+    
+    async def build_batch(self, requests: List[Tuple[str, str, Dict[str, Any]]]) -> Tuple[str, bytes]:
+        """JSONL input of a provider batch job, and the model it uses
+
+        `requests` are (custom_id, operation, inputs): operation is one of
+        extract_resume_data, calculate_match_score, score_profile and
+        inputs are that method's arguments. Prompts are the same as in
+        the realtime calls; the quota is not taken, batches run offline.
+        """
+        model = await self._chat_model()
+        builders = {
+            "extract_resume_data": self._extract_resume_messages,
+            "calculate_match_score": self._match_score_messages,
+            "score_profile": self._score_profile_messages,
+        }
+        
+        lines = []
+        for custom_id, operation, inputs in requests:
+            lines.append(json.dumps({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": model,
+                    "messages": builders[operation](model, **inputs),
+                    "temperature": OPERATION_TEMPERATURES[operation],
+                    "response_format": {"type": "json_object"},
+                },
+            }, ensure_ascii=False))
+        
+        return model, "\n".join(lines).encode()
+    
+    @staticmethod
+    def parse_batch_output(content: bytes) -> List[BatchResult]:
+        """Results of a batch job from its output (and error) JSONL"""
+        results = []
+        for line in content.decode().splitlines():
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            response = item.get("response") or {}
+            body = response.get("body") or {}
             
-            result = json.loads(response.choices[0].message.content)
-            return result
-        except Exception as e:
-            raise Exception(f"Failed to calculate match score: {str(e)}")
+            if item.get("error") or response.get("status_code") != 200:
+                error = item.get("error") or body.get("error") or {}
+                results.append(BatchResult(item["custom_id"], error=error.get("message") or "Request failed"))
+                continue
+            
+            try:
+                result = json.loads(body["choices"][0]["message"]["content"])
+            except (KeyError, IndexError, TypeError, ValueError) as e:
+                results.append(BatchResult(item["custom_id"], error=f"Invalid response: {e}"))
+                continue
+            results.append(BatchResult(item["custom_id"], result, model=body.get("model"), usage=body.get("usage")))
+        
+        return results
     
-    async def generate_vacancy_description(
+    def _vacancy_description_messages(
         self,
         title: str,
         requirements: Optional[str],
         skills: List[str],
-    ) -> str:
-        """Generate vacancy description using AI"""
+    ) -> List[Dict[str, str]]:
         prompt = f"""Create a professional job description for the following position:
 
 Job Title: {title}
@@ -121,16 +655,44 @@ Generate a compelling job description with:
 
 Keep it concise and professional."""
         
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an expert HR professional writing job descriptions."},
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.7,
-            )
-            
-            return response.choices[0].message.content
-        except Exception as e:
-            raise Exception(f"Failed to generate description: {str(e)}")
+        return [
+            {"role": "system", "content": "You are an expert HR professional writing job descriptions."},
+            {"role": "user", "content": prompt},
+        ]
+    
+    async def generate_vacancy_description(
+        self,
+        title: str,
+        requirements: Optional[str],
+        skills: List[str],
+    ) -> str:
+        """Generate vacancy description using AI"""
+        model = await self._chat_model()
+        await self._acquire_quota()
+        response = await self._chat(
+            "generate_vacancy_description",
+            model,
+            self._vacancy_description_messages(title, requirements, skills),
+            temperature=OPERATION_TEMPERATURES["generate_vacancy_description"],
+        )
+        return response.content
+    
+    async def stream_vacancy_description(
+        self,
+        title: str,
+        requirements: Optional[str],
+        skills: List[str],
+    ) -> AsyncIterator[str]:
+        """Start generating a vacancy description; returns its text deltas
+        
+        Budget and quota are checked here, so their errors surface before
+        the caller starts a streaming response.
+        """
+        model = await self._chat_model()
+        await self._acquire_quota()
+        return self._chat_stream(
+            "generate_vacancy_description",
+            model,
+            self._vacancy_description_messages(title, requirements, skills),
+            temperature=OPERATION_TEMPERATURES["generate_vacancy_description"],
+        )
@@ -0,0 +1,447 @@
+"""Recruiting analytics over materialized per-vacancy/per-day aggregates
+
+Stage moves and new applications increment the aggregate tables in the
+same transaction, so dashboard queries never touch stage history.
+`rebuild` recomputes a vacancy's aggregates from stage intervals
+(backfill, bulk import).
+"""
+import bisect
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import Date, Float, cast, delete, extract, func, literal
+from sqlalchemy.dialects.postgresql import ARRAY, array, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.core.config import settings
+from app.models.analytics import SourceDailyStat, StageDailyStat, StageDurationBucket
+from app.models.candidate import Candidate
+from app.models.pipeline import DEFAULT_STAGE_SLUGS, OFFER_STAGE, CandidateStageInterval
+from app.models.vacancy import Vacancy
+
+# Upper bounds (hours) of the time-in-stage histogram buckets; the last bucket is open
+DURATION_BUCKET_EDGES_HOURS = [1, 4, 12, 24, 48, 72, 120, 168, 240, 336, 504, 720, 1080, 1440, 2160]
+
+DEFAULT_SOURCE = "upload"
+
+
+def duration_bucket(seconds: float) -> int:
+    """Histogram bucket of a time-in-stage duration"""
+    return bisect.bisect_right(DURATION_BUCKET_EDGES_HOURS, seconds / 3600)
+
+
+def histogram_median(counts: Dict[int, int]) -> Optional[float]:
+    """Median hours, interpolated linearly inside the bucket holding it"""
+    total = sum(counts.values())
+    if not total:
+        return None
+
+    half = total / 2
+    cumulative = 0
+    for bucket in sorted(counts):
+        count = counts[bucket]
+        if count and cumulative + count >= half:
+            lower = DURATION_BUCKET_EDGES_HOURS[bucket - 1] if bucket > 0 else 0
+            if bucket >= len(DURATION_BUCKET_EDGES_HOURS):
+                return float(lower)
+            upper = DURATION_BUCKET_EDGES_HOURS[bucket]
+            return round(lower + (upper - lower) * (half - cumulative) / count, 1)
+        cumulative += count
+    return None
+
+
+def as_utc(value: datetime) -> datetime:
+    """Naive UTC datetime; timestamptz columns load back timezone-aware"""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def stage_order(slug: str) -> Tuple[int, str]:
+    """Funnel order: default stages first, custom stages after, alphabetically"""
+    if slug in DEFAULT_STAGE_SLUGS:
+        return DEFAULT_STAGE_SLUGS.index(slug), ""
+    return len(DEFAULT_STAGE_SLUGS), slug
+
+
+def _percent(part: int, whole: int) -> Optional[float]:
+    return round(part / whole * 100, 1) if whole else None
+
+
+class AnalyticsService:
+    """Maintain and read funnel, time-in-stage and source aggregates"""
+
+    @staticmethod
+    def period(date_from: Optional[date], date_to: Optional[date]) -> Tuple[date, date]:
+        date_to = date_to or datetime.utcnow().date()
+        date_from = date_from or date_to - timedelta(days=settings.ANALYTICS_DEFAULT_PERIOD_DAYS)
+        if date_from > date_to:
+            raise ValueError("date_from must not be after date_to")
+        return date_from, date_to
+
+    @staticmethod
+    async def _increment(session: AsyncSession, model, keys: Dict[str, Any], counters: Dict[str, Any]) -> None:
+        """Add counters to an aggregate row, creating it if missing"""
+        table = model.__table__
+        values = {**keys, **counters}
+        if "updated_at" in table.c:
+            values["updated_at"] = func.now()
+
+        stmt = insert(table).values(**values)
+        set_ = {name: table.c[name] + stmt.excluded[name] for name in counters}
+        if "updated_at" in table.c:
+            set_["updated_at"] = func.now()
+
+        await session.execute(
+            stmt.on_conflict_do_update(index_elements=list(keys), set_=set_)
+        )
+
+    @classmethod
+    async def record_application(cls, session: AsyncSession, candidate: Candidate) -> None:
+        """Count a new application for its source"""
+        await cls._increment(
+            session,
+            SourceDailyStat,
+            {
+                "vacancy_id": candidate.vacancy_id,
+                "day": (candidate.created_at or datetime.utcnow()).date(),
+                "source": candidate.source or DEFAULT_SOURCE,
+            },
+            {"applications": 1},
+        )
+
+    @classmethod
+    async def record_move(
+        cls,
+        session: AsyncSession,
+        candidate: Candidate,
+        stage_slug: str,
+        moved_at: datetime,
+        closed_interval=None,
+    ) -> None:
+        """Update aggregates for a stage move made in the current transaction
+
+        Entering `stage_slug` counts an entry; `closed_interval` (stage_slug,
+        entered_at of the stage just left) counts an exit with its duration.
+        """
+        moved_at = as_utc(moved_at)
+        day = moved_at.date()
+
+        await cls._increment(
+            session,
+            StageDailyStat,
+            {"vacancy_id": candidate.vacancy_id, "day": day, "stage_slug": stage_slug},
+            {"entries": 1},
+        )
+
+        if closed_interval:
+            seconds = max((moved_at - as_utc(closed_interval.entered_at)).total_seconds(), 0.0)
+            keys = {"vacancy_id": candidate.vacancy_id, "day": day, "stage_slug": closed_interval.stage_slug}
+            await cls._increment(
+                session, StageDailyStat, keys, {"exits": 1, "time_in_stage_seconds": seconds}
+            )
+            await cls._increment(
+                session, StageDurationBucket, {**keys, "bucket": duration_bucket(seconds)}, {"count": 1}
+            )
+
+        if stage_slug == OFFER_STAGE:
+            await cls._increment(
+                session,
+                SourceDailyStat,
+                {
+                    "vacancy_id": candidate.vacancy_id,
+                    "day": day,
+                    "source": candidate.source or DEFAULT_SOURCE,
+                },
+                {"offers": 1},
+            )
+
+    @staticmethod
+    async def rebuild(session: AsyncSession, vacancy_id: int) -> None:
+        """Recompute a vacancy's aggregates from candidates and stage intervals
+
+        Intervals must be current; see StageService.rebuild_intervals.
+        """
+        for model in (StageDailyStat, StageDurationBucket, SourceDailyStat):
+            await session.execute(delete(model).where(model.vacancy_id == vacancy_id))
+
+        moves = (
+            select(
+                CandidateStageInterval.stage_slug,
+                CandidateStageInterval.entered_at,
+                CandidateStageInterval.exited_at,
+                func.coalesce(Candidate.source, DEFAULT_SOURCE).label("source"),
+            )
+            .join(Candidate, Candidate.id == CandidateStageInterval.candidate_id)
+            .where(CandidateStageInterval.vacancy_id == vacancy_id)
+            .cte("moves")
+        )
+        entered_day = cast(moves.c.entered_at, Date)
+        exited_day = cast(moves.c.exited_at, Date)
+        seconds = cast(extract("epoch", moves.c.exited_at - moves.c.entered_at), Float)
+
+        stage_stats = StageDailyStat.__table__
+        columns = ["vacancy_id", "day", "stage_slug", "entries", "exits", "time_in_stage_seconds", "updated_at"]
+
+        await session.execute(
+            insert(stage_stats).from_select(
+                columns,
+                select(
+                    literal(vacancy_id), entered_day, moves.c.stage_slug,
+                    func.count(), literal(0), literal(0.0), func.now(),
+                ).group_by(entered_day, moves.c.stage_slug),
+            )
+        )
+
+        exits = insert(stage_stats).from_select(
+            columns,
+            select(
+                literal(vacancy_id), exited_day, moves.c.stage_slug,
+                literal(0), func.count(), func.sum(seconds), func.now(),
+            )
+            .where(moves.c.exited_at.isnot(None))
+            .group_by(exited_day, moves.c.stage_slug),
+        )
+        await session.execute(
+            exits.on_conflict_do_update(
+                index_elements=["vacancy_id", "day", "stage_slug"],
+                set_={
+                    "exits": exits.excluded.exits,
+                    "time_in_stage_seconds": exits.excluded.time_in_stage_seconds,
+                },
+            )
+        )
+
+        # width_bucket counts thresholds <= operand, same as bisect_right
+        bucket = func.width_bucket(
+            seconds,
+            cast(array([edge * 3600.0 for edge in DURATION_BUCKET_EDGES_HOURS]), ARRAY(Float)),
+        )
+        await session.execute(
+            insert(StageDurationBucket.__table__).from_select(
+                ["vacancy_id", "day", "stage_slug", "bucket", "count"],
+                select(literal(vacancy_id), exited_day, moves.c.stage_slug, bucket, func.count())
+                .where(moves.c.exited_at.isnot(None))
+                .group_by(exited_day, moves.c.stage_slug, bucket),
+            )
+        )
+
+        source_stats = SourceDailyStat.__table__
+        created_day = cast(Candidate.created_at, Date)
+        source = func.coalesce(Candidate.source, DEFAULT_SOURCE)
+        await session.execute(
+            insert(source_stats).from_select(
+                ["vacancy_id", "day", "source", "applications", "offers", "updated_at"],
+                select(literal(vacancy_id), created_day, source, func.count(), literal(0), func.now())
+                .where(Candidate.vacancy_id == vacancy_id)
+                .group_by(created_day, source),
+            )
+        )
+
+        offers = insert(source_stats).from_select(
+            ["vacancy_id", "day", "source", "applications", "offers", "updated_at"],
+            select(literal(vacancy_id), entered_day, moves.c.source, literal(0), func.count(), func.now())
+            .where(moves.c.stage_slug == OFFER_STAGE)
+            .group_by(entered_day, moves.c.source),
+        )
+        await session.execute(
+            offers.on_conflict_do_update(
+                index_elements=["vacancy_id", "day", "source"],
+                set_={"offers": offers.excluded.offers},
+            )
+        )
+
+    @classmethod
+    async def funnel(
+        cls,
+        session: AsyncSession,
+        vacancy_id: int,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+    ) -> Dict:
+        """Stage entries and conversion rates in funnel order"""
+        date_from, date_to = cls.period(date_from, date_to)
+
+        result = await session.execute(
+            select(
+                StageDailyStat.stage_slug,
+                func.sum(StageDailyStat.entries).label("entries"),
+                func.sum(StageDailyStat.exits).label("exits"),
+            )
+            .where(
+                StageDailyStat.vacancy_id == vacancy_id,
+                StageDailyStat.day.between(date_from, date_to),
+            )
+            .group_by(StageDailyStat.stage_slug)
+        )
+        rows = sorted(result.all(), key=lambda row: stage_order(row.stage_slug))
+
+        result = await session.execute(
+            select(func.coalesce(func.sum(SourceDailyStat.applications), 0)).where(
+                SourceDailyStat.vacancy_id == vacancy_id,
+                SourceDailyStat.day.between(date_from, date_to),
+            )
+        )
+        applications = int(result.scalar_one())
+
+        stages = []
+        previous_entries = applications
+        for row in rows:
+            entries = int(row.entries or 0)
+            stages.append({
+                "stage_slug": row.stage_slug,
+                "entries": entries,
+                "exits": int(row.exits or 0),
+                "conversion_from_previous": _percent(entries, previous_entries),
+                "conversion_from_applications": _percent(entries, applications),
+            })
+            previous_entries = entries
+
+        return {
+            "vacancy_id": vacancy_id,
+            "date_from": date_from,
+            "date_to": date_to,
+            "applications": applications,
+            "stages": stages,
+        }
+
+    @classmethod
+    async def time_in_stage(
+        cls,
+        session: AsyncSession,
+        vacancy_id: int,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+    ) -> Dict:
+        """Mean and median hours spent in each stage by candidates who left it"""
+        date_from, date_to = cls.period(date_from, date_to)
+
+        result = await session.execute(
+            select(
+                StageDailyStat.stage_slug,
+                func.sum(StageDailyStat.exits).label("exits"),
+                func.sum(StageDailyStat.time_in_stage_seconds).label("seconds"),
+            )
+            .where(
+                StageDailyStat.vacancy_id == vacancy_id,
+                StageDailyStat.day.between(date_from, date_to),
+            )
+            .group_by(StageDailyStat.stage_slug)
+        )
+        totals = {row.stage_slug: row for row in result.all()}
+
+        result = await session.execute(
+            select(
+                StageDurationBucket.stage_slug,
+                StageDurationBucket.bucket,
+                func.sum(StageDurationBucket.count).label("count"),
+            )
+            .where(
+                StageDurationBucket.vacancy_id == vacancy_id,
+                StageDurationBucket.day.between(date_from, date_to),
+            )
+            .group_by(StageDurationBucket.stage_slug, StageDurationBucket.bucket)
+        )
+        histograms: Dict[str, Dict[int, int]] = {}
+        for row in result.all():
+            histograms.setdefault(row.stage_slug, {})[row.bucket] = int(row.count)
+
+        stages = []
+        for slug in sorted(totals, key=stage_order):
+            exits = int(totals[slug].exits or 0)
+            if not exits:
+                continue
+            stages.append({
+                "stage_slug": slug,
+                "exits": exits,
+                "mean_hours": round(totals[slug].seconds / exits / 3600, 1),
+                "median_hours": histogram_median(histograms.get(slug, {})),
+            })
+
+        return {
+            "vacancy_id": vacancy_id,
+            "date_from": date_from,
+            "date_to": date_to,
+            "stages": stages,
+        }
+
+    @classmethod
+    async def daily(
+        cls,
+        session: AsyncSession,
+        vacancy_id: int,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+    ) -> Dict:
+        """Stage entries per day, one object per day keyed by stage (chart-ready)"""
+        date_from, date_to = cls.period(date_from, date_to)
+
+        result = await session.execute(
+            select(StageDailyStat.day, StageDailyStat.stage_slug, StageDailyStat.entries)
+            .where(
+                StageDailyStat.vacancy_id == vacancy_id,
+                StageDailyStat.day.between(date_from, date_to),
+                StageDailyStat.entries > 0,
+            )
+            .order_by(StageDailyStat.day)
+        )
+
+        days: Dict[date, Dict[str, Any]] = {}
+        slugs = set()
+        for row in result.all():
+            days.setdefault(row.day, {"day": row.day})[row.stage_slug] = row.entries
+            slugs.add(row.stage_slug)
+
+        return {
+            "vacancy_id": vacancy_id,
+            "stages": sorted(slugs, key=stage_order),
+            "days": list(days.values()),
+        }
+
+    @classmethod
+    async def sources(
+        cls,
+        session: AsyncSession,
+        organization_id: int,
+        vacancy_id: Optional[int] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+    ) -> Dict:
+        """Applications and offers per candidate source across the organization's vacancies"""
+        date_from, date_to = cls.period(date_from, date_to)
+
+        applications = func.sum(SourceDailyStat.applications).label("applications")
+        query = (
+            select(
+                SourceDailyStat.source,
+                applications,
+                func.sum(SourceDailyStat.offers).label("offers"),
+            )
+            .join(Vacancy, Vacancy.id == SourceDailyStat.vacancy_id)
+            .where(Vacancy.organization_id == organization_id)
+            .where(SourceDailyStat.day.between(date_from, date_to))
+            .group_by(SourceDailyStat.source)
+            .order_by(applications.desc())
+        )
+        if vacancy_id:
+            query = query.where(SourceDailyStat.vacancy_id == vacancy_id)
+
+        result = await session.execute(query)
+
+        sources: List[Dict] = []
+        for row in result.all():
+            total, offers = int(row.applications or 0), int(row.offers or 0)
+            sources.append({
+                "source": row.source,
+                "applications": total,
+                "offers": offers,
+                "offer_rate": _percent(offers, total),
+            })
+
+        return {
+            "vacancy_id": vacancy_id,
+            "date_from": date_from,
+            "date_to": date_to,
+            "sources": sources,
+        }
@@ -0,0 +1,156 @@
+"""Batch-job backends for offline LLM scoring
+
+A backend takes the JSONL input built by AIService.build_batch, returns a
+job ID and later reports the job's state and output in the OpenAI batch
+output format (one line per request, keyed by custom_id).
+
+- OpenAIBatchBackend: the provider's batch API (discounted, runs within
+  BATCH_COMPLETION_WINDOW, separate rate limits from interactive calls).
+- LocalBatchBackend: a stand-in that runs the requests itself with
+  regular chat calls, keeping jobs as files in BATCH_LOCAL_DIR. For
+  development and tests; `responder` replaces the chat API.
+"""
+import asyncio
+import json
+import logging
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from openai import OpenAI
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Provider states of a batch that is still being processed
+RUNNING_STATES = {"validating", "in_progress", "finalizing", "cancelling"}
+
+
+@dataclass
+class BatchJob:
+    state: str  # running | completed | failed
+    output: bytes = b""
+    error: Optional[str] = None
+
+
+class BatchBackend:
+    """Interface of batch-job backends"""
+
+    name: str = ""
+
+    async def submit(self, content: bytes, description: str) -> str:
+        """Submit JSONL requests; returns the job ID"""
+        raise NotImplementedError
+
+    async def poll(self, job_id: str) -> BatchJob:
+        raise NotImplementedError
+
+
+class OpenAIBatchBackend(BatchBackend):
+    name = "openai"
+
+    def __init__(self, client: Optional[OpenAI] = None):
+        self.client = client or OpenAI(api_key=settings.OPENAI_API_KEY)
+
+    async def submit(self, content: bytes, description: str) -> str:
+        uploaded = await asyncio.to_thread(
+            self.client.files.create, file=("requests.jsonl", content), purpose="batch"
+        )
+        batch = await asyncio.to_thread(
+            self.client.batches.create,
+            input_file_id=uploaded.id,
+            endpoint="/v1/chat/completions",
+            completion_window=settings.BATCH_COMPLETION_WINDOW,
+            metadata={"description": description[:512]},
+        )
+        return batch.id
+
+    async def _file(self, file_id: Optional[str]) -> bytes:
+        if not file_id:
+            return b""
+        response = await asyncio.to_thread(self.client.files.content, file_id)
+        return response.content
+
+    async def poll(self, job_id: str) -> BatchJob:
+        batch = await asyncio.to_thread(self.client.batches.retrieve, job_id)
+        if batch.status in RUNNING_STATES:
+            return BatchJob("running")
+
+        # Expired batches still return the requests finished in time
+        if batch.status in ("completed", "expired"):
+            output = await self._file(batch.output_file_id)
+            errors = await self._file(batch.error_file_id)
+            return BatchJob("completed", output=b"\n".join(part for part in (output, errors) if part))
+
+        return BatchJob("failed", error=f"Batch {batch.status}")
+
+
+class LocalBatchBackend(BatchBackend):
+    """Runs batch requests in process, one chat call per line, on first poll"""
+
+    name = "local"
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        responder: Optional[Callable[[Dict], Dict]] = None,
+    ):
+        self.directory = Path(directory or settings.BATCH_LOCAL_DIR)
+        self.responder = responder or self._chat_completion
+        self._client: Optional[OpenAI] = None
+
+    def _chat_completion(self, body: Dict) -> Dict:
+        if self._client is None:
+            self._client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        return self._client.chat.completions.create(**body).model_dump()
+
+    def _path(self, job_id: str, kind: str) -> Path:
+        return self.directory / f"{job_id}.{kind}.jsonl"
+
+    async def submit(self, content: bytes, description: str) -> str:
+        job_id = f"local-{uuid.uuid4().hex}"
+        self.directory.mkdir(parents=True, exist_ok=True)
+        await asyncio.to_thread(self._path(job_id, "input").write_bytes, content)
+        return job_id
+
+    def _run(self, job_id: str) -> None:
+        lines = []
+        for line in self._path(job_id, "input").read_text().splitlines():
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            try:
+                body = self.responder(request["body"])
+                lines.append({"custom_id": request["custom_id"], "response": {"status_code": 200, "body": body}, "error": None})
+            except Exception as e:
+                logger.warning("Local batch request %s failed", request["custom_id"], exc_info=True)
+                lines.append({"custom_id": request["custom_id"], "response": None, "error": {"message": str(e)}})
+
+        # Written last and whole: its presence marks the job completed
+        temporary = self._path(job_id, "output.tmp")
+        temporary.write_text("\n".join(json.dumps(item, ensure_ascii=False) for item in lines))
+        temporary.replace(self._path(job_id, "output"))
+
+    async def poll(self, job_id: str) -> BatchJob:
+        if not self._path(job_id, "input").exists():
+            return BatchJob("failed", error="Unknown batch job")
+
+        output = self._path(job_id, "output")
+        if not output.exists():
+            await asyncio.to_thread(self._run, job_id)
+        return BatchJob("completed", output=output.read_bytes())
+
+
+BATCH_BACKENDS = {
+    OpenAIBatchBackend.name: OpenAIBatchBackend,
+    LocalBatchBackend.name: LocalBatchBackend,
+}
+
+
+def get_batch_backend(name: Optional[str] = None) -> BatchBackend:
+    name = name or settings.BATCH_BACKEND
+    if name not in BATCH_BACKENDS:
+        raise ValueError(f"Unknown batch backend: {name}")
+    return BATCH_BACKENDS[name]()
@@ -0,0 +1,192 @@
+"""Offline re-scoring and extraction of a vacancy's candidates in LLM batches
+
+`submit` builds one batch job for all parsed candidates of a vacancy:
+"score" re-scores them (from the stored extraction when there is one,
+otherwise from the resume text), "extract" extracts resumes that have no
+stored extraction yet. `poll` checks the job and, once it is done,
+applies the results to candidates (and resumes) with bulk UPDATEs and
+writes the usage ledger at the batch price.
+
+Batch requests bypass the per-minute LLM quota: they run at the
+provider under separate limits, not against interactive traffic.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.core.cache import response_cache, vacancy_scope
+from app.core.config import settings
+from app.models.candidate import Candidate
+from app.models.resume import Resume
+from app.models.scoring_batch import ScoringBatch, ScoringBatchStatus
+from app.models.vacancy import Vacancy
+from app.services.ai_service import AIService, BatchResult
+from app.services.batch_backends import BatchBackend, get_batch_backend
+from app.services.llm_schemas import OPERATION_SCHEMAS, coerce_output
+from app.services.screening_service import ScreeningService
+from app.services.skill_service import SkillService, skills_list
+from app.services.usage_service import UsageService
+
+BATCH_OPERATIONS = ("score", "extract")
+
+
+def custom_id(operation: str, candidate_id: int, resume_id: int) -> str:
+    return f"{operation}:{candidate_id}:{resume_id}"
+
+
+def parse_custom_id(value: str) -> Tuple[str, int, int]:
+    operation, candidate_id, resume_id = value.rsplit(":", 2)
+    return operation, int(candidate_id), int(resume_id)
+
+
+class BatchScoringService:
+    """Submit, poll and apply offline scoring batches"""
+
+    @staticmethod
+    async def latest_resumes(session: AsyncSession, vacancy_id: int) -> List[Any]:
+        """Newest parsed resume of each candidate of the vacancy"""
+        result = await session.execute(
+            select(Resume.candidate_id, Resume.id, Resume.raw_text, Resume.extracted_data)
+            .join(Candidate, Candidate.id == Resume.candidate_id)
+            .where(Candidate.vacancy_id == vacancy_id)
+            .where(Resume.raw_text.isnot(None))
+            .distinct(Resume.candidate_id)
+            .order_by(Resume.candidate_id, Resume.created_at.desc())
+        )
+        return result.all()
+
+    @classmethod
+    async def submit(
+        cls,
+        session: AsyncSession,
+        vacancy: Vacancy,
+        operation: str = "score",
+        backend: Optional[BatchBackend] = None,
+        user_id: Optional[int] = None,
+    ) -> ScoringBatch:
+        if operation not in BATCH_OPERATIONS:
+            raise ValueError(f"operation must be one of: {', '.join(BATCH_OPERATIONS)}")
+        backend = backend or get_batch_backend()
+
+        requirements, skills = vacancy.requirements or "", skills_list(vacancy.skills)
+        requests: List[Tuple[str, str, Dict[str, Any]]] = []
+        for row in await cls.latest_resumes(session, vacancy.id):
+            if operation == "extract":
+                if not row.extracted_data:
+                    requests.append((
+                        custom_id("extract_resume_data", row.candidate_id, row.id),
+                        "extract_resume_data",
+                        {"raw_text": row.raw_text},
+                    ))
+            elif row.extracted_data:
+                requests.append((
+                    custom_id("score_profile", row.candidate_id, row.id),
+                    "score_profile",
+                    {"profile": row.extracted_data, "vacancy_requirements": requirements, "vacancy_skills": skills},
+                ))
+            else:
+                requests.append((
+                    custom_id("calculate_match_score", row.candidate_id, row.id),
+                    "calculate_match_score",
+                    {"resume_text": row.raw_text, "vacancy_requirements": requirements, "vacancy_skills": skills},
+                ))
+
+        if not requests:
+            raise ValueError("No candidates to process")
+        if len(requests) > settings.BATCH_MAX_REQUESTS:
+            raise ValueError(f"Batch exceeds {settings.BATCH_MAX_REQUESTS} requests")
+
+        ai_service = AIService(organization_id=vacancy.organization_id, vacancy_id=vacancy.id, user_id=user_id)
+        model, content = await ai_service.build_batch(requests)
+        external_id = await backend.submit(content, f"vacancy {vacancy.id} {operation}")
+
+        batch = ScoringBatch(
+            organization_id=vacancy.organization_id,
+            vacancy_id=vacancy.id,
+            operation=operation,
+            backend=backend.name,
+            external_id=external_id,
+            model=model,
+            request_count=len(requests),
+            created_by=user_id,
+        )
+        session.add(batch)
+        await session.commit()
+        await session.refresh(batch)
+        return batch
+
+    @classmethod
+    async def poll(
+        cls,
+        session: AsyncSession,
+        batch: ScoringBatch,
+        backend: Optional[BatchBackend] = None,
+    ) -> ScoringBatch:
+        """Check a submitted batch; apply its results once finished"""
+        if batch.status != ScoringBatchStatus.SUBMITTED:
+            return batch
+        backend = backend or get_batch_backend(batch.backend)
+
+        job = await backend.poll(batch.external_id)
+        if job.state == "running":
+            return batch
+
+        if job.state == "failed":
+            batch.status = ScoringBatchStatus.FAILED
+            batch.error = job.error
+        else:
+            await cls.apply(session, batch, AIService.parse_batch_output(job.output))
+            batch.status = ScoringBatchStatus.COMPLETED
+
+        batch.completed_at = datetime.utcnow()
+        session.add(batch)
+        await session.commit()
+        await response_cache.invalidate(vacancy_scope(batch.vacancy_id))
+        return batch
+
+    @staticmethod
+    async def apply(session: AsyncSession, batch: ScoringBatch, results: List[BatchResult]) -> None:
+        """Write results to candidates/resumes in bulk and record their usage"""
+        candidate_rows: List[Dict[str, Any]] = []
+        resume_rows: List[Dict[str, Any]] = []
+        skills: Dict[int, List[str]] = {}
+
+        for item in results:
+            operation, candidate_id, resume_id = parse_custom_id(item.custom_id)
+            if item.usage:
+                session.add(UsageService.entry(
+                    batch.organization_id,
+                    f"batch.{operation}",
+                    batch.model,  # priced as requested; responses name dated snapshots
+                    item.usage,
+                    latency_ms=0,
+                    vacancy_id=batch.vacancy_id,
+                    candidate_id=candidate_id,
+                    user_id=batch.created_by,
+                    price_factor=settings.LLM_BATCH_PRICE_FACTOR,
+                ))
+            # Same schemas as realtime calls; no repair round-trips offline
+            result = coerce_output(OPERATION_SCHEMAS[operation], item.result)
+            if result is None:
+                continue
+
+            if operation == "extract_resume_data":
+                resume_rows.append({"id": resume_id, "extracted_data": result})
+                candidate_rows.append({"id": candidate_id, **ScreeningService.profile_values(result)})
+                skills[candidate_id] = skills_list(result.get("skills"))
+            else:
+                candidate_rows.append({"id": candidate_id, **ScreeningService.match_values(result)})
+
+        # Bulk UPDATE by primary key, one executemany per table
+        if candidate_rows:
+            await session.execute(update(Candidate), candidate_rows)
+        if resume_rows:
+            await session.execute(update(Resume), resume_rows)
+        for candidate_id, candidate_skills in skills.items():
+            await SkillService.index_candidate(session, candidate_id, candidate_skills)
+
+        batch.succeeded = len(candidate_rows)
+        batch.failed = batch.request_count - batch.succeeded
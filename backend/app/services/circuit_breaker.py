@@ -0,0 +1,154 @@
+"""Circuit breakers in front of the AI provider
+
+Without them, every call during a provider outage waits for its timeout
+and holds a worker. A breaker counts consecutive transient failures
+(LLMTransientError: timeouts, connection errors, rate limits, 5xx). At
+LLM_CIRCUIT_FAILURE_THRESHOLD it opens, and for LLM_CIRCUIT_OPEN_SECONDS
+calls fail at once with CircuitOpenError (retryable, 503 in the API).
+After that it is half-open: LLM_CIRCUIT_HALF_OPEN_PROBES calls go through
+as probes. A successful probe closes the breaker; a failed one opens it
+again. Any answer from the provider, including a refused request, counts
+as healthy.
+
+Chat and embeddings have separate breakers, as they may be different
+backends. State is per process: each worker trips after a few failed
+calls of its own.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from app.core.config import settings
+from app.core.telemetry import LLM_CIRCUIT_REJECTIONS, LLM_CIRCUIT_STATE
+from app.services.llm_errors import LLMTransientError
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(LLMTransientError):
+    """Call refused by an open breaker, without reaching the provider"""
+
+    def __init__(self, operation: str, circuit: str, retry_after: float):
+        self.circuit = circuit
+        super().__init__(operation, f"{circuit} circuit is open", retry_after=retry_after)
+
+
+class CircuitBreaker:
+    def __init__(self, name: str):
+        self.name = name
+        self.failure_threshold = settings.LLM_CIRCUIT_FAILURE_THRESHOLD
+        self.open_seconds = settings.LLM_CIRCUIT_OPEN_SECONDS
+        self.half_open_probes = settings.LLM_CIRCUIT_HALF_OPEN_PROBES
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        # Shared by every event loop and thread of the process
+        self._lock = threading.Lock()
+        LLM_CIRCUIT_STATE.labels(name).set(_STATE_VALUES[CLOSED])
+
+    def _set_state(self, state: str) -> None:
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+            logger.warning(
+                "%s circuit opened (%s); calls refused for %.0fs",
+                self.name,
+                "probe failed" if self.state == HALF_OPEN else f"{self._failures} failures in a row",
+                self.open_seconds,
+            )
+        elif state == CLOSED and self.state != CLOSED:
+            logger.info("%s circuit closed", self.name)
+        if state != HALF_OPEN:
+            self._probes = 0
+        self.state = state
+        LLM_CIRCUIT_STATE.labels(self.name).set(_STATE_VALUES[state])
+
+    def _open_remaining(self) -> float:
+        return max(0.0, self._opened_at + self.open_seconds - time.monotonic())
+
+    def _available(self) -> bool:
+        if self.state == OPEN:
+            return self._open_remaining() == 0
+        if self.state == HALF_OPEN:
+            return self._probes < self.half_open_probes
+        return True
+
+    def _refusal(self, operation: str) -> CircuitOpenError:
+        LLM_CIRCUIT_REJECTIONS.labels(self.name).inc()
+        retry_after = self._open_remaining() if self.state == OPEN else self.open_seconds
+        return CircuitOpenError(operation, self.name, retry_after)
+
+    @property
+    def available(self) -> bool:
+        """Whether a call would be let through now; background work defers
+        its LLM stages instead of queueing behind a failing provider"""
+        with self._lock:
+            return self._available()
+
+    def check(self, operation: str) -> None:
+        """Fail fast before quota and budget are spent on a call that would be refused"""
+        with self._lock:
+            if not self._available():
+                raise self._refusal(operation)
+
+    def _admit(self, operation: str) -> bool:
+        """Let a call through or raise CircuitOpenError; True if it is a probe"""
+        with self._lock:
+            if self.state == OPEN and self._open_remaining() == 0:
+                self._set_state(HALF_OPEN)
+
+            if self.state == CLOSED:
+                return False
+            if self.state == HALF_OPEN and self._probes < self.half_open_probes:
+                self._probes += 1
+                return True
+            raise self._refusal(operation)
+
+    def _record(self, probe: bool, healthy: Optional[bool]) -> None:
+        """Outcome of an admitted call; None if it ended without an answer
+        either way (cancelled, client gone)"""
+        with self._lock:
+            if probe:
+                self._probes = max(0, self._probes - 1)
+            if healthy is None:
+                return
+
+            if healthy:
+                self._failures = 0
+                if self.state == HALF_OPEN:
+                    self._set_state(CLOSED)
+            elif self.state == HALF_OPEN:
+                self._set_state(OPEN)
+            elif self.state == CLOSED:
+                self._failures += 1
+                if self._failures >= self.failure_threshold:
+                    self._set_state(OPEN)
+
+    @contextmanager
+    def guard(self, operation: str) -> Iterator[None]:
+        """Run one provider call (or a whole stream) through the breaker"""
+        probe = self._admit(operation)
+        healthy = None
+        try:
+            yield
+            healthy = True
+        except LLMTransientError:
+            healthy = False
+            raise
+        except Exception:
+            healthy = True
+            raise
+        finally:
+            self._record(probe, healthy)
+
+
+chat_circuit = CircuitBreaker("chat")
+embedding_circuit = CircuitBreaker("embedding")
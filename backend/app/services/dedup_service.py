@@ -0,0 +1,266 @@
+"""Candidate identity deduplication"""
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, func, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.core.config import settings
+from app.models.candidate import Candidate
+from app.models.duplicate import (
+    CandidateIdentityKey,
+    DuplicateCandidate,
+    DuplicateStatus,
+)
+from app.models.pipeline import CandidateStage, CandidateStageInterval
+from app.models.resume import Resume
+from app.models.skill import CandidateSkill
+from app.models.talent_pool import TalentSuggestion
+from app.services.identity import (
+    blocking_keys,
+    name_similarity,
+    normalize_email,
+    normalize_name,
+    normalize_phone,
+)
+from app.services.skill_service import SkillService, skills_list
+
+# Evidence weights; the sum is capped at 1.0. Against DEDUP_MIN_SCORE (0.6):
+# - an exact email match alone is enough (names are often transliterated
+#   or abbreviated: "Иван Петров" / "Petrov I.");
+# - a phone match needs a similar name (>= 0.8) or a near-identical resume;
+# - without shared contacts, both name and resume must be near-identical.
+EMAIL_WEIGHT = 0.6
+PHONE_WEIGHT = 0.4
+NAME_WEIGHT = 0.25
+RESUME_WEIGHT = 0.45
+# Resume similarity only counts above this cosine similarity
+RESUME_SIMILARITY_FLOOR = 0.8
+
+# Fields copied from the duplicate when the kept candidate has no value
+MERGE_FILL_FIELDS = (
+    "full_name", "email", "phone", "experience_years",
+    "education", "work_experience", "ai_summary",
+)
+
+
+def score_pair(
+    a: Candidate,
+    b: Candidate,
+    resume_similarity: Optional[float] = None,
+) -> Tuple[float, List[str]]:
+    """Likelihood (0-1) that two applications belong to the same person"""
+    score = 0.0
+    reasons = []
+
+    email_a = normalize_email(a.email)
+    if email_a and email_a == normalize_email(b.email):
+        score += EMAIL_WEIGHT
+        reasons.append("email")
+
+    phone_a = normalize_phone(a.phone)
+    if phone_a and phone_a == normalize_phone(b.phone):
+        score += PHONE_WEIGHT
+        reasons.append("phone")
+
+    similarity = name_similarity(normalize_name(a.full_name), normalize_name(b.full_name))
+    if similarity > 0:
+        score += NAME_WEIGHT * similarity
+        reasons.append(f"name:{similarity:.2f}")
+
+    if resume_similarity is not None and resume_similarity > RESUME_SIMILARITY_FLOOR:
+        score += RESUME_WEIGHT * (resume_similarity - RESUME_SIMILARITY_FLOOR) / (1 - RESUME_SIMILARITY_FLOOR)
+        reasons.append(f"resume:{resume_similarity:.2f}")
+
+    return min(score, 1.0), reasons
+
+
+class DedupService:
+    """Blocking-key based duplicate detection, incremental per candidate"""
+
+    @staticmethod
+    async def index_candidate(session: AsyncSession, candidate: Candidate) -> List[str]:
+        """Replace blocking keys for a candidate. Caller commits."""
+        keys = blocking_keys(candidate.email, candidate.phone, candidate.full_name)
+
+        await session.execute(
+            delete(CandidateIdentityKey).where(CandidateIdentityKey.candidate_id == candidate.id)
+        )
+        session.add_all(
+            CandidateIdentityKey(key=key, candidate_id=candidate.id) for key in keys
+        )
+        return keys
+
+    @staticmethod
+    async def block_members(
+        session: AsyncSession,
+        organization_id: int,
+        candidate_id: int,
+        keys: List[str],
+    ) -> Set[int]:
+        """Other candidates of the organization sharing a blocking key, capped per block"""
+        if not keys:
+            return set()
+
+        position = func.row_number().over(
+            partition_by=CandidateIdentityKey.key,
+            order_by=CandidateIdentityKey.candidate_id.desc(),
+        ).label("position")
+        ranked = (
+            select(CandidateIdentityKey.candidate_id, position)
+            .join(Candidate, Candidate.id == CandidateIdentityKey.candidate_id)
+            .where(CandidateIdentityKey.key.in_(keys))
+            .where(Candidate.organization_id == organization_id)
+            .where(CandidateIdentityKey.candidate_id != candidate_id)
+            .subquery()
+        )
+        result = await session.execute(
+            select(ranked.c.candidate_id).where(ranked.c.position <= settings.DEDUP_MAX_BLOCK_SIZE)
+        )
+        return set(result.scalars().all())
+
+    @staticmethod
+    async def resume_similarities(
+        session: AsyncSession,
+        candidate_id: int,
+        other_ids: Set[int],
+    ) -> Dict[int, float]:
+        """Cosine similarity of the candidate's latest resume to the others' resumes"""
+        if not other_ids:
+            return {}
+
+        own_embedding = (
+            select(Resume.embedding)
+            .where(Resume.candidate_id == candidate_id)
+            .where(Resume.embedding.isnot(None))
+            .order_by(Resume.id.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+        distance = Resume.embedding.cosine_distance(own_embedding).label("distance")
+        result = await session.execute(
+            select(Resume.candidate_id, distance)
+            .where(Resume.candidate_id.in_(other_ids))
+            .where(Resume.embedding.isnot(None))
+        )
+
+        similarities: Dict[int, float] = {}
+        for other_id, row_distance in result.all():
+            if row_distance is not None:
+                similarity = round(1.0 - row_distance, 4)
+                similarities[other_id] = max(similarity, similarities.get(other_id, 0.0))
+        return similarities
+
+    @classmethod
+    async def check_candidate(
+        cls,
+        session: AsyncSession,
+        candidate: Candidate,
+    ) -> List[DuplicateCandidate]:
+        """Index the candidate and record merge suggestions. Caller commits."""
+        keys = await cls.index_candidate(session, candidate)
+        member_ids = await cls.block_members(session, candidate.organization_id, candidate.id, keys)
+        if not member_ids:
+            return []
+
+        result = await session.execute(
+            select(Candidate).where(Candidate.id.in_(member_ids))
+        )
+        others = result.scalars().all()
+        similarities = await cls.resume_similarities(session, candidate.id, member_ids)
+
+        result = await session.execute(
+            select(DuplicateCandidate).where(
+                or_(
+                    DuplicateCandidate.candidate_id == candidate.id,
+                    DuplicateCandidate.duplicate_of_id == candidate.id,
+                )
+            )
+        )
+        existing = {
+            (row.candidate_id, row.duplicate_of_id): row for row in result.scalars().all()
+        }
+
+        suggestions = []
+        for other in others:
+            score, reasons = score_pair(candidate, other, similarities.get(other.id))
+            if score < settings.DEDUP_MIN_SCORE:
+                continue
+
+            # The later application is the duplicate of the earlier one
+            pair = (max(candidate.id, other.id), min(candidate.id, other.id))
+            suggestion = existing.get(pair)
+            if suggestion is None:
+                suggestion = DuplicateCandidate(
+                    candidate_id=pair[0],
+                    duplicate_of_id=pair[1],
+                    score=score,
+                    reasons=reasons,
+                )
+            elif suggestion.status == DuplicateStatus.DISMISSED:
+                continue
+            else:
+                suggestion.score = score
+                suggestion.reasons = reasons
+
+            session.add(suggestion)
+            suggestions.append(suggestion)
+
+        return suggestions
+
+    @staticmethod
+    async def merge(
+        session: AsyncSession,
+        suggestion: DuplicateCandidate,
+    ) -> Candidate:
+        """Fold the duplicate application into the earlier one. Caller commits."""
+        result = await session.execute(
+            select(Candidate).where(
+                Candidate.id.in_([suggestion.candidate_id, suggestion.duplicate_of_id])
+            )
+        )
+        candidates = {c.id: c for c in result.scalars().all()}
+        kept = candidates[suggestion.duplicate_of_id]
+        duplicate = candidates[suggestion.candidate_id]
+
+        if kept.vacancy_id != duplicate.vacancy_id:
+            raise ValueError("Applications to different vacancies cannot be merged")
+
+        for field in MERGE_FILL_FIELDS:
+            if getattr(kept, field) in (None, [], "") and getattr(duplicate, field):
+                setattr(kept, field, getattr(duplicate, field))
+        if duplicate.match_score is not None:
+            kept.match_score = max(kept.match_score or 0, duplicate.match_score)
+        kept.skills = list(dict.fromkeys(skills_list(kept.skills) + skills_list(duplicate.skills)))
+
+        # Re-point history and derived rows, then drop the duplicate
+        for model in (Resume, CandidateStage, TalentSuggestion):
+            await session.execute(
+                update(model)
+                .where(model.candidate_id == duplicate.id)
+                .values(candidate_id=kept.id)
+            )
+        await session.execute(
+            delete(DuplicateCandidate).where(
+                or_(
+                    DuplicateCandidate.candidate_id == duplicate.id,
+                    DuplicateCandidate.duplicate_of_id == duplicate.id,
+                )
+            )
+        )
+        await session.execute(
+            delete(CandidateSkill).where(CandidateSkill.candidate_id == duplicate.id)
+        )
+        # The kept application's own intervals describe where it stands now
+        await session.execute(
+            delete(CandidateStageInterval).where(CandidateStageInterval.candidate_id == duplicate.id)
+        )
+        await session.execute(
+            delete(CandidateIdentityKey).where(CandidateIdentityKey.candidate_id == duplicate.id)
+        )
+        await session.delete(duplicate)
+
+        await SkillService.index_candidate(session, kept.id, kept.skills)
+        await DedupService.index_candidate(session, kept)
+        session.add(kept)
+        return kept
@@ -0,0 +1,219 @@
+"""Streaming export of candidates and pipeline history"""
+import csv
+import io
+import json
+import os
+import tempfile
+from datetime import datetime
+from enum import Enum
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+
+import xlsxwriter
+from sqlalchemy import true
+from sqlmodel import select
+
+from app.core.database import async_session
+from app.models.candidate import Candidate, CandidateStatus
+from app.models.pipeline import CandidateStage
+from app.models.stage import Stage
+from app.services.skill_service import skills_list
+
+# Rows fetched per round-trip from the server-side cursor
+EXPORT_BATCH_SIZE = 1000
+# File chunk size when streaming a finished XLSX file
+FILE_CHUNK_SIZE = 64 * 1024
+# Spreadsheets evaluate CSV cells starting with these as formulas
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+# Resume-derived text is data: never turn it into formulas or links
+XLSX_OPTIONS = {"constant_memory": True, "strings_to_formulas": False, "strings_to_urls": False}
+
+CANDIDATE_COLUMNS = [
+    "id", "full_name", "email", "phone", "vacancy_id", "status", "stage",
+    "match_score", "experience_years", "skills", "ai_summary",
+    "last_stage_slug", "last_moved_at", "last_stage_notes", "created_at",
+]
+
+STAGE_HISTORY_COLUMNS = [
+    "id", "candidate_id", "full_name", "stage_slug", "notes", "moved_by", "created_at",
+]
+
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    JSONL = "jsonl"
+    XLSX = "xlsx"
+
+
+MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+    ExportFormat.JSONL: "application/x-ndjson",
+    ExportFormat.XLSX: "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def _cell(value: Any) -> Any:
+    """Flatten a value for tabular output"""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def _csv_cell(value: Any) -> Any:
+    """Flatten a value for CSV, quoting would-be formulas ('=HYPERLINK(...)')"""
+    value = _cell(value)
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def candidates_query(
+    organization_id: int,
+    vacancy_id: Optional[int] = None,
+    status: Optional[CandidateStatus] = None,
+):
+    """Candidates with their current stage and latest stage history entry"""
+    latest_move = (
+        select(
+            CandidateStage.stage_slug.label("last_stage_slug"),
+            CandidateStage.created_at.label("last_moved_at"),
+            CandidateStage.notes.label("last_stage_notes"),
+        )
+        .where(CandidateStage.candidate_id == Candidate.id)
+        .order_by(CandidateStage.created_at.desc())
+        .limit(1)
+        .lateral("latest_move")
+    )
+
+    query = (
+        select(
+            Candidate.id,
+            Candidate.full_name,
+            Candidate.email,
+            Candidate.phone,
+            Candidate.vacancy_id,
+            Candidate.status,
+            Stage.name.label("stage"),
+            Candidate.match_score,
+            Candidate.experience_years,
+            Candidate.skills,
+            Candidate.ai_summary,
+            latest_move.c.last_stage_slug,
+            latest_move.c.last_moved_at,
+            latest_move.c.last_stage_notes,
+            Candidate.created_at,
+        )
+        .outerjoin(Stage, Stage.id == Candidate.current_stage_id)
+        .outerjoin(latest_move, true())
+        .where(Candidate.organization_id == organization_id)
+        .order_by(Candidate.id)
+    )
+    if vacancy_id:
+        query = query.where(Candidate.vacancy_id == vacancy_id)
+    if status:
+        query = query.where(Candidate.status == status)
+    return query
+
+
+def stage_history_query(organization_id: int, vacancy_id: int):
+    """Full stage movement history of a vacancy's candidates"""
+    return (
+        select(
+            CandidateStage.id,
+            CandidateStage.candidate_id,
+            Candidate.full_name,
+            CandidateStage.stage_slug,
+            CandidateStage.notes,
+            CandidateStage.moved_by,
+            CandidateStage.created_at,
+        )
+        .join(Candidate, Candidate.id == CandidateStage.candidate_id)
+        .where(Candidate.organization_id == organization_id)
+        .where(Candidate.vacancy_id == vacancy_id)
+        .order_by(CandidateStage.candidate_id, CandidateStage.created_at)
+    )
+
+
+class ExportService:
+    """Write query results as they arrive from a server-side cursor"""
+
+    @staticmethod
+    async def iter_rows(query, columns: Sequence[str]) -> AsyncIterator[List[Dict]]:
+        """Batches of row dicts; memory is bounded by EXPORT_BATCH_SIZE"""
+        # The response outlives the request session, so the stream owns its own
+        async with async_session() as session:
+            result = await session.stream(
+                query.execution_options(yield_per=EXPORT_BATCH_SIZE)
+            )
+            async for partition in result.partitions():
+                batch = []
+                for row in partition:
+                    item = dict(zip(columns, row))
+                    if "skills" in item:
+                        item["skills"] = "; ".join(skills_list(item["skills"]))
+                    batch.append(item)
+                yield batch
+
+    @classmethod
+    async def stream_csv(cls, query, columns: Sequence[str]) -> AsyncIterator[bytes]:
+        # BOM so Excel opens Cyrillic text correctly
+        yield "\ufeff".encode("utf-8")
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+
+        async for batch in cls.iter_rows(query, columns):
+            for item in batch:
+                writer.writerow([_csv_cell(item[column]) for column in columns])
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+
+    @classmethod
+    async def stream_jsonl(cls, query, columns: Sequence[str]) -> AsyncIterator[bytes]:
+        async for batch in cls.iter_rows(query, columns):
+            yield "".join(
+                json.dumps(
+                    {column: _cell(item[column]) for column in columns},
+                    ensure_ascii=False,
+                ) + "\n"
+                for item in batch
+            ).encode("utf-8")
+
+    @classmethod
+    async def stream_xlsx(cls, query, columns: Sequence[str]) -> AsyncIterator[bytes]:
+        """XLSX must be finalized before sending; rows are flushed to disk as they arrive"""
+        fd, path = tempfile.mkstemp(suffix=".xlsx")
+        os.close(fd)
+        try:
+            workbook = xlsxwriter.Workbook(path, XLSX_OPTIONS)
+            worksheet = workbook.add_worksheet("export")
+            worksheet.write_row(0, 0, columns)
+
+            row_index = 1
+            async for batch in cls.iter_rows(query, columns):
+                for item in batch:
+                    worksheet.write_row(row_index, 0, [_cell(item[column]) for column in columns])
+                    row_index += 1
+            workbook.close()
+
+            with open(path, "rb") as file:
+                while chunk := file.read(FILE_CHUNK_SIZE):
+                    yield chunk
+        finally:
+            os.remove(path)
+
+    @classmethod
+    def stream(cls, query, columns: Sequence[str], export_format: ExportFormat) -> AsyncIterator[bytes]:
+        if export_format == ExportFormat.XLSX:
+            return cls.stream_xlsx(query, columns)
+        if export_format == ExportFormat.JSONL:
+            return cls.stream_jsonl(query, columns)
+        return cls.stream_csv(query, columns)
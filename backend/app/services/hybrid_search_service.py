@@ -0,0 +1,249 @@
+"""Hybrid lexical + semantic candidate search with reciprocal rank fusion"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.core.config import settings
+from app.core.database import async_session
+from app.core.quotas import QuotaExceededError
+from app.models.candidate import Candidate, CandidateStatus
+from app.models.resume import Resume
+from app.services.ai_service import AIService
+from app.services.llm_errors import LLMError
+from app.services.search_service import SearchService, build_tsquery
+
+logger = logging.getLogger(__name__)
+
+
+class QueryEmbeddingCache:
+    """In-process LRU cache of query embeddings with TTL"""
+
+    def __init__(self, max_size: int, ttl_seconds: int):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._items: "OrderedDict[str, Tuple[float, List[float]]]" = OrderedDict()
+
+    @staticmethod
+    def key(query: str, model: str) -> str:
+        return f"{model}:{' '.join(query.lower().split())}"
+
+    def get(self, key: str) -> Optional[List[float]]:
+        item = self._items.get(key)
+        if item is None:
+            return None
+        stored_at, embedding = item
+        if time.monotonic() - stored_at > self.ttl_seconds:
+            del self._items[key]
+            return None
+        self._items.move_to_end(key)
+        return embedding
+
+    def set(self, key: str, embedding: List[float]) -> None:
+        self._items[key] = (time.monotonic(), embedding)
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+
+query_embedding_cache = QueryEmbeddingCache(
+    max_size=settings.QUERY_EMBEDDING_CACHE_SIZE,
+    ttl_seconds=settings.QUERY_EMBEDDING_CACHE_TTL_SECONDS,
+)
+
+
+def reciprocal_rank_fusion(
+    rankings: Dict[str, List[int]],
+    k: int = 60,
+) -> List[Tuple[int, float, Dict[str, int]]]:
+    """Fuse ranked ID lists: score(d) = sum over lists of 1 / (k + rank(d))
+
+    Returns (id, score, {list_name: 1-based rank}) ordered by score.
+    """
+    scores: Dict[int, float] = {}
+    ranks: Dict[int, Dict[str, int]] = {}
+
+    for name, ids in rankings.items():
+        for position, item_id in enumerate(ids, start=1):
+            scores[item_id] = scores.get(item_id, 0.0) + 1.0 / (k + position)
+            ranks.setdefault(item_id, {})[name] = position
+
+    fused = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+    return [(item_id, score, ranks[item_id]) for item_id, score in fused]
+
+
+class HybridSearchService:
+    """Run full-text and embedding search concurrently and fuse the rankings"""
+
+    @staticmethod
+    def _filtered(
+        query,
+        organization_id: int,
+        vacancy_id: Optional[int],
+        status: Optional[CandidateStatus],
+    ):
+        query = query.where(Candidate.organization_id == organization_id)
+        if vacancy_id:
+            query = query.where(Candidate.vacancy_id == vacancy_id)
+        if status:
+            query = query.where(Candidate.status == status)
+        return query
+
+    @staticmethod
+    async def query_embedding(
+        query: str,
+        organization_id: int,
+        user_id: Optional[int] = None,
+    ) -> List[float]:
+        """Embedding for the search query, cached per normalized query text"""
+        ai_service = AIService(organization_id=organization_id, user_id=user_id)
+        key = QueryEmbeddingCache.key(query, ai_service.embedding_model)
+
+        embedding = query_embedding_cache.get(key)
+        if embedding is None:
+            embedding = await ai_service.generate_embedding(query)
+            query_embedding_cache.set(key, embedding)
+        return embedding
+
+    @classmethod
+    async def lexical_candidates(
+        cls,
+        query: str,
+        organization_id: int,
+        vacancy_id: Optional[int],
+        status: Optional[CandidateStatus],
+        limit: int,
+    ) -> List[int]:
+        """Candidate IDs ranked by full-text relevance"""
+        if not build_tsquery(query):
+            return []
+
+        ts_query = SearchService.tsquery(query)
+        rank = func.ts_rank_cd(Resume.search_vector, ts_query, 32).label("rank")
+        ranked = (
+            SearchService.ranked_query(ts_query, rank, organization_id, vacancy_id, status)
+            .add_columns(Resume.candidate_id)
+            .order_by(rank.desc(), Resume.id.desc())
+            .limit(limit)
+        )
+
+        async with async_session() as session:
+            result = await session.execute(ranked)
+            return [row.candidate_id for row in result.all()]
+
+    @classmethod
+    async def semantic_candidates(
+        cls,
+        query: str,
+        organization_id: int,
+        vacancy_id: Optional[int],
+        status: Optional[CandidateStatus],
+        limit: int,
+        user_id: Optional[int] = None,
+    ) -> Tuple[List[int], Dict[int, float]]:
+        """Candidate IDs ranked by cosine similarity of resume embeddings"""
+        embedding = await cls.query_embedding(query, organization_id, user_id)
+        distance = Resume.embedding.cosine_distance(embedding).label("distance")
+
+        ranked = cls._filtered(
+            select(Resume.candidate_id, distance)
+            .join(Candidate, Candidate.id == Resume.candidate_id)
+            .where(Resume.embedding.isnot(None)),
+            organization_id,
+            vacancy_id,
+            status,
+        ).order_by(distance).limit(limit)
+
+        async with async_session() as session:
+            result = await session.execute(ranked)
+            rows = result.all()
+
+        return (
+            [row.candidate_id for row in rows],
+            {row.candidate_id: round(1.0 - row.distance, 4) for row in rows},
+        )
+
+    @classmethod
+    async def _semantic_or_none(
+        cls,
+        query: str,
+        organization_id: int,
+        vacancy_id: Optional[int],
+        status: Optional[CandidateStatus],
+        limit: int,
+        user_id: Optional[int] = None,
+    ) -> Optional[Tuple[List[int], Dict[int, float]]]:
+        """Semantic leg, or None when the query cannot be embedded (provider
+        outage, open circuit, quota); the lexical leg still answers"""
+        try:
+            return await cls.semantic_candidates(query, organization_id, vacancy_id, status, limit, user_id)
+        except (LLMError, QuotaExceededError) as e:
+            logger.warning("Semantic search unavailable, answering with full-text results: %s", e)
+            return None
+
+    @classmethod
+    async def search(
+        cls,
+        session: AsyncSession,
+        organization_id: int,
+        query: str,
+        vacancy_id: Optional[int] = None,
+        status: Optional[CandidateStatus] = None,
+        limit: int = 20,
+        user_id: Optional[int] = None,
+    ) -> Dict:
+        """Hybrid candidate search fused with reciprocal rank fusion
+
+        If the query embedding fails, results are full-text only and
+        `degraded` is set.
+        """
+        if not query.strip():
+            raise ValueError("Search query is empty")
+
+        per_leg = settings.HYBRID_SEARCH_CANDIDATES_PER_LEG
+        lexical_ids, semantic = await asyncio.gather(
+            cls.lexical_candidates(query, organization_id, vacancy_id, status, per_leg),
+            cls._semantic_or_none(query, organization_id, vacancy_id, status, per_leg, user_id),
+        )
+        degraded = semantic is None
+        semantic_ids, similarities = semantic or ([], {})
+
+        # A candidate may have several resumes; keep their best position per leg
+        fused = reciprocal_rank_fusion(
+            {
+                "lexical": list(dict.fromkeys(lexical_ids)),
+                "semantic": list(dict.fromkeys(semantic_ids)),
+            },
+            k=settings.HYBRID_SEARCH_RRF_K,
+        )[:limit]
+        if not fused:
+            return {"results": [], "degraded": degraded}
+
+        result = await session.execute(
+            select(Candidate).where(Candidate.id.in_([item_id for item_id, _, _ in fused]))
+        )
+        candidates = {c.id: c for c in result.scalars().all()}
+
+        return {
+            "results": [
+                {
+                    "candidate_id": candidate_id,
+                    "full_name": candidates[candidate_id].full_name,
+                    "vacancy_id": candidates[candidate_id].vacancy_id,
+                    "status": candidates[candidate_id].status,
+                    "match_score": candidates[candidate_id].match_score,
+                    "score": round(score, 6),
+                    "lexical_rank": ranks.get("lexical"),
+                    "semantic_rank": ranks.get("semantic"),
+                    "similarity": similarities.get(candidate_id),
+                }
+                for candidate_id, score, ranks in fused
+                if candidate_id in candidates
+            ],
+            "degraded": degraded,
+        }
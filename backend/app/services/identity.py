@@ -0,0 +1,132 @@
+"""Normalization of candidate identity fields and dedup blocking keys"""
+import re
+import unicodedata
+from typing import List, Optional, Set
+
+from app.core.config import settings
+
+_NON_DIGITS_RE = re.compile(r"\D")
+_NAME_TOKEN_RE = re.compile(r"[^\W\d_]+", re.UNICODE)
+
+# Mailbox providers that ignore dots in the local part
+_DOTLESS_EMAIL_DOMAINS = {"gmail.com", "googlemail.com"}
+
+_TRANSLIT = str.maketrans({
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "e",
+    "ж": "zh", "з": "z", "и": "i", "й": "i", "к": "k", "л": "l", "м": "m",
+    "н": "n", "о": "o", "п": "p", "р": "r", "с": "s", "т": "t", "у": "u",
+    "ф": "f", "х": "kh", "ц": "ts", "ч": "ch", "ш": "sh", "щ": "shch",
+    "ъ": "", "ы": "y", "ь": "", "э": "e", "ю": "yu", "я": "ya",
+})
+
+
+def normalize_email(email: Optional[str]) -> Optional[str]:
+    """Canonical mailbox: lowercased, +tag removed, gmail dots removed"""
+    if not email or "@" not in email:
+        return None
+
+    local, _, domain = email.strip().lower().rpartition("@")
+    local = local.split("+", 1)[0]
+    if domain in _DOTLESS_EMAIL_DOMAINS:
+        local = local.replace(".", "")
+        domain = "gmail.com"
+
+    if not local or not domain:
+        return None
+    return f"{local}@{domain}"
+
+
+def normalize_phone(phone: Optional[str]) -> Optional[str]:
+    """Phone in E.164 format (+79991234567), assuming the default country code"""
+    if not phone:
+        return None
+
+    raw = phone.strip()
+    digits = _NON_DIGITS_RE.sub("", raw)
+    country = settings.DEFAULT_PHONE_COUNTRY_CODE
+
+    if raw.startswith("+"):
+        pass
+    elif digits.startswith("00"):
+        digits = digits[2:]
+    elif country == "7" and len(digits) == 11 and digits[0] == "8":
+        # Russian trunk prefix: 8 (999) ... == +7 (999) ...
+        digits = "7" + digits[1:]
+    elif len(digits) == 10:
+        digits = country + digits
+
+    if not 8 <= len(digits) <= 15:
+        return None
+    return f"+{digits}"
+
+
+def normalize_name(full_name: Optional[str]) -> Optional[str]:
+    """Transliterated, order-insensitive name: 'Петров Иван' -> 'ivan petrov'"""
+    if not full_name:
+        return None
+
+    text = unicodedata.normalize("NFKC", full_name).casefold().translate(_TRANSLIT)
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    tokens = sorted(token for token in _NAME_TOKEN_RE.findall(text) if len(token) > 1)
+    return " ".join(tokens) or None
+
+
+def name_trigrams(name: Optional[str]) -> Set[str]:
+    """Character trigrams of a normalized name, padded like pg_trgm"""
+    trigrams: Set[str] = set()
+    for token in (name or "").split():
+        padded = f"  {token} "
+        trigrams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return trigrams
+
+
+def name_similarity(a: Optional[str], b: Optional[str]) -> float:
+    """Trigram Jaccard similarity of two normalized names (0-1)"""
+    trigrams_a, trigrams_b = name_trigrams(a), name_trigrams(b)
+    if not trigrams_a or not trigrams_b:
+        return 0.0
+    return len(trigrams_a & trigrams_b) / len(trigrams_a | trigrams_b)
+
+
+def blocking_keys(
+    email: Optional[str],
+    phone: Optional[str],
+    full_name: Optional[str],
+) -> List[str]:
+    """Keys under which possible duplicates are grouped
+
+    Exact normalized email and E.164 phone, plus a coarse name key built
+    from the leading trigram of each name token, so typos later in the
+    name still land in the same block.
+    """
+    keys = []
+
+    normalized_email = normalize_email(email)
+    if normalized_email:
+        keys.append(f"email:{normalized_email}")
+
+    normalized_phone = normalize_phone(phone)
+    if normalized_phone:
+        keys.append(f"phone:{normalized_phone}")
+
+    normalized_name = normalize_name(full_name)
+    if normalized_name and len(normalized_name.split()) >= 2:
+        keys.append("name:" + "|".join(token[:3] for token in normalized_name.split()))
+
+    return keys
+
+
+def identity_key(
+    email: Optional[str],
+    phone: Optional[str],
+    candidate_id: int,
+) -> str:
+    """Key identifying a person across applications"""
+    normalized_email = normalize_email(email)
+    if normalized_email:
+        return f"email:{normalized_email}"
+    normalized_phone = normalize_phone(phone)
+    if normalized_phone:
+        return f"phone:{normalized_phone}"
+    return f"candidate:{candidate_id}"
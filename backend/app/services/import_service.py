@@ -0,0 +1,542 @@
+"""Bulk import of candidates from ATS exports through a COPY staging table"""
+import csv
+import json
+import time
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from sqlalchemy import (
+    JSON,
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    case,
+    cast,
+    delete,
+    exists,
+    func,
+    literal,
+    literal_column,
+    or_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.core.config import settings
+from app.models.candidate import Candidate, CandidateStatus
+from app.models.pipeline import INITIAL_STAGE, CandidateStage
+from app.models.resume import Resume, ResumeStatus
+from app.models.skill import CandidateSkill
+from app.models.vacancy import Vacancy
+from app.services.skill_service import normalize_skills
+
+# Rejected rows reported back with their error
+MAX_REPORTED_ERRORS = 20
+# Resume text in a CSV cell easily exceeds the csv module's 128 KB default
+MAX_CSV_FIELD_SIZE = 16 * 1024 * 1024
+
+IMPORT_COLUMNS = [
+    "external_id", "vacancy_id", "full_name", "email", "phone", "status",
+    "skills", "experience_years", "raw_text", "resume_path", "resume_filename",
+    "stage_slug", "stage_entered_at", "created_at",
+]
+
+
+class ImportFormat(str, Enum):
+    CSV = "csv"
+    JSONL = "jsonl"
+
+
+# Staging tables live only for the importing transaction
+_staging_metadata = MetaData()
+
+staging = Table(
+    "import_candidates",
+    _staging_metadata,
+    Column("row_no", Integer),
+    Column("external_id", String),
+    Column("vacancy_id", Integer),
+    Column("full_name", String),
+    Column("email", String),
+    Column("phone", String),
+    Column("status", String),
+    Column("skills", JSON),
+    Column("experience_years", Integer),
+    Column("raw_text", Text),
+    Column("resume_path", String),
+    Column("resume_filename", String),
+    Column("stage_slug", String),
+    Column("stage_entered_at", DateTime(timezone=True)),
+    Column("created_at", DateTime(timezone=True)),
+    Column("candidate_id", Integer),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+
+staging_skills = Table(
+    "import_candidate_skills",
+    _staging_metadata,
+    Column("external_id", String),
+    Column("skill", String),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+
+# Columns filled by COPY (candidate_id is resolved after the upsert)
+STAGING_COPY_COLUMNS = [column.name for column in staging.columns if column.name != "candidate_id"]
+
+
+def read_rows(stream: TextIO, file_format: ImportFormat) -> Iterator[Dict[str, Any]]:
+    """Raw rows of a CSV (with header) or JSON Lines export"""
+    if file_format == ImportFormat.JSONL:
+        for line in stream:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield row if isinstance(row, dict) else {"__invalid__": "Invalid JSON line"}
+        return
+
+    csv.field_size_limit(MAX_CSV_FIELD_SIZE)
+    yield from csv.DictReader(stream)
+
+
+def _text(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _int(value: Any, field: str) -> Optional[int]:
+    value = _text(value)
+    if value is None:
+        return None
+    try:
+        return int(float(value))
+    except ValueError:
+        raise ValueError(f"{field}: not a number")
+
+
+def _datetime(value: Any, field: str) -> Optional[datetime]:
+    value = _text(value)
+    if value is None:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError(f"{field}: expected ISO 8601 date")
+
+
+def _skills(value: Any) -> List[str]:
+    if isinstance(value, list):
+        return [str(skill) for skill in value if skill]
+    value = _text(value)
+    if value is None:
+        return []
+    if value.startswith("["):
+        try:
+            return [str(skill) for skill in json.loads(value) if skill]
+        except ValueError:
+            pass
+    separator = ";" if ";" in value else ","
+    return [skill.strip() for skill in value.split(separator) if skill.strip()]
+
+
+def to_record(
+    row_no: int,
+    row: Dict[str, Any],
+    default_vacancy_id: Optional[int] = None,
+) -> Tuple[tuple, List[str]]:
+    """Staging record and normalized skills for one row; ValueError if invalid"""
+    if "__invalid__" in row:
+        raise ValueError(row["__invalid__"])
+
+    email = _text(row.get("email"))
+    external_id = _text(row.get("external_id")) or (email.lower() if email else None)
+    if not external_id:
+        raise ValueError("external_id or email is required")
+
+    vacancy_id = _int(row.get("vacancy_id"), "vacancy_id") or default_vacancy_id
+    if not vacancy_id:
+        raise ValueError("vacancy_id is required")
+
+    status = (_text(row.get("status")) or CandidateStatus.NEW.value).lower()
+    try:
+        # Staged by enum name, the way the candidates column stores it
+        status = CandidateStatus(status).name
+    except ValueError:
+        raise ValueError(f"status: unknown value '{status}'")
+
+    raw_skills = _skills(row.get("skills"))
+    record = (
+        row_no,
+        external_id,
+        vacancy_id,
+        _text(row.get("full_name")),
+        email,
+        _text(row.get("phone")),
+        status,
+        json.dumps(raw_skills, ensure_ascii=False),
+        _int(row.get("experience_years"), "experience_years"),
+        _text(row.get("raw_text")),
+        _text(row.get("resume_path")),
+        _text(row.get("resume_filename")),
+        _text(row.get("stage_slug")),
+        _datetime(row.get("stage_entered_at"), "stage_entered_at"),
+        _datetime(row.get("created_at"), "created_at"),
+    )
+    return record, normalize_skills(raw_skills)
+
+
+class ImportService:
+    """Load rows with COPY, then validate and upsert them in a few set-based statements"""
+
+    @staticmethod
+    async def _copy(session: AsyncSession, table: Table, columns: List[str], records: List[tuple]) -> None:
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            table.name, records=records, columns=columns
+        )
+
+    @classmethod
+    async def stage(
+        cls,
+        session: AsyncSession,
+        rows: Iterable[Dict[str, Any]],
+        default_vacancy_id: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Create the staging tables and COPY valid rows into them in chunks"""
+        connection = await session.connection()
+        await connection.run_sync(
+            lambda sync_connection: _staging_metadata.create_all(sync_connection, checkfirst=False)
+        )
+
+        chunk_size = settings.IMPORT_COPY_CHUNK_SIZE
+        records: List[tuple] = []
+        skill_records: List[tuple] = []
+        read = 0
+        errors: List[Dict[str, Any]] = []
+        rejected = 0
+
+        for row_no, row in enumerate(rows, start=1):
+            read += 1
+            try:
+                record, skills = to_record(row_no, row, default_vacancy_id)
+            except ValueError as e:
+                rejected += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({"row": row_no, "error": str(e)})
+                continue
+
+            records.append(record)
+            skill_records.extend((record[1], skill) for skill in skills)
+
+            if len(records) >= chunk_size:
+                await cls._copy(session, staging, STAGING_COPY_COLUMNS, records)
+                await cls._copy(session, staging_skills, ["external_id", "skill"], skill_records)
+                records, skill_records = [], []
+
+        if records:
+            await cls._copy(session, staging, STAGING_COPY_COLUMNS, records)
+        if skill_records:
+            await cls._copy(session, staging_skills, ["external_id", "skill"], skill_records)
+
+        return {"rows_read": read, "rows_rejected": rejected, "errors": errors}
+
+    @staticmethod
+    async def validate(session: AsyncSession, organization_id: int) -> Tuple[List[int], int]:
+        """Drop rows for unknown (or other tenants') vacancies and all but the last row per external_id"""
+        result = await session.execute(
+            delete(staging)
+            .where(~exists().where(
+                Vacancy.id == staging.c.vacancy_id,
+                Vacancy.organization_id == organization_id,
+            ))
+            .returning(staging.c.row_no)
+        )
+        unknown_vacancy_rows = sorted(row_no for (row_no,) in result.all())
+
+        newer = staging.alias("newer")
+        result = await session.execute(
+            delete(staging).where(
+                exists().where(
+                    newer.c.external_id == staging.c.external_id,
+                    newer.c.row_no > staging.c.row_no,
+                )
+            )
+        )
+        return unknown_vacancy_rows, result.rowcount
+
+    @staticmethod
+    async def upsert_candidates(
+        session: AsyncSession,
+        organization_id: int,
+        source: str,
+        uploaded_by: Optional[int] = None,
+    ) -> Tuple[int, int]:
+        """Insert new candidates and refresh existing ones; returns (inserted, updated)
+
+        `uploaded_by` is recorded on inserted candidates only.
+        """
+        candidates = Candidate.__table__
+        empty_list = cast(literal("[]"), JSON)
+
+        upsert = insert(candidates).from_select(
+            [
+                "organization_id", "source", "uploaded_by", "external_id", "vacancy_id",
+                "full_name", "email", "phone", "status", "skills", "experience_years",
+                "strengths", "weaknesses", "created_at", "updated_at",
+            ],
+            select(
+                literal(organization_id),
+                literal(source),
+                literal(uploaded_by, Integer),
+                staging.c.external_id,
+                staging.c.vacancy_id,
+                staging.c.full_name,
+                staging.c.email,
+                staging.c.phone,
+                cast(staging.c.status, candidates.c.status.type),
+                staging.c.skills,
+                staging.c.experience_years,
+                empty_list,
+                empty_list,
+                func.coalesce(staging.c.created_at, func.now()),
+                func.now(),
+            ),
+        )
+        upsert = upsert.on_conflict_do_update(
+            constraint="uq_candidates_org_source_external_id",
+            set_={
+                "vacancy_id": upsert.excluded.vacancy_id,
+                "full_name": func.coalesce(upsert.excluded.full_name, candidates.c.full_name),
+                "email": func.coalesce(upsert.excluded.email, candidates.c.email),
+                "phone": func.coalesce(upsert.excluded.phone, candidates.c.phone),
+                "status": upsert.excluded.status,
+                "skills": upsert.excluded.skills,
+                "experience_years": func.coalesce(
+                    upsert.excluded.experience_years, candidates.c.experience_years
+                ),
+                "updated_at": func.now(),
+            },
+        )
+        # xmax is 0 only for freshly inserted tuples
+        upserted = upsert.returning(literal_column("xmax = 0").label("inserted")).cte("upserted")
+
+        result = await session.execute(
+            select(
+                func.count().filter(upserted.c.inserted),
+                func.count().filter(~upserted.c.inserted),
+            )
+        )
+        inserted, updated = result.one()
+
+        await session.execute(
+            update(staging)
+            .values(candidate_id=candidates.c.id)
+            .where(
+                candidates.c.organization_id == organization_id,
+                candidates.c.source == source,
+                candidates.c.external_id == staging.c.external_id,
+            )
+        )
+        return inserted, updated
+
+    @staticmethod
+    async def index_skills(session: AsyncSession) -> None:
+        """Replace the skill index of imported candidates"""
+        await session.execute(
+            delete(CandidateSkill).where(
+                CandidateSkill.candidate_id.in_(select(staging.c.candidate_id))
+            )
+        )
+        await session.execute(
+            insert(CandidateSkill.__table__)
+            .from_select(
+                ["candidate_id", "skill"],
+                select(staging.c.candidate_id, staging_skills.c.skill)
+                .join(staging_skills, staging_skills.c.external_id == staging.c.external_id)
+                .distinct(),
+            )
+            .on_conflict_do_nothing()
+        )
+
+    @staticmethod
+    async def upsert_resumes(session: AsyncSession, source: str) -> None:
+        """Attach resume text/files; re-imports update the same resume row"""
+        resumes = Resume.__table__
+        status_type = resumes.c.status.type
+        file_path = func.coalesce(
+            staging.c.resume_path,
+            literal(f"import://{source}/") + staging.c.external_id,
+        )
+
+        await session.execute(
+            update(resumes)
+            .values(
+                raw_text=staging.c.raw_text,
+                status=literal(ResumeStatus.PARSED, status_type),
+                updated_at=func.now(),
+            )
+            .where(
+                resumes.c.candidate_id == staging.c.candidate_id,
+                resumes.c.file_path == file_path,
+                staging.c.raw_text.isnot(None),
+                resumes.c.raw_text.is_distinct_from(staging.c.raw_text),
+            )
+        )
+
+        await session.execute(
+            insert(resumes).from_select(
+                [
+                    "candidate_id", "filename", "file_path", "file_size", "mime_type",
+                    "raw_text", "status", "created_at", "updated_at",
+                ],
+                select(
+                    staging.c.candidate_id,
+                    func.coalesce(staging.c.resume_filename, staging.c.external_id + ".txt"),
+                    file_path,
+                    func.coalesce(func.octet_length(staging.c.raw_text), 0),
+                    case(
+                        (staging.c.resume_path.isnot(None), "application/octet-stream"),
+                        else_="text/plain",
+                    ),
+                    staging.c.raw_text,
+                    case(
+                        (staging.c.raw_text.isnot(None), literal(ResumeStatus.PARSED, status_type)),
+                        else_=literal(ResumeStatus.UPLOADED, status_type),
+                    ),
+                    func.coalesce(staging.c.created_at, func.now()),
+                    func.now(),
+                ).where(
+                    or_(staging.c.raw_text.isnot(None), staging.c.resume_path.isnot(None)),
+                    ~exists().where(
+                        resumes.c.candidate_id == staging.c.candidate_id,
+                        resumes.c.file_path == file_path,
+                    ),
+                ),
+            )
+        )
+
+    @staticmethod
+    async def insert_stage_history(session: AsyncSession, source: str, moved_by: int) -> None:
+        """Record the imported stage unless the candidate already has it in history
+
+        Rows without a stage put candidates with no history yet into the
+        initial stage, like applications made through the API.
+        """
+        stages = CandidateStage.__table__
+        entered_at = func.coalesce(staging.c.stage_entered_at, staging.c.created_at, func.now())
+
+        await session.execute(
+            insert(stages).from_select(
+                ["candidate_id", "stage_slug", "notes", "moved_by", "created_at", "updated_at"],
+                select(
+                    staging.c.candidate_id,
+                    func.coalesce(staging.c.stage_slug, INITIAL_STAGE),
+                    literal(f"Imported from {source}"),
+                    literal(moved_by),
+                    entered_at,
+                    entered_at,
+                ).where(
+                    ~exists().where(
+                        stages.c.candidate_id == staging.c.candidate_id,
+                        or_(
+                            stages.c.stage_slug == staging.c.stage_slug,
+                            staging.c.stage_slug.is_(None),
+                        ),
+                    ),
+                ),
+            )
+        )
+
+    @staticmethod
+    async def pending_processing(session: AsyncSession) -> Tuple[List[int], List[int]]:
+        """Imported resumes still needing work: (to parse, to embed only)"""
+        result = await session.execute(
+            select(Resume.id, Resume.raw_text.is_(None).label("needs_parse"))
+            .join(staging, staging.c.candidate_id == Resume.candidate_id)
+            .where(Resume.embedding.is_(None))
+            .order_by(Resume.id)
+        )
+        to_parse, to_embed = [], []
+        for resume_id, needs_parse in result.all():
+            (to_parse if needs_parse else to_embed).append(resume_id)
+        return to_parse, to_embed
+
+    @classmethod
+    async def import_candidates(
+        cls,
+        session: AsyncSession,
+        rows: Iterable[Dict[str, Any]],
+        organization_id: int,
+        source: str,
+        moved_by: int,
+        default_vacancy_id: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Import rows into the organization in one transaction and report throughput
+
+        `source` names the origin system; candidates are matched on
+        (organization, source, external_id), so re-running an import updates
+        rows in place. Rows pointing at other tenants' vacancies are rejected.
+        The caller commits, which also drops the staging tables.
+        """
+        source = f"import:{source}"
+        timings: Dict[str, float] = {}
+        started = last = time.perf_counter()
+
+        def lap(phase: str) -> None:
+            nonlocal last
+            now = time.perf_counter()
+            timings[phase] = round(now - last, 3)
+            last = now
+
+        report = await cls.stage(session, rows, default_vacancy_id)
+        lap("copy")
+
+        unknown_vacancy_rows, duplicates = await cls.validate(session, organization_id)
+        for row_no in unknown_vacancy_rows:
+            if len(report["errors"]) >= MAX_REPORTED_ERRORS:
+                break
+            report["errors"].append({"row": row_no, "error": "vacancy_id: vacancy not found"})
+        report["rows_rejected"] += len(unknown_vacancy_rows)
+        report["duplicates_in_file"] = duplicates
+        lap("validate")
+
+        inserted, updated = await cls.upsert_candidates(session, organization_id, source, uploaded_by=moved_by)
+        lap("candidates")
+
+        await cls.index_skills(session)
+        await cls.upsert_resumes(session, source)
+        await cls.insert_stage_history(session, source, moved_by)
+        lap("resumes_and_stages")
+
+        to_parse, to_embed = await cls.pending_processing(session)
+        result = await session.execute(select(staging.c.vacancy_id).distinct())
+        vacancy_ids = sorted(result.scalars().all())
+        lap("pending")
+
+        elapsed = time.perf_counter() - started
+        report.update({
+            "inserted": inserted,
+            "updated": updated,
+            "resumes_to_parse": to_parse,
+            "resumes_to_embed": to_embed,
+            "vacancy_ids": vacancy_ids,
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round(report["rows_read"] / elapsed, 1) if elapsed else None,
+            "timings": timings,
+        })
+        return report
@@ -0,0 +1,403 @@
+"""Chat and embedding backends behind AIService
+
+Selected by LLM_BACKEND and EMBEDDING_BACKEND:
+
+- openai: the OpenAI API, or any OpenAI-compatible server (vLLM, Ollama,
+  llama.cpp, TEI) when OPENAI_BASE_URL points at it - the way to run
+  chat models on-prem.
+- sentence-transformers (embeddings only): a local model, batched
+  inference on LOCAL_EMBEDDING_DEVICE; no network once the model is in
+  the local cache. EMBEDDING_DIMENSIONS must match the model.
+- stub: deterministic, offline answers. Chat replies are derived from
+  the prompt (contacts and known skills found in the resume, skill
+  overlap as the match score); embeddings are hashed bags of words, so
+  texts sharing words are still close. For development, tests and
+  air-gapped demos: same input, same output, constant throughput.
+
+Backends are blocking; AIService runs them in a thread. `stream` yields
+the answer in pieces, usage on the last one. Provider failures are raised
+as typed LLMErrors (app/services/llm_errors.py); OpenAI calls time out
+after LLM_TIMEOUT_SECONDS / EMBEDDING_TIMEOUT_SECONDS.
+"""
+import hashlib
+import json
+import math
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional
+
+import httpx
+from openai import OpenAI, OpenAIError
+
+from app.core.config import settings
+from app.services.llm_errors import openai_error
+from app.services.skill_service import CANONICAL_SKILLS, normalize_skill, skill_overlap
+
+STUB_CHAT_MODEL = "stub"
+STUB_EMBEDDING_MODEL = "stub-hashing"
+
+
+@dataclass
+class TokenUsage:
+    """Usage of a local call, shaped like the OpenAI usage object"""
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+
+@dataclass
+class ChatResult:
+    content: str
+    usage: Any = None
+    # Model that answered when it differs from the requested one (priced by it)
+    model: Optional[str] = None
+
+
+@dataclass
+class EmbeddingResult:
+    vectors: List[List[float]]
+    usage: Any = None
+
+
+def _estimate_tokens(text: str) -> int:
+    # Fixed ratio rather than a tokenizer: local usage stays deterministic
+    return max(1, len(text) // 4)
+
+
+class ChatBackend:
+    """Interface of chat backends"""
+
+    name: str = ""
+
+    def complete(
+        self,
+        operation: str,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        json_mode: bool = False,
+    ) -> ChatResult:
+        raise NotImplementedError
+
+    def stream(
+        self,
+        operation: str,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        json_mode: bool = False,
+    ) -> Iterator[ChatResult]:
+        """Content deltas as they are generated; whole answer by default"""
+        yield self.complete(operation, model, messages, temperature, json_mode)
+
+
+class EmbeddingBackend:
+    """Interface of embedding backends"""
+
+    name: str = ""
+    model: str = ""
+
+    def embed(self, texts: List[str]) -> EmbeddingResult:
+        """One vector per text, in order"""
+        raise NotImplementedError
+
+
+def _openai_client(timeout: float) -> OpenAI:
+    # The SDK default (10 minutes, two retries) would hold a worker through an outage
+    return OpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        base_url=settings.OPENAI_BASE_URL,
+        timeout=httpx.Timeout(timeout, connect=settings.LLM_CONNECT_TIMEOUT_SECONDS),
+        max_retries=settings.LLM_CLIENT_MAX_RETRIES,
+    )
+
+
+class OpenAIChatBackend(ChatBackend):
+    name = "openai"
+
+    def __init__(self, client: Optional[OpenAI] = None):
+        self.client = client or _openai_client(settings.LLM_TIMEOUT_SECONDS)
+
+    def complete(
+        self,
+        operation: str,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        json_mode: bool = False,
+    ) -> ChatResult:
+        kwargs: Dict[str, Any] = {}
+        if json_mode:
+            kwargs["response_format"] = {"type": "json_object"}
+        try:
+            response = self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                **kwargs,
+            )
+        except OpenAIError as e:
+            raise openai_error(operation, e) from e
+        return ChatResult(response.choices[0].message.content, response.usage)
+
+    def stream(
+        self,
+        operation: str,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        json_mode: bool = False,
+    ) -> Iterator[ChatResult]:
+        kwargs: Dict[str, Any] = {}
+        if json_mode:
+            kwargs["response_format"] = {"type": "json_object"}
+        try:
+            response = self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                stream=True,
+                stream_options={"include_usage": True},
+                **kwargs,
+            )
+        except OpenAIError as e:
+            raise openai_error(operation, e) from e
+        try:
+            for chunk in response:
+                # The final chunk carries usage and no choices
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta or chunk.usage is not None:
+                    yield ChatResult(delta or "", chunk.usage)
+        except OpenAIError as e:
+            raise openai_error(operation, e) from e
+        finally:
+            response.close()
+
+
+class OpenAIEmbeddingBackend(EmbeddingBackend):
+    name = "openai"
+
+    def __init__(self, client: Optional[OpenAI] = None):
+        self.client = client or _openai_client(settings.EMBEDDING_TIMEOUT_SECONDS)
+        self.model = settings.OPENAI_EMBEDDING_MODEL
+
+    def embed(self, texts: List[str]) -> EmbeddingResult:
+        try:
+            response = self.client.embeddings.create(model=self.model, input=texts)
+        except OpenAIError as e:
+            raise openai_error("embedding", e) from e
+        vectors = [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+        return EmbeddingResult(vectors, response.usage)
+
+
+class SentenceTransformerEmbeddingBackend(EmbeddingBackend):
+    """Local sentence-transformers model; loaded once per process"""
+
+    name = "sentence-transformers"
+
+    _models: Dict[tuple, Any] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, model: Optional[str] = None, device: Optional[str] = None):
+        self.model = model or settings.LOCAL_EMBEDDING_MODEL
+        self.device = device or settings.LOCAL_EMBEDDING_DEVICE
+
+    def _load(self) -> Any:
+        key = (self.model, self.device)
+        with self._lock:
+            if key not in self._models:
+                try:
+                    from sentence_transformers import SentenceTransformer
+                except ImportError:  # optional dependency
+                    raise RuntimeError(
+                        "EMBEDDING_BACKEND=sentence-transformers requires the sentence-transformers package"
+                    )
+                encoder = SentenceTransformer(self.model, device=self.device)
+                dimensions = encoder.get_sentence_embedding_dimension()
+                if dimensions != settings.EMBEDDING_DIMENSIONS:
+                    raise RuntimeError(
+                        f"{self.model} produces {dimensions}-dimensional embeddings, "
+                        f"EMBEDDING_DIMENSIONS is {settings.EMBEDDING_DIMENSIONS}"
+                    )
+                self._models[key] = encoder
+            return self._models[key]
+
+    def embed(self, texts: List[str]) -> EmbeddingResult:
+        vectors = self._load().encode(
+            texts,
+            batch_size=settings.EMBEDDING_BATCH_SIZE,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+        usage = TokenUsage(prompt_tokens=sum(_estimate_tokens(text) for text in texts))
+        return EmbeddingResult([vector.tolist() for vector in vectors], usage)
+
+
+_WORD_RE = re.compile(r"[\w#+.]+")
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(\.[\w-]+)+")
+_PHONE_RE = re.compile(r"\+?\d[\d\s()-]{8,}\d")
+_YEARS_RE = re.compile(r"(\d{1,2})\+?\s*(?:years?|yrs|лет|года?)", re.IGNORECASE)
+_SKILLS_LINE_RE = re.compile(r"^Required Skills:(.*)$", re.MULTILINE)
+
+
+def _section(prompt: str, *headings: str) -> str:
+    """Text after the first heading found, up to the next blank-line paragraph of instructions"""
+    for heading in headings:
+        start = prompt.find(heading)
+        if start != -1:
+            body = prompt[start + len(heading):]
+            end = re.search(r"\n\n(Extract|Provide|Respond)", body)
+            return body[:end.start()] if end else body
+    return ""
+
+
+class StubChatBackend(ChatBackend):
+    """Deterministic answers computed from the prompt, no model involved"""
+
+    name = "stub"
+
+    def _profile(self, resume_text: str) -> Dict[str, Any]:
+        lines = [line.strip() for line in resume_text.splitlines() if line.strip()]
+        email = _EMAIL_RE.search(resume_text)
+        phone = _PHONE_RE.search(resume_text)
+        years = [int(value) for value in _YEARS_RE.findall(resume_text)]
+
+        skills: List[str] = []
+        for word in _WORD_RE.findall(resume_text):
+            skill = normalize_skill(word.rstrip("."))
+            if skill in CANONICAL_SKILLS and skill not in skills:
+                skills.append(skill)
+
+        return {
+            "full_name": lines[0][:100] if lines else "Unknown",
+            "email": email.group(0) if email else None,
+            "phone": phone.group(0).strip() if phone else None,
+            "location": None,
+            "skills": skills,
+            "experience_years": max(years) if years else None,
+            "education": [],
+            "work_experience": [],
+            "summary": " ".join(
+                line for line in lines[1:4] if not (_EMAIL_RE.search(line) or _PHONE_RE.search(line))
+            )[:300],
+        }
+
+    def _match(self, prompt: str, candidate_skills: List[str]) -> Dict[str, Any]:
+        required_line = _SKILLS_LINE_RE.search(prompt)
+        required = [part.strip() for part in required_line.group(1).split(",")] if required_line else []
+        overlap = skill_overlap(candidate_skills, required)
+        return {
+            "match_score": int(round(overlap["score"])),
+            "strengths": [f"Has {skill}" for skill in overlap["matched"]],
+            "weaknesses": [f"No {skill}" for skill in overlap["missing"]],
+            "summary": f"Matches {len(overlap['matched'])} of {len(overlap['matched']) + len(overlap['missing'])} required skills.",
+        }
+
+    def _answer(self, operation: str, prompt: str) -> Any:
+        if operation == "generate_vacancy_description":
+            title = re.search(r"^Job Title:(.*)$", prompt, re.MULTILINE)
+            skills = _SKILLS_LINE_RE.search(prompt)
+            return (
+                f"{title.group(1).strip() if title else 'Position'}\n\n"
+                f"Required skills: {skills.group(1).strip() if skills else '-'}"
+            )
+
+        if operation == "score_profile":
+            profile_text = _section(prompt, "Candidate Profile (extracted from the resume):\n")
+            try:
+                profile = json.loads(profile_text)
+            except ValueError:
+                profile = {}
+            return self._match(prompt, profile.get("skills") or [])
+
+        profile = self._profile(_section(prompt, "Resume text:\n", "Candidate Resume:\n"))
+        if operation == "extract_resume_data":
+            return profile
+        match = self._match(prompt, profile["skills"])
+        if operation == "extract_and_score":
+            return {"candidate": profile, "match": match}
+        return match
+
+    def complete(
+        self,
+        operation: str,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        json_mode: bool = False,
+    ) -> ChatResult:
+        prompt = messages[-1]["content"]
+        answer = self._answer(operation, prompt)
+        content = answer if isinstance(answer, str) else json.dumps(answer, ensure_ascii=False)
+        usage = TokenUsage(
+            prompt_tokens=sum(_estimate_tokens(message["content"]) for message in messages),
+            completion_tokens=_estimate_tokens(content),
+        )
+        return ChatResult(content, usage, model=STUB_CHAT_MODEL)
+
+    def stream(
+        self,
+        operation: str,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        json_mode: bool = False,
+    ) -> Iterator[ChatResult]:
+        result = self.complete(operation, model, messages, temperature, json_mode)
+        words = re.findall(r"\S+\s*|\s+", result.content)
+        if not words:
+            yield result
+        for index, word in enumerate(words):
+            last = index == len(words) - 1
+            yield ChatResult(word, result.usage if last else None, model=STUB_CHAT_MODEL)
+
+
+class StubEmbeddingBackend(EmbeddingBackend):
+    """Feature-hashed bag of words, L2-normalized"""
+
+    name = "stub"
+    model = STUB_EMBEDDING_MODEL
+
+    def __init__(self, dimensions: Optional[int] = None):
+        self.dimensions = dimensions or settings.EMBEDDING_DIMENSIONS
+
+    def _vector(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        for word in _WORD_RE.findall(text.casefold()):
+            digest = hashlib.blake2b(word.encode(), digest_size=8).digest()
+            index = int.from_bytes(digest[:4], "little") % self.dimensions
+            vector[index] += 1.0 if digest[4] & 1 else -1.0
+
+        norm = math.sqrt(sum(value * value for value in vector))
+        return [value / norm for value in vector] if norm else vector
+
+    def embed(self, texts: List[str]) -> EmbeddingResult:
+        usage = TokenUsage(prompt_tokens=sum(_estimate_tokens(text) for text in texts))
+        return EmbeddingResult([self._vector(text) for text in texts], usage)
+
+
+CHAT_BACKENDS = {
+    OpenAIChatBackend.name: OpenAIChatBackend,
+    StubChatBackend.name: StubChatBackend,
+}
+
+EMBEDDING_BACKENDS = {
+    OpenAIEmbeddingBackend.name: OpenAIEmbeddingBackend,
+    SentenceTransformerEmbeddingBackend.name: SentenceTransformerEmbeddingBackend,
+    StubEmbeddingBackend.name: StubEmbeddingBackend,
+}
+
+
+def get_chat_backend(name: Optional[str] = None) -> ChatBackend:
+    name = name or settings.LLM_BACKEND
+    if name not in CHAT_BACKENDS:
+        raise ValueError(f"Unknown LLM backend: {name}")
+    return CHAT_BACKENDS[name]()
+
+
+def get_embedding_backend(name: Optional[str] = None) -> EmbeddingBackend:
+    name = name or settings.EMBEDDING_BACKEND
+    if name not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend: {name}")
+    return EMBEDDING_BACKENDS[name]()
@@ -0,0 +1,120 @@
+"""Typed LLM failures and the retry policy of the task layer
+
+- LLMTransientError: timeouts, connection errors, rate limits and
+  provider 5xx. Retrying later can succeed.
+- LLMRequestError: the provider refused the request (bad request, auth,
+  missing model) or the backend is misconfigured. Retrying cannot help.
+- LLMOutputError: the answer did not fit the expected schema even after
+  repair. The call has been paid for; a blind re-run is not retried.
+
+QuotaExceededError (organization LLM quota) is retryable too.
+"""
+import asyncio
+import logging
+import random
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+from fastapi import HTTPException, status
+from openai import (
+    APIConnectionError,
+    APIStatusError,
+    APITimeoutError,
+    OpenAIError,
+    RateLimitError,
+)
+
+from app.core.config import settings
+from app.core.quotas import QuotaExceededError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class LLMError(Exception):
+    """A failed LLM call; `retryable` tells the task layer whether to try again"""
+
+    retryable = False
+
+    def __init__(self, operation: str, message: str, retry_after: Optional[float] = None):
+        self.operation = operation
+        self.retry_after = retry_after
+        super().__init__(f"{operation}: {message}")
+
+    def as_http(self) -> HTTPException:
+        if self.retryable:
+            return HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="AI provider is temporarily unavailable",
+                headers={"Retry-After": str(max(1, round(self.retry_after or 30)))},
+            )
+        return HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"AI request failed: {self}",
+        )
+
+
+class LLMTransientError(LLMError):
+    retryable = True
+
+
+class LLMRequestError(LLMError):
+    retryable = False
+
+
+class LLMOutputError(LLMError):
+    """Answer still invalid after repair; `fields` maps field -> problem"""
+
+    retryable = False
+
+    def __init__(self, operation: str, fields: Dict[str, str]):
+        self.fields = fields
+        problems = "; ".join(f"{name}: {problem}" for name, problem in fields.items())
+        super().__init__(operation, f"invalid output ({problems})")
+
+
+def _retry_after(error: APIStatusError) -> Optional[float]:
+    try:
+        return float(error.response.headers.get("retry-after"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def openai_error(operation: str, error: OpenAIError) -> LLMError:
+    """Typed error for an exception raised by the OpenAI client"""
+    if isinstance(error, (APITimeoutError, APIConnectionError)):
+        return LLMTransientError(operation, str(error))
+    if isinstance(error, RateLimitError):
+        return LLMTransientError(operation, str(error), retry_after=_retry_after(error))
+    if isinstance(error, APIStatusError) and (error.status_code >= 500 or error.status_code == 408):
+        return LLMTransientError(operation, str(error), retry_after=_retry_after(error))
+    return LLMRequestError(operation, str(error))
+
+
+def is_retryable(error: BaseException) -> bool:
+    if isinstance(error, QuotaExceededError):
+        return True
+    return isinstance(error, LLMError) and error.retryable
+
+
+def retry_delay(error: BaseException, attempt: int) -> float:
+    """Seconds before attempt `attempt + 1`: the provider's hint, else exponential backoff"""
+    hint = getattr(error, "retry_after", None)
+    if hint:
+        return hint + random.uniform(0, 1)
+    return settings.LLM_RETRY_BASE_SECONDS * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+
+
+async def with_retries(call: Callable[[], Awaitable[T]], description: str) -> T:
+    """Run `call`, again after a delay on retryable errors, up to LLM_TASK_MAX_ATTEMPTS times"""
+    attempt = 1
+    while True:
+        try:
+            return await call()
+        except Exception as e:
+            if not is_retryable(e) or attempt >= settings.LLM_TASK_MAX_ATTEMPTS:
+                raise
+            delay = retry_delay(e, attempt)
+            logger.warning("%s failed (attempt %d), retrying in %.0fs: %s", description, attempt, delay, e)
+            await asyncio.sleep(delay)
+            attempt += 1
@@ -0,0 +1,161 @@
+"""Pydantic schemas of structured LLM answers
+
+Validation is lenient where models are predictably sloppy ("85%" as a
+score, skills as one comma-separated string, "5+ years") and strict
+where a value would poison the data (scores out of range, non-numeric
+experience). `invalid_fields` turns a ValidationError into the top-level
+fields to repair, so AIService can re-ask for just those fields.
+"""
+import json
+import re
+from typing import Any, Dict, List, Optional, Union
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator
+
+_NUMBER_RE = re.compile(r"\d+(\.\d+)?")
+
+
+def _first_number(value: Any) -> Any:
+    """'85%', '85/100', '5+ years' -> the leading number; other values unchanged"""
+    if isinstance(value, str):
+        found = _NUMBER_RE.search(value)
+        if found:
+            value = float(found.group(0))
+    if isinstance(value, float):
+        return int(round(value))
+    return value
+
+
+def _string_list(value: Any) -> Any:
+    if isinstance(value, str):
+        return [part.strip() for part in value.split(",") if part.strip()]
+    if isinstance(value, list):
+        return [item if isinstance(item, str) else json.dumps(item, ensure_ascii=False) for item in value if item]
+    return value
+
+
+class EducationItem(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    degree: Optional[str] = None
+    institution: Optional[str] = None
+    year: Optional[Union[int, str]] = None
+
+
+class WorkExperienceItem(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    company: Optional[str] = None
+    position: Optional[str] = None
+    duration: Optional[str] = None
+    responsibilities: Optional[Union[str, List[str]]] = None
+
+
+class ResumeExtraction(BaseModel):
+    """Answer of extract_resume_data (and "candidate" of extract_and_score)"""
+
+    full_name: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    location: Optional[str] = None
+    skills: List[str] = []
+    experience_years: Optional[int] = Field(default=None, ge=0, le=70)
+    education: List[EducationItem] = []
+    work_experience: List[WorkExperienceItem] = []
+    summary: Optional[str] = None
+
+    @field_validator("skills", mode="before")
+    @classmethod
+    def _skills(cls, value: Any) -> Any:
+        return [] if value is None else _string_list(value)
+
+    @field_validator("experience_years", mode="before")
+    @classmethod
+    def _years(cls, value: Any) -> Any:
+        return _first_number(value)
+
+    @field_validator("email")
+    @classmethod
+    def _email(cls, value: Optional[str]) -> Optional[str]:
+        if value and "@" not in value:
+            raise ValueError("not an email address")
+        return value or None
+
+    @field_validator("education", mode="before")
+    @classmethod
+    def _education(cls, value: Any) -> Any:
+        if isinstance(value, list):
+            return [{"degree": item} if isinstance(item, str) else item for item in value]
+        return [] if value is None else value
+
+    @field_validator("work_experience", mode="before")
+    @classmethod
+    def _work_experience(cls, value: Any) -> Any:
+        if isinstance(value, list):
+            return [{"position": item} if isinstance(item, str) else item for item in value]
+        return [] if value is None else value
+
+
+class MatchResult(BaseModel):
+    """Answer of calculate_match_score / score_profile (and "match" of extract_and_score)"""
+
+    match_score: int = Field(ge=0, le=100)
+    strengths: List[str] = []
+    weaknesses: List[str] = []
+    summary: str = ""
+
+    @field_validator("match_score", mode="before")
+    @classmethod
+    def _score(cls, value: Any) -> Any:
+        return _first_number(value)
+
+    @field_validator("strengths", "weaknesses", mode="before")
+    @classmethod
+    def _lists(cls, value: Any) -> Any:
+        return [] if value is None else _string_list(value)
+
+    @field_validator("summary", mode="before")
+    @classmethod
+    def _summary(cls, value: Any) -> Any:
+        return "" if value is None else value
+
+
+# Schemas of the JSON operations, by operation name
+OPERATION_SCHEMAS = {
+    "extract_resume_data": ResumeExtraction,
+    "calculate_match_score": MatchResult,
+    "score_profile": MatchResult,
+}
+
+
+def json_object(content: Optional[str]) -> Optional[Dict]:
+    """Parsed answer if it is a JSON object, else None"""
+    try:
+        data = json.loads(content or "")
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def invalid_fields(error: ValidationError) -> Dict[str, str]:
+    """Top-level field -> first problem reported for it"""
+    fields: Dict[str, str] = {}
+    for item in error.errors():
+        name = str(item["loc"][0]) if item["loc"] else "*"
+        fields.setdefault(name, item["msg"])
+    return fields
+
+
+def coerce_output(schema: type, data: Any) -> Optional[Dict]:
+    """Validated answer as a dict, invalid optional fields dropped to defaults;
+    None if it cannot be made valid (not an object, required field bad)"""
+    if not isinstance(data, dict):
+        return None
+    try:
+        return schema.model_validate(data).model_dump()
+    except ValidationError as e:
+        invalid = invalid_fields(e)
+    try:
+        return schema.model_validate({k: v for k, v in data.items() if k not in invalid}).model_dump()
+    except ValidationError:
+        return None
@@ -0,0 +1,207 @@
+"""Resume processing status for upload UIs, pushed instead of polled
+
+Processing tasks publish every stage transition of a resume (parsing,
+screening, then parsed / deferred / error) on the organization's Redis
+channel. A status stream subscribes first, sends the current state of
+the tracked candidates from the database, then forwards the matching
+transitions until every tracked resume has reached a final status.
+Candidates are tracked by ID or by upload batch, the client-chosen ID
+sent with each file of a multi-file upload.
+
+Without Redis, streams fall back to re-reading the snapshot every
+PROCESSING_STREAM_POLL_SECONDS, still one query per stream instead of
+one request per candidate.
+"""
+import asyncio
+import json
+import logging
+import time
+from typing import AsyncIterator, Dict, List, Optional, Sequence
+
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+from sqlmodel import select
+
+from app.core.config import settings
+from app.core.database import async_session
+from app.core.responses import dumps
+from app.core.sse import SSE_PING, sse_event
+from app.models.candidate import Candidate
+from app.models.resume import FINAL_RESUME_STATUSES, Resume, ResumeStatus
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "processing:{organization_id}"
+
+
+def status_item(resume: Resume, candidate: Optional[Candidate] = None) -> Dict:
+    """Compact status of a candidate's resume, as sent to clients"""
+    item = {
+        "candidate_id": resume.candidate_id,
+        "resume_id": resume.id,
+        "status": ResumeStatus(resume.status).value,
+        "batch": resume.upload_batch,
+    }
+    if resume.status == ResumeStatus.ERROR:
+        item["error"] = resume.error_message
+    if candidate is not None and resume.status in FINAL_RESUME_STATUSES:
+        item["full_name"] = candidate.full_name
+        item["match_score"] = candidate.match_score
+        item["match_score_preliminary"] = candidate.match_score_preliminary
+    return item
+
+
+def _final(item: Dict) -> bool:
+    return ResumeStatus(item["status"]) in FINAL_RESUME_STATUSES
+
+
+class ProcessingStatus:
+    """Publish resume stage transitions and stream them to clients"""
+
+    def __init__(self, redis_url: str):
+        self.redis_url = redis_url
+        self._redis: Optional[aioredis.Redis] = None
+
+    @property
+    def redis(self) -> aioredis.Redis:
+        if self._redis is None:
+            self._redis = aioredis.from_url(self.redis_url)
+        return self._redis
+
+    async def publish(
+        self,
+        organization_id: int,
+        resume: Resume,
+        candidate: Optional[Candidate] = None,
+    ) -> None:
+        """Announce the resume's current status; call after it is committed"""
+        try:
+            await self.redis.publish(
+                CHANNEL.format(organization_id=organization_id),
+                dumps(status_item(resume, candidate)),
+            )
+        except RedisError:
+            logger.warning("Status of resume %s not published", resume.id, exc_info=True)
+
+    @staticmethod
+    async def snapshot(
+        organization_id: int,
+        candidate_ids: Optional[Sequence[int]] = None,
+        batch: Optional[str] = None,
+    ) -> List[Dict]:
+        """Status of the latest resume of each tracked candidate"""
+        query = (
+            select(Resume, Candidate)
+            .join(Candidate, Candidate.id == Resume.candidate_id)
+            .where(Candidate.organization_id == organization_id)
+            .distinct(Resume.candidate_id)
+            .order_by(Resume.candidate_id, Resume.created_at.desc())
+        )
+        if batch is not None:
+            query = query.where(Resume.upload_batch == batch)
+        else:
+            query = query.where(Resume.candidate_id.in_(candidate_ids or []))
+
+        async with async_session() as session:
+            result = await session.execute(query)
+            return [status_item(resume, candidate) for resume, candidate in result.all()]
+
+    @classmethod
+    async def summary(
+        cls,
+        organization_id: int,
+        candidate_ids: Optional[Sequence[int]] = None,
+        batch: Optional[str] = None,
+    ) -> Dict:
+        """Counts per status plus the compact items, for bulk-upload progress"""
+        items = await cls.snapshot(organization_id, candidate_ids, batch)
+        counts = {status.value: 0 for status in ResumeStatus}
+        for item in items:
+            counts[item["status"]] += 1
+        return {
+            "batch": batch,
+            "total": len(items),
+            "done": all(_final(item) for item in items),
+            "counts": counts,
+            "items": items,
+        }
+
+    async def _subscribe(self, organization_id: int) -> Optional[aioredis.client.PubSub]:
+        pubsub = self.redis.pubsub()
+        try:
+            await pubsub.subscribe(CHANNEL.format(organization_id=organization_id))
+        except RedisError:
+            logger.warning("Status channel unavailable; polling the database", exc_info=True)
+            await pubsub.aclose()
+            return None
+        return pubsub
+
+    async def stream(
+        self,
+        organization_id: int,
+        candidate_ids: Optional[Sequence[int]] = None,
+        batch: Optional[str] = None,
+    ) -> AsyncIterator[bytes]:
+        """SSE: `status` per tracked candidate (current state first, then
+        every change), `done` with the summary once all are final
+
+        Ends after PROCESSING_STREAM_MAX_SECONDS at the latest; clients
+        reconnect and get a fresh snapshot.
+        """
+        tracked = set(candidate_ids or [])
+        # Subscribe before reading the snapshot so no transition falls in between
+        pubsub = await self._subscribe(organization_id)
+        deadline = time.monotonic() + settings.PROCESSING_STREAM_MAX_SECONDS
+        last_sent = time.monotonic()
+        try:
+            items = {item["candidate_id"]: item for item in await self.snapshot(organization_id, candidate_ids, batch)}
+            for item in items.values():
+                yield sse_event("status", item)
+
+            while not (items and all(_final(item) for item in items.values())):
+                if time.monotonic() > deadline:
+                    return
+
+                changed: List[Dict] = []
+                if pubsub is not None:
+                    try:
+                        message = await pubsub.get_message(
+                            ignore_subscribe_messages=True,
+                            timeout=settings.PROCESSING_STREAM_HEARTBEAT_SECONDS,
+                        )
+                    except RedisError:
+                        logger.warning("Status channel lost; polling the database", exc_info=True)
+                        await pubsub.aclose()
+                        pubsub = None
+                        continue
+                    if message is not None:
+                        item = json.loads(message["data"])
+                        if item["candidate_id"] in tracked or (batch is not None and item["batch"] == batch):
+                            changed.append(item)
+                else:
+                    await asyncio.sleep(settings.PROCESSING_STREAM_POLL_SECONDS)
+                    fresh = await self.snapshot(organization_id, candidate_ids, batch)
+                    changed = [item for item in fresh if items.get(item["candidate_id"]) != item]
+
+                for item in changed:
+                    items[item["candidate_id"]] = item
+                    yield sse_event("status", item)
+                    last_sent = time.monotonic()
+                # Keep proxies from closing a quiet stream
+                if time.monotonic() - last_sent >= settings.PROCESSING_STREAM_HEARTBEAT_SECONDS:
+                    yield SSE_PING
+                    last_sent = time.monotonic()
+
+            yield sse_event("done", {
+                "total": len(items),
+                "counts": {
+                    status.value: sum(item["status"] == status.value for item in items.values())
+                    for status in ResumeStatus
+                },
+            })
+        finally:
+            if pubsub is not None:
+                await pubsub.aclose()
+
+
+processing_status = ProcessingStatus(settings.REDIS_URL)
@@ -0,0 +1,255 @@
+"""Token-aware fitting of resume and vacancy text into LLM prompts
+
+Resumes are cleaned (page markers, separator lines, repeated headers and
+footers), split into sections by their headings and fitted to a per-call
+token budget: low-value sections (hobbies, references) go first, then the
+remaining budget is shared so that short sections stay whole and long ones
+are cut at line boundaries.
+
+Tokens are counted with tiktoken. If the encoding cannot be loaded (its
+BPE file is fetched on first use, or read from TIKTOKEN_CACHE_DIR when
+pre-seeded for offline installs) counts fall back to ~4 characters per
+token.
+"""
+import logging
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+
+from app.core.config import settings
+from app.core.telemetry import PROMPT_TEXT_TOKENS, PROMPT_TOKENS_SAVED
+
+try:
+    import tiktoken
+except ImportError:  # counts fall back to the character estimate
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4
+TRUNCATION_MARKER = "[...]"
+HEADER_SECTION = "header"
+OTHER_SECTION = "other"
+
+# Section headings (English and Russian resumes); matched against short lines
+SECTION_HEADINGS: Dict[str, Sequence[str]] = {
+    "summary": ("summary", "profile", "about me", "objective", "professional summary", "о себе", "цель"),
+    "experience": (
+        "experience", "work experience", "employment", "employment history", "professional experience",
+        "work history", "опыт работы", "опыт", "трудовая деятельность", "места работы",
+    ),
+    "education": ("education", "academic background", "образование"),
+    "skills": (
+        "skills", "technical skills", "key skills", "core competencies", "technologies", "tech stack",
+        "навыки", "ключевые навыки", "профессиональные навыки", "технологии",
+    ),
+    "projects": ("projects", "personal projects", "проекты"),
+    "certifications": ("certifications", "certificates", "courses", "training", "сертификаты", "курсы", "повышение квалификации"),
+    "languages": ("languages", "языки", "знание языков", "иностранные языки"),
+    "contacts": ("contacts", "contact information", "контакты", "контактная информация"),
+    "interests": ("interests", "hobbies", "hobbies and interests", "интересы", "хобби", "увлечения"),
+    "references": ("references", "recommendations", "рекомендации"),
+}
+
+# Sections dropped whole before anything else is cut
+LOW_VALUE_SECTIONS = ("interests", "references")
+
+_HEADING_RE = re.compile(
+    r"^(?:%s)\s*:?$" % "|".join(
+        re.escape(heading) for headings in SECTION_HEADINGS.values() for heading in sorted(headings, key=len, reverse=True)
+    ),
+    re.IGNORECASE,
+)
+_HEADING_TO_SECTION = {
+    heading: section for section, headings in SECTION_HEADINGS.items() for heading in headings
+}
+
+_NOISE_LINE_RES = (
+    re.compile(r"^(?:page|стр\.?|страница)\s*\d+(?:\s*(?:of|из|/)\s*\d+)?$", re.IGNORECASE),
+    re.compile(r"^\d{1,3}(?:\s*/\s*\d{1,3})?$"),  # bare page numbers
+    re.compile(r"^[\W_]{2,}$"),  # separator rules: ----, ====, ••••
+    re.compile(r"^(?:resume|cv|curriculum vitae|резюме)$", re.IGNORECASE),
+)
+_SPACES_RE = re.compile(r"[ \t\u00a0\u2000-\u200b\u202f\u205f\u3000]+")
+
+# A line repeated this often is a page header/footer, kept once
+BOILERPLATE_MIN_REPEATS = 3
+
+
+@dataclass
+class Section:
+    name: str
+    text: str
+    tokens: int = 0
+
+
+@lru_cache(maxsize=16)
+def _encoding(model: str):
+    if tiktoken is None:
+        return None
+    if settings.TIKTOKEN_CACHE_DIR:
+        # tiktoken reads the variable itself; settings may come from .env only
+        os.environ.setdefault("TIKTOKEN_CACHE_DIR", settings.TIKTOKEN_CACHE_DIR)
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        logger.warning("tiktoken encoding for %s unavailable; estimating tokens from length", model, exc_info=True)
+        return None
+
+
+def count_tokens(text: str, model: str) -> int:
+    encoding = _encoding(model)
+    if encoding is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int, model: str) -> str:
+    """Longest prefix within `max_tokens`, cut at a line boundary when possible"""
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text, model) <= max_tokens:
+        return text
+
+    kept: List[str] = []
+    used = 0
+    for line in text.split("\n"):
+        # +1 for the newline joining it to the previous line
+        line_tokens = count_tokens(line, model) + 1
+        if used + line_tokens > max_tokens:
+            if not kept:
+                # A single line over budget (e.g. text without line breaks)
+                encoding = _encoding(model)
+                if encoding is None:
+                    return line[: max_tokens * CHARS_PER_TOKEN]
+                return encoding.decode(encoding.encode(line, disallowed_special=())[:max_tokens])
+            break
+        kept.append(line)
+        used += line_tokens
+    return "\n".join(kept)
+
+
+def clean_text(text: str) -> str:
+    """Normalize whitespace and drop page markers, rules and repeated headers/footers"""
+    lines = [_SPACES_RE.sub(" ", line).strip() for line in text.replace("\r", "\n").split("\n")]
+
+    counts: Dict[str, int] = {}
+    for line in lines:
+        if line:
+            counts[line.lower()] = counts.get(line.lower(), 0) + 1
+
+    cleaned: List[str] = []
+    seen_boilerplate = set()
+    for line in lines:
+        if not line:
+            if cleaned and cleaned[-1]:
+                cleaned.append("")
+            continue
+        if any(pattern.match(line) for pattern in _NOISE_LINE_RES):
+            continue
+        key = line.lower()
+        # Labels ("Responsibilities:") legitimately repeat once per job
+        if counts[key] >= BOILERPLATE_MIN_REPEATS and not line.endswith(":") and not _HEADING_RE.match(line):
+            if key in seen_boilerplate:
+                continue
+            seen_boilerplate.add(key)
+        if cleaned and cleaned[-1].lower() == key:
+            continue
+        cleaned.append(line)
+
+    return "\n".join(cleaned).strip()
+
+
+def split_sections(text: str) -> List[Section]:
+    """Sections in document order; text before the first heading is the header"""
+    sections = [Section(HEADER_SECTION, "")]
+    for line in text.split("\n"):
+        if len(line) <= 40 and _HEADING_RE.match(line):
+            heading = line.rstrip(":").strip().lower()
+            sections.append(Section(_HEADING_TO_SECTION.get(heading, OTHER_SECTION), line))
+            continue
+        current = sections[-1]
+        current.text = f"{current.text}\n{line}" if current.text else line
+    return [section for section in sections if section.text.strip()]
+
+
+def _allocate(sections: List[Section], budget: int) -> Dict[int, int]:
+    """Max-min fair token shares: short sections whole, long ones split the rest"""
+    allocation: Dict[int, int] = {}
+    remaining = budget
+    pending = sorted(range(len(sections)), key=lambda i: sections[i].tokens)
+    while pending:
+        share = remaining // len(pending)
+        index = pending[0]
+        if sections[index].tokens <= share:
+            allocation[index] = sections[index].tokens
+            remaining -= sections[index].tokens
+            pending.pop(0)
+            continue
+        for index in pending:
+            allocation[index] = share
+        break
+    return allocation
+
+
+def _fit(text: str, max_tokens: int, model: str, operation: str, sectioned: bool) -> str:
+    """Clean `text` and fit it into `max_tokens`, recording tokens saved for `operation`"""
+    if not text:
+        return text
+
+    original_tokens = count_tokens(text, model)
+    fitted = clean_text(text)
+    tokens = count_tokens(fitted, model)
+
+    if tokens > max_tokens:
+        fitted = _fit_sections(fitted, max_tokens, model) if sectioned else _truncated(fitted, max_tokens, model)
+        tokens = count_tokens(fitted, model)
+
+    PROMPT_TEXT_TOKENS.labels(operation).observe(tokens)
+    if original_tokens > tokens:
+        PROMPT_TOKENS_SAVED.labels(operation).inc(original_tokens - tokens)
+    return fitted
+
+
+def _truncated(text: str, max_tokens: int, model: str) -> str:
+    marker_tokens = count_tokens(TRUNCATION_MARKER, model) + 1
+    kept = truncate_tokens(text, max_tokens - marker_tokens, model)
+    return f"{kept}\n{TRUNCATION_MARKER}" if kept else ""
+
+
+def _fit_sections(text: str, max_tokens: int, model: str) -> str:
+    sections = split_sections(text)
+    for section in sections:
+        section.tokens = count_tokens(section.text, model) + 1
+
+    if sum(section.tokens for section in sections) > max_tokens:
+        sections = [section for section in sections if section.name not in LOW_VALUE_SECTIONS] or sections
+
+    allocation = _allocate(sections, max_tokens)
+    parts: List[str] = []
+    for index, section in enumerate(sections):
+        share = allocation.get(index, 0)
+        if share >= section.tokens:
+            parts.append(section.text)
+        elif share > 0:
+            truncated = _truncated(section.text, share, model)
+            if truncated:
+                parts.append(truncated)
+    return "\n".join(parts)
+
+
+def fit_resume(raw_text: str, max_tokens: int, model: str, operation: str) -> str:
+    """Resume text for a prompt of `operation`, within `max_tokens`"""
+    return _fit(raw_text, max_tokens, model, operation, sectioned=True)
+
+
+def fit_plain(text: Optional[str], max_tokens: int, model: str, operation: str) -> Optional[str]:
+    """Clean and truncate text without section structure (vacancy text, queries)"""
+    if not text:
+        return text
+    return _fit(text, max_tokens, model, operation, sectioned=False)
@@ -4,6 +4,8 @@ from pdfminer.high_level import extract_text as extract_pdf_text
 from docx import Document
 import magic
 
+from app.core.telemetry import traced
+
 
 class ResumeParser:
     """Parse resume files and extract text"""
@@ -15,6 +17,7 @@ class ResumeParser:
         return mime.from_buffer(file_content)
     
     @staticmethod
+    @traced("parser.pdf")
     def extract_text_from_pdf(file_content: bytes) -> str:
         """Extract text from PDF"""
         try:
@@ -24,6 +27,7 @@ class ResumeParser:
             raise Exception(f"Failed to extract text from PDF: {str(e)}")
     
     @staticmethod
+    @traced("parser.docx")
     def extract_text_from_docx(file_content: bytes) -> str:
         """Extract text from DOCX"""
         try:
@@ -44,6 +48,7 @@ class ResumeParser:
             raise ValueError(f"Unsupported file type: {file_type}")
     
     @classmethod
+    @traced("parser.parse_resume")
     async def parse_resume(cls, file_content: bytes) -> Dict[str, str]:
         """Parse resume and return structured data"""
         # Detect file type
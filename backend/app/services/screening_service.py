@@ -0,0 +1,273 @@
+"""LLM screening of resumes against vacancies
+
+A new resume is extracted and scored in one chat call
+(LLM_COMBINED_SCREENING) or in two (extract, then score the text). The
+extraction is stored on the resume, so scoring the same candidate
+against further vacancies sends only the compact profile, not the
+resume text, and never re-extracts.
+
+While the AI provider is unavailable, `prescreen` stores a deterministic
+skill-overlap score flagged as preliminary until screening is replayed.
+
+On-demand scoring can also be streamed: `relay_match` forwards the
+summary text while the model writes the JSON answer, then stores the
+result like the non-streamed call.
+"""
+import json
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+from sqlmodel import select
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import response_cache, vacancy_scope
+from app.core.config import settings
+from app.core.database import async_session
+from app.models.candidate import Candidate
+from app.models.resume import Resume
+from app.models.talent_pool import TalentSuggestion
+from app.models.vacancy import Vacancy
+from app.services.ai_service import AIService
+from app.services.llm_errors import LLMOutputError
+from app.services.llm_schemas import MatchResult, coerce_output, json_object
+from app.services.skill_service import mentioned_skills, normalize_skills, skill_overlap, skills_list
+
+
+def _list(value) -> list:
+    return value if isinstance(value, list) else []
+
+
+class JsonFieldStream:
+    """Decoded text of one top-level string field of a JSON object being streamed
+
+    `feed` takes the next piece of the raw JSON and returns the field's
+    newly completed characters (escapes decoded), so the field can be shown
+    while the rest of the object is still being generated.
+    """
+
+    def __init__(self, field: str):
+        self._opening = f'"{field}"'
+        self._raw = ""
+        self._start: Optional[int] = None
+        self._emitted = 0
+        self.closed = False
+
+    def _value_start(self) -> Optional[int]:
+        position = self._raw.find(self._opening)
+        while position != -1:
+            rest = self._raw[position + len(self._opening):].lstrip()
+            if rest.startswith(":"):
+                value = rest[1:].lstrip()
+                if value.startswith('"'):
+                    return len(self._raw) - len(value) + 1
+            position = self._raw.find(self._opening, position + 1)
+        return None
+
+    def feed(self, chunk: str) -> str:
+        if self.closed:
+            return ""
+        self._raw += chunk
+        if self._start is None:
+            self._start = self._value_start()
+            if self._start is None:
+                return ""
+
+        # Complete part of the value: stop before an unfinished escape or at the closing quote
+        index, end = self._start, len(self._raw)
+        while index < end:
+            char = self._raw[index]
+            if char == '"':
+                self.closed = True
+                break
+            if char == "\\":
+                step = 6 if self._raw[index + 1:index + 2] == "u" else 2
+                if index + step > end:
+                    break
+                index += step
+            else:
+                index += 1
+
+        text = json.loads(f'"{self._raw[self._start:index]}"')
+        if text and "\ud800" <= text[-1] <= "\udbff":
+            text = text[:-1]  # first half of an escaped surrogate pair; wait for the rest
+        new, self._emitted = text[self._emitted:], len(text)
+        return new
+
+
+class ScreeningService:
+    """Extract, score and store screening results"""
+
+    @staticmethod
+    def profile_values(profile: Dict) -> Dict[str, Any]:
+        """Candidate columns set from extracted resume data"""
+        return {
+            "full_name": profile.get("full_name") or "Unknown",
+            "email": profile.get("email"),
+            "phone": profile.get("phone"),
+            "skills": skills_list(profile.get("skills")),
+            "experience_years": profile.get("experience_years"),
+            "education": _list(profile.get("education")),
+            "work_experience": _list(profile.get("work_experience")),
+        }
+
+    @staticmethod
+    def match_values(match: Dict, preliminary: bool = False) -> Dict[str, Any]:
+        """Candidate columns set from a match result"""
+        return {
+            "match_score": match.get("match_score", 0),
+            "match_score_preliminary": preliminary,
+            "ai_summary": match.get("summary"),
+            "strengths": _list(match.get("strengths")),
+            "weaknesses": _list(match.get("weaknesses")),
+        }
+
+    @classmethod
+    def apply_profile(cls, candidate: Candidate, profile: Dict) -> None:
+        for name, value in cls.profile_values(profile).items():
+            setattr(candidate, name, value)
+
+    @classmethod
+    def apply_match(cls, candidate: Candidate, match: Dict, preliminary: bool = False) -> None:
+        for name, value in cls.match_values(match, preliminary).items():
+            setattr(candidate, name, value)
+
+    @classmethod
+    def prescreen(cls, candidate: Candidate, raw_text: str, vacancy: Vacancy) -> None:
+        """Deterministic stand-in while AI screening is deferred: vacancy
+        skills the resume text mentions, scored by skill overlap"""
+        vacancy_skills = skills_list(vacancy.skills)
+        candidate.skills = normalize_skills(
+            skills_list(candidate.skills) + mentioned_skills(raw_text, vacancy_skills)
+        )
+        overlap = skill_overlap(candidate.skills, vacancy_skills)
+        cls.apply_match(
+            candidate,
+            {
+                "match_score": overlap["score"],
+                "strengths": overlap["matched"],
+                "weaknesses": overlap["missing"],
+                "summary": "Preliminary score from the skills the resume mentions; AI screening is pending.",
+            },
+            preliminary=True,
+        )
+
+    @staticmethod
+    async def screen_resume(
+        ai_service: AIService,
+        resume: Resume,
+        vacancy: Vacancy,
+    ) -> Tuple[Dict, Dict]:
+        """(extracted data, match result) for a parsed resume; stores the extraction"""
+        requirements = vacancy.requirements or ""
+        vacancy_skills = skills_list(vacancy.skills)
+
+        if resume.extracted_data:
+            profile = resume.extracted_data
+            match = await ai_service.score_profile(profile, requirements, vacancy_skills)
+        elif settings.LLM_COMBINED_SCREENING:
+            profile, match = await ai_service.extract_and_score(resume.raw_text, requirements, vacancy_skills)
+        else:
+            profile = await ai_service.extract_resume_data(resume.raw_text)
+            match = await ai_service.calculate_match_score(resume.raw_text, requirements, vacancy_skills)
+
+        resume.extracted_data = profile
+        return profile, match
+
+    @staticmethod
+    async def latest_resume(session: AsyncSession, candidate_id: int) -> Optional[Resume]:
+        result = await session.execute(
+            select(Resume)
+            .where(Resume.candidate_id == candidate_id)
+            .where(Resume.raw_text.isnot(None))
+            .order_by(Resume.created_at.desc())
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+
+    @classmethod
+    async def score_candidate(
+        cls,
+        session: AsyncSession,
+        ai_service: AIService,
+        candidate: Candidate,
+        vacancy: Vacancy,
+    ) -> Dict:
+        """Score a parsed candidate against any vacancy of the organization
+
+        Uses the stored extraction (extracting once if an older resume has
+        none). The caller commits.
+        """
+        profile = await cls.candidate_profile(session, ai_service, candidate)
+        return await ai_service.score_profile(
+            profile, vacancy.requirements or "", skills_list(vacancy.skills)
+        )
+
+    @classmethod
+    async def candidate_profile(
+        cls,
+        session: AsyncSession,
+        ai_service: AIService,
+        candidate: Candidate,
+    ) -> Dict:
+        """Stored extraction of the candidate's latest resume; extracts it if missing"""
+        resume = await cls.latest_resume(session, candidate.id)
+        if resume is None:
+            raise ValueError("Candidate has no parsed resume")
+
+        if not resume.extracted_data:
+            resume.extracted_data = await ai_service.extract_resume_data(resume.raw_text)
+            session.add(resume)
+        return resume.extracted_data
+
+    @classmethod
+    async def save_match(
+        cls,
+        session: AsyncSession,
+        candidate: Candidate,
+        vacancy_id: int,
+        match: Dict,
+    ) -> None:
+        """Store a match on the candidate for its own vacancy, on the talent
+        pool suggestion otherwise; commits"""
+        if candidate.vacancy_id == vacancy_id:
+            cls.apply_match(candidate, match)
+            session.add(candidate)
+        else:
+            await session.execute(
+                update(TalentSuggestion)
+                .where(TalentSuggestion.vacancy_id == vacancy_id)
+                .where(TalentSuggestion.candidate_id == candidate.id)
+                .values(ai_match_score=match.get("match_score"), ai_summary=match.get("summary"))
+            )
+        await session.commit()
+        if candidate.vacancy_id == vacancy_id:
+            await response_cache.invalidate(vacancy_scope(vacancy_id))
+
+    @classmethod
+    async def relay_match(
+        cls,
+        candidate_id: int,
+        vacancy_id: int,
+        chunks: AsyncIterator[str],
+    ) -> AsyncIterator[Tuple[str, Dict]]:
+        """("summary", {"text": ...}) while a streamed match is generated,
+        then ("done", match) once it is parsed and stored
+
+        Runs after the endpoint has returned, so it stores in its own session.
+        """
+        summary = JsonFieldStream("summary")
+        parts = []
+        async for chunk in chunks:
+            parts.append(chunk)
+            text = summary.feed(chunk)
+            if text:
+                yield "summary", {"text": text}
+
+        match = coerce_output(MatchResult, json_object("".join(parts)))
+        if match is None:
+            raise LLMOutputError("score_profile", {"*": "streamed answer is not a valid match result"})
+        async with async_session() as session:
+            candidate = await session.get(Candidate, candidate_id)
+            if candidate is not None:
+                await cls.save_match(session, candidate, vacancy_id, match)
+        yield "done", {"candidate_id": candidate_id, "vacancy_id": vacancy_id, **match}
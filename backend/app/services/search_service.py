@@ -0,0 +1,194 @@
+"""Full-text search over resume text"""
+import base64
+import json
+import re
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, case, cast, func, literal_column, or_
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.models.candidate import Candidate, CandidateStatus
+from app.models.resume import Resume, SEARCH_CONFIGS
+
+# "quoted phrase" | -excluded | prefix* | word
+_TOKEN_RE = re.compile(r'"([^"]*)"|((?<!\w)-)?(\w+(?:-\w+)*)(\*?)', re.UNICODE)
+_WORD_RE = re.compile(r"[\w]+", re.UNICODE)
+# Resumes with Cyrillic text get Russian snippets, the rest English
+_CYRILLIC_PATTERN = "[А-Яа-яЁё]"
+
+HEADLINE_OPTIONS = (
+    "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, "
+    "MaxWords=30, MinWords=10, FragmentDelimiter= … "
+)
+
+
+def build_tsquery(query: str) -> Optional[str]:
+    """Translate a recruiter query into to_tsquery syntax
+
+    Supports "exact phrases", prefix* matching, -exclusion and OR.
+    Everything else is AND-ed: 'python "machine learning" devops* -java'
+    -> 'python & (machine <-> learning) & devops:* & !java'
+    """
+    parts: List[str] = []
+    pending_or = False
+
+    for match in _TOKEN_RE.finditer(query):
+        phrase, negate, word, prefix = match.groups()
+
+        if phrase is not None:
+            words = _WORD_RE.findall(phrase.lower())
+            if not words:
+                continue
+        elif word.lower() == "or" and not negate:
+            pending_or = bool(parts)
+            continue
+        else:
+            # 'front-end' is matched as the phrase 'front <-> end'
+            words = word.lower().split("-")
+            if prefix:
+                words[-1] += ":*"
+
+        term = f"({' <-> '.join(words)})" if len(words) > 1 else words[0]
+        if phrase is None and negate:
+            term = f"!{term}"
+
+        if parts:
+            parts.append("|" if pending_or else "&")
+        parts.append(term)
+        pending_or = False
+
+    return " ".join(parts) or None
+
+
+def encode_cursor(rank: float, resume_id: int) -> str:
+    """Opaque keyset cursor for (rank, resume_id)"""
+    return base64.urlsafe_b64encode(json.dumps([rank, resume_id]).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    """Decode keyset cursor, raises ValueError on malformed input"""
+    try:
+        rank, resume_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(rank), int(resume_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {str(e)}")
+
+
+class SearchService:
+    """Full-text search over Resume.raw_text backed by a GIN-indexed tsvector"""
+
+    @staticmethod
+    def tsquery(query: str, language: Optional[str] = None):
+        """SQL tsquery expression for one or all indexed languages"""
+        tsquery_text = build_tsquery(query)
+        if not tsquery_text:
+            raise ValueError("Search query is empty")
+
+        configs = [language] if language else list(SEARCH_CONFIGS)
+        if any(config not in SEARCH_CONFIGS for config in configs):
+            raise ValueError(f"Unsupported language: {language}")
+
+        expression = None
+        for config in configs:
+            part = func.to_tsquery(literal_column(f"'{config}'::regconfig"), tsquery_text)
+            expression = part if expression is None else expression.op("||")(part)
+        return expression
+
+    @staticmethod
+    def headline_config(language: Optional[str] = None):
+        """Text search config for snippets: the requested language, else the
+        resume's own (by script), so English resumes are not highlighted
+        with the Russian dictionary"""
+        if language:
+            return literal_column(f"'{language}'::regconfig")
+        return cast(
+            case((Resume.raw_text.op("~")(_CYRILLIC_PATTERN), "russian"), else_="english"),
+            REGCONFIG,
+        )
+
+    @staticmethod
+    def ranked_query(
+        ts_query,
+        rank,
+        organization_id: int,
+        vacancy_id: Optional[int] = None,
+        status: Optional[CandidateStatus] = None,
+    ):
+        """(resume_id, rank) for the organization's resumes matching the tsquery"""
+        query = (
+            select(Resume.id.label("resume_id"), rank)
+            .join(Candidate, Candidate.id == Resume.candidate_id)
+            .where(Resume.search_vector.op("@@")(ts_query))
+            .where(Candidate.organization_id == organization_id)
+        )
+        if vacancy_id:
+            query = query.where(Candidate.vacancy_id == vacancy_id)
+        if status:
+            query = query.where(Candidate.status == status)
+        return query
+
+    @classmethod
+    async def search_resumes(
+        cls,
+        session: AsyncSession,
+        organization_id: int,
+        query: str,
+        vacancy_id: Optional[int] = None,
+        status: Optional[CandidateStatus] = None,
+        language: Optional[str] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> Dict:
+        """Ranked resume search with highlighted snippets and keyset pagination"""
+        ts_query = cls.tsquery(query, language)
+        rank = func.ts_rank_cd(Resume.search_vector, ts_query, 32).label("rank")
+
+        # Rank and paginate on the index first; snippets only for the page
+        page = cls.ranked_query(ts_query, rank, organization_id, vacancy_id, status)
+        if cursor:
+            cursor_rank, cursor_id = decode_cursor(cursor)
+            page = page.where(
+                or_(
+                    rank < cursor_rank,
+                    and_(rank == cursor_rank, Resume.id < cursor_id),
+                )
+            )
+        page = page.order_by(rank.desc(), Resume.id.desc()).limit(limit + 1).subquery()
+
+        headline_config = cls.headline_config(language)
+        result = await session.execute(
+            select(
+                page.c.resume_id,
+                page.c.rank,
+                Candidate.id,
+                Candidate.full_name,
+                Candidate.vacancy_id,
+                Candidate.status,
+                func.ts_headline(headline_config, Resume.raw_text, ts_query, HEADLINE_OPTIONS),
+            )
+            .join(Resume, Resume.id == page.c.resume_id)
+            .join(Candidate, Candidate.id == Resume.candidate_id)
+            .order_by(page.c.rank.desc(), page.c.resume_id.desc())
+        )
+        rows = result.all()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        return {
+            "results": [
+                {
+                    "resume_id": resume_id,
+                    "candidate_id": candidate_id,
+                    "full_name": full_name,
+                    "vacancy_id": row_vacancy_id,
+                    "status": row_status,
+                    "rank": row_rank,
+                    "snippet": snippet,
+                }
+                for resume_id, row_rank, candidate_id, full_name, row_vacancy_id, row_status, snippet in rows
+            ],
+            "next_cursor": encode_cursor(rows[-1][1], rows[-1][0]) if has_more else None,
+        }
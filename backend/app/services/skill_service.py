@@ -0,0 +1,274 @@
+"""Deterministic skill normalization and matching (no LLM calls)"""
+import json
+import re
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.models.candidate import Candidate
+from app.models.skill import CandidateSkill
+
+
+# Folded alias -> canonical skill name. Keys must already be folded (see _fold).
+# Aliases also match words of free resume text (mentioned_skills), so
+# ambiguous abbreviations ("es": Elasticsearch or Spanish, "tf":
+# Terraform or TensorFlow) are left out.
+SKILL_ALIASES: Dict[str, str] = {
+    # Languages
+    "py": "python",
+    "python3": "python",
+    "python 3": "python",
+    "js": "javascript",
+    "ecmascript": "javascript",
+    "es6": "javascript",
+    "ts": "typescript",
+    "golang": "go",
+    "c sharp": "c#",
+    "csharp": "c#",
+    "cpp": "c++",
+    "cplusplus": "c++",
+    "objective c": "objective-c",
+    # Frameworks & runtimes
+    "node": "node.js",
+    "nodejs": "node.js",
+    "node js": "node.js",
+    "reactjs": "react",
+    "react js": "react",
+    "react.js": "react",
+    "vuejs": "vue",
+    "vue.js": "vue",
+    "angularjs": "angular",
+    "nextjs": "next.js",
+    "next js": "next.js",
+    "dotnet": ".net",
+    "net core": ".net",
+    ".net core": ".net",
+    "asp.net core": "asp.net",
+    "drf": "django rest framework",
+    "spring boot": "spring",
+    # Data
+    "postgres": "postgresql",
+    "psql": "postgresql",
+    "pg": "postgresql",
+    "mongo": "mongodb",
+    "ms sql": "sql server",
+    "mssql": "sql server",
+    "elastic": "elasticsearch",
+    "sklearn": "scikit-learn",
+    "scikit learn": "scikit-learn",
+    "ml": "machine learning",
+    "dl": "deep learning",
+    "nlp": "natural language processing",
+    # Infrastructure
+    "k8s": "kubernetes",
+    "kube": "kubernetes",
+    "docker compose": "docker",
+    "amazon web services": "aws",
+    "gcp": "google cloud",
+    "google cloud platform": "google cloud",
+    "ms azure": "azure",
+    "microsoft azure": "azure",
+    "ci cd": "ci/cd",
+    "cicd": "ci/cd",
+    "gh actions": "github actions",
+    "hashicorp terraform": "terraform",
+    # Russian spellings
+    "питон": "python",
+    "пайтон": "python",
+    "джава": "java",
+    "английский": "english",
+    "английский язык": "english",
+    "управление проектами": "project management",
+}
+
+_SEPARATORS_RE = re.compile(r"[\s_\-/\\|,;:]+")
+_EDGE_PUNCT_RE = re.compile(r"^[^\w#+.]+|[^\w#+]+$")
+_TRAILING_VERSION_RE = re.compile(r"\s+v?\d+(\.\d+)*$")
+_GLUED_VERSION_RE = re.compile(r"(?<=[a-zа-я])v?\d+(\.\d+)*$")
+
+CANONICAL_SKILLS = frozenset(SKILL_ALIASES.values())
+
+
+def _fold(raw: str) -> str:
+    """Case/punctuation folding: 'Node.JS ' -> 'node.js', 'CI-CD' -> 'ci cd'"""
+    text = unicodedata.normalize("NFKC", raw).casefold().replace("ё", "е")
+    text = _SEPARATORS_RE.sub(" ", text).strip()
+    return _EDGE_PUNCT_RE.sub("", text)
+
+
+def normalize_skill(raw: Optional[str]) -> Optional[str]:
+    """Normalize a single free-form skill to its canonical name"""
+    if not raw or not isinstance(raw, str):
+        return None
+
+    folded = _fold(raw)
+    if not folded:
+        return None
+
+    unversioned = _TRAILING_VERSION_RE.sub("", folded) or folded
+    for key in (folded, folded.replace(" ", ""), unversioned):
+        if key in SKILL_ALIASES:
+            return SKILL_ALIASES[key]
+
+    # 'python3.11' -> 'python', but only for known skills so 's3' or 'ec2' stay intact
+    base = _GLUED_VERSION_RE.sub("", unversioned)
+    if base != unversioned and (base in CANONICAL_SKILLS or base in SKILL_ALIASES):
+        return SKILL_ALIASES.get(base, base)
+
+    return unversioned
+
+
+def skills_list(value: Any) -> List[str]:
+    """Read a skills column that may hold a list or a JSON-encoded list"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return [part for part in value.split(",") if part.strip()]
+    if isinstance(value, list):
+        return [str(item) for item in value if item]
+    return []
+
+
+def normalize_skills(raw_skills: Any) -> List[str]:
+    """Normalize and deduplicate skills, preserving first-seen order"""
+    result: List[str] = []
+    seen = set()
+    for raw in skills_list(raw_skills):
+        skill = normalize_skill(raw)
+        if skill and skill not in seen:
+            seen.add(skill)
+            result.append(skill)
+    return result
+
+
+def skill_overlap(candidate_skills: Any, vacancy_skills: Any) -> Dict:
+    """Explainable overlap between candidate and vacancy skills (score 0-100)"""
+    candidate_set = set(normalize_skills(candidate_skills))
+    required = normalize_skills(vacancy_skills)
+
+    matched = [skill for skill in required if skill in candidate_set]
+    missing = [skill for skill in required if skill not in candidate_set]
+    score = round(100.0 * len(matched) / len(required), 1) if required else 0.0
+
+    return {
+        "score": score,
+        "matched": matched,
+        "missing": missing,
+    }
+
+
+_TEXT_WORD_RE = re.compile(r"[\w#+.]+")
+
+
+def mentioned_skills(text: Optional[str], skills: Any) -> List[str]:
+    """Which of `skills` (normalized) a free text mentions, by name or known alias"""
+    words = (normalize_skill(word) for word in _TEXT_WORD_RE.findall(text or ""))
+    haystack = f" {' '.join(word for word in words if word)} "
+
+    mentioned = []
+    for skill in normalize_skills(skills):
+        names = {skill} | {
+            " ".join(normalize_skill(word) or word for word in alias.split())
+            for alias, canonical in SKILL_ALIASES.items()
+            if canonical == skill
+        }
+        if any(f" {name} " in haystack for name in names):
+            mentioned.append(skill)
+    return mentioned
+
+
+class SkillService:
+    """Maintain and query the skill -> candidate inverted index"""
+
+    @staticmethod
+    async def index_candidate(
+        session: AsyncSession,
+        candidate_id: int,
+        raw_skills: Any,
+    ) -> List[str]:
+        """Replace index entries for a candidate. Caller commits."""
+        skills = normalize_skills(raw_skills)
+
+        await session.execute(
+            delete(CandidateSkill).where(CandidateSkill.candidate_id == candidate_id)
+        )
+        session.add_all(
+            CandidateSkill(skill=skill, candidate_id=candidate_id) for skill in skills
+        )
+        return skills
+
+    @staticmethod
+    async def find_candidates_with_all(
+        session: AsyncSession,
+        organization_id: int,
+        skills: Iterable[str],
+        vacancy_id: Optional[int] = None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> List[int]:
+        """Candidate IDs having every one of the given skills"""
+        required = normalize_skills(list(skills))
+        if not required:
+            return []
+
+        query = (
+            select(CandidateSkill.candidate_id)
+            .join(Candidate, Candidate.id == CandidateSkill.candidate_id)
+            .where(CandidateSkill.skill.in_(required))
+            .where(Candidate.organization_id == organization_id)
+            .group_by(CandidateSkill.candidate_id)
+            .having(func.count() == len(required))
+            .order_by(CandidateSkill.candidate_id)
+            .offset(offset)
+            .limit(limit)
+        )
+        if vacancy_id:
+            query = query.where(Candidate.vacancy_id == vacancy_id)
+
+        result = await session.execute(query)
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def rank_by_overlap(
+        session: AsyncSession,
+        organization_id: int,
+        skills: Sequence[str],
+        vacancy_id: Optional[int] = None,
+        exclude_vacancy_id: Optional[int] = None,
+        limit: int = 100,
+    ) -> List[Dict]:
+        """Candidates ordered by number of matching skills, computed in the index"""
+        required = normalize_skills(list(skills))
+        if not required:
+            return []
+
+        matched_count = func.count().label("matched_count")
+        query = (
+            select(CandidateSkill.candidate_id, matched_count)
+            .join(Candidate, Candidate.id == CandidateSkill.candidate_id)
+            .where(CandidateSkill.skill.in_(required))
+            .where(Candidate.organization_id == organization_id)
+            .group_by(CandidateSkill.candidate_id)
+            .order_by(matched_count.desc(), CandidateSkill.candidate_id)
+            .limit(limit)
+        )
+        if vacancy_id:
+            query = query.where(Candidate.vacancy_id == vacancy_id)
+        if exclude_vacancy_id:
+            query = query.where(Candidate.vacancy_id != exclude_vacancy_id)
+
+        result = await session.execute(query)
+        return [
+            {
+                "candidate_id": candidate_id,
+                "matched_count": count,
+                "score": round(100.0 * count / len(required), 1),
+            }
+            for candidate_id, count in result.all()
+        ]
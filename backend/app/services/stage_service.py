@@ -0,0 +1,226 @@
+"""Candidate stage moves, time-in-stage intervals and SLA tracking"""
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import delete, func, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.core.config import settings
+from app.models.candidate import Candidate
+from app.models.pipeline import INITIAL_STAGE, CandidateStage, CandidateStageInterval
+from app.services.analytics_service import AnalyticsService, as_utc
+
+
+class StageService:
+    """Keep stage history, open/closed intervals and analytics in one transaction"""
+
+    @staticmethod
+    async def move(
+        session: AsyncSession,
+        candidate: Candidate,
+        to_stage: str,
+        moved_by: int,
+        notes: Optional[str] = None,
+    ) -> CandidateStage:
+        """Move a candidate to `to_stage`. Caller commits."""
+        moved_at = datetime.utcnow()
+
+        # Serialize concurrent moves of the same candidate
+        await session.execute(
+            select(Candidate.id).where(Candidate.id == candidate.id).with_for_update()
+        )
+
+        result = await session.execute(
+            update(CandidateStageInterval)
+            .where(
+                CandidateStageInterval.candidate_id == candidate.id,
+                CandidateStageInterval.exited_at.is_(None),
+            )
+            .values(exited_at=moved_at)
+            .returning(CandidateStageInterval.stage_slug, CandidateStageInterval.entered_at)
+            .execution_options(synchronize_session=False)
+        )
+        closed = result.first()
+
+        move = CandidateStage(
+            candidate_id=candidate.id,
+            stage_slug=to_stage,
+            notes=notes,
+            moved_by=moved_by,
+            created_at=moved_at,
+            updated_at=moved_at,
+        )
+        session.add(move)
+        session.add(CandidateStageInterval(
+            candidate_id=candidate.id,
+            vacancy_id=candidate.vacancy_id,
+            stage_slug=to_stage,
+            entered_at=moved_at,
+        ))
+
+        await AnalyticsService.record_move(session, candidate, to_stage, moved_at, closed)
+        return move
+
+    @classmethod
+    async def start(cls, session: AsyncSession, candidate: Candidate, moved_by: int) -> CandidateStage:
+        """Put a new application into the initial stage, so its time there
+        counts towards the stage SLA. Caller commits."""
+        # The candidate needs its ID
+        await session.flush()
+        return await cls.move(session, candidate, INITIAL_STAGE, moved_by)
+
+    @staticmethod
+    async def rebuild_intervals(session: AsyncSession, vacancy_id: int) -> None:
+        """Recompute a vacancy's intervals from stage history (backfill, imports)
+
+        SLA breach marks of intervals that survive the rebuild are kept.
+        """
+        result = await session.execute(
+            select(
+                CandidateStageInterval.candidate_id,
+                CandidateStageInterval.stage_slug,
+                CandidateStageInterval.entered_at,
+                CandidateStageInterval.sla_breached_at,
+            ).where(
+                CandidateStageInterval.vacancy_id == vacancy_id,
+                CandidateStageInterval.sla_breached_at.isnot(None),
+            )
+        )
+        breaches = result.all()
+
+        await session.execute(
+            delete(CandidateStageInterval).where(CandidateStageInterval.vacancy_id == vacancy_id)
+        )
+
+        exited_at = func.lead(CandidateStage.created_at).over(
+            partition_by=CandidateStage.candidate_id,
+            order_by=(CandidateStage.created_at, CandidateStage.id),
+        )
+        await session.execute(
+            insert(CandidateStageInterval).from_select(
+                ["candidate_id", "vacancy_id", "stage_slug", "entered_at", "exited_at"],
+                select(
+                    CandidateStage.candidate_id,
+                    Candidate.vacancy_id,
+                    CandidateStage.stage_slug,
+                    CandidateStage.created_at,
+                    exited_at,
+                )
+                .join(Candidate, Candidate.id == CandidateStage.candidate_id)
+                .where(Candidate.vacancy_id == vacancy_id),
+            )
+        )
+
+        for breach in breaches:
+            await session.execute(
+                update(CandidateStageInterval)
+                .where(
+                    CandidateStageInterval.candidate_id == breach.candidate_id,
+                    CandidateStageInterval.stage_slug == breach.stage_slug,
+                    CandidateStageInterval.entered_at == breach.entered_at,
+                )
+                .values(sla_breached_at=breach.sla_breached_at)
+                .execution_options(synchronize_session=False)
+            )
+
+    @staticmethod
+    def stale_query(
+        stage_slug: str,
+        older_than_days: float,
+        vacancy_id: Optional[int] = None,
+        now: Optional[datetime] = None,
+    ):
+        """Open intervals in a stage entered before the cutoff (partial-index range scan)"""
+        cutoff = (now or datetime.utcnow()) - timedelta(days=older_than_days)
+        query = select(CandidateStageInterval).where(
+            CandidateStageInterval.exited_at.is_(None),
+            CandidateStageInterval.stage_slug == stage_slug,
+            CandidateStageInterval.entered_at < cutoff,
+        )
+        if vacancy_id:
+            query = query.where(CandidateStageInterval.vacancy_id == vacancy_id)
+        return query
+
+    @classmethod
+    async def stale_candidates(
+        cls,
+        session: AsyncSession,
+        organization_id: int,
+        stage_slug: str,
+        older_than_days: Optional[float] = None,
+        vacancy_id: Optional[int] = None,
+        limit: int = 100,
+    ) -> List[Dict]:
+        """Candidates sitting in a stage longer than N days (default: the stage SLA)"""
+        if older_than_days is None:
+            older_than_days = settings.STAGE_SLA_DAYS.get(stage_slug)
+            if older_than_days is None:
+                raise ValueError(f"No SLA configured for stage '{stage_slug}'; pass older_than_days")
+
+        interval = cls.stale_query(stage_slug, older_than_days, vacancy_id).subquery()
+        result = await session.execute(
+            select(
+                interval.c.candidate_id,
+                interval.c.vacancy_id,
+                interval.c.stage_slug,
+                interval.c.entered_at,
+                interval.c.sla_breached_at,
+                Candidate.full_name,
+                Candidate.email,
+            )
+            .join(Candidate, Candidate.id == interval.c.candidate_id)
+            .where(Candidate.organization_id == organization_id)
+            .order_by(interval.c.entered_at)
+            .limit(limit)
+        )
+
+        now = datetime.utcnow()
+        return [
+            {
+                "candidate_id": row.candidate_id,
+                "full_name": row.full_name,
+                "email": row.email,
+                "vacancy_id": row.vacancy_id,
+                "stage_slug": row.stage_slug,
+                "entered_at": row.entered_at,
+                "days_in_stage": round((now - as_utc(row.entered_at)).total_seconds() / 86400, 1),
+                "sla_breached_at": row.sla_breached_at,
+            }
+            for row in result.all()
+        ]
+
+    @staticmethod
+    async def flag_sla_breaches(session: AsyncSession, batch_size: int = 1000) -> Dict[str, int]:
+        """Mark open intervals that exceeded their stage SLA; commits per batch
+
+        Each stage is a range scan over the open-interval partial index, and
+        already flagged intervals are skipped, so a run touches only new
+        breaches. Returns the number of newly flagged intervals per stage.
+        """
+        now = datetime.utcnow()
+        flagged: Dict[str, int] = {}
+
+        for stage_slug, days in settings.STAGE_SLA_DAYS.items():
+            total = 0
+            while True:
+                batch = (
+                    StageService.stale_query(stage_slug, days, now=now)
+                    .where(CandidateStageInterval.sla_breached_at.is_(None))
+                    .with_only_columns(CandidateStageInterval.id)
+                    .limit(batch_size)
+                    .scalar_subquery()
+                )
+                result = await session.execute(
+                    update(CandidateStageInterval)
+                    .where(CandidateStageInterval.id.in_(batch))
+                    .values(sla_breached_at=now)
+                    .execution_options(synchronize_session=False)
+                )
+                total += result.rowcount
+                await session.commit()
+                if result.rowcount < batch_size:
+                    break
+            flagged[stage_slug] = total
+
+        return flagged
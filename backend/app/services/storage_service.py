@@ -1,6 +1,7 @@
 import boto3
 from botocore.exceptions import ClientError
 from app.core.config import settings
+from app.core.telemetry import traced
 import uuid
 
 
@@ -25,6 +26,7 @@ class StorageService:
         except ClientError:
             self.s3_client.create_bucket(Bucket=self.bucket_name)
     
+    @traced("storage.upload")
     async def upload_resume(
         self,
         file_content: bytes,
@@ -46,6 +48,7 @@ class StorageService:
         except ClientError as e:
             raise Exception(f"Failed to upload file: {str(e)}")
     
+    @traced("storage.download")
     async def download_resume(self, file_path: str) -> bytes:
         """Download resume from S3/MinIO"""
         try:
@@ -57,6 +60,7 @@ class StorageService:
         except ClientError as e:
             raise Exception(f"Failed to download file: {str(e)}")
     
+    @traced("storage.delete")
     async def delete_resume(self, file_path: str) -> bool:
         """Delete resume from S3/MinIO"""
         try:
@@ -0,0 +1,214 @@
+"""Talent rediscovery: match past applicants against a new vacancy"""
+import logging
+from typing import Dict, List, Optional
+
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.core.config import settings
+from app.core.quotas import QuotaExceededError
+from app.models.candidate import Candidate
+from app.models.resume import Resume
+from app.models.talent_pool import TalentSuggestion
+from app.models.vacancy import Vacancy
+from app.services.ai_service import AIService
+from app.services.identity import identity_key, normalize_email, normalize_phone
+from app.services.llm_errors import LLMError
+from app.services.skill_service import SkillService, skill_overlap, skills_list
+
+logger = logging.getLogger(__name__)
+
+
+def vacancy_embedding_text(vacancy: Vacancy) -> str:
+    """Text representing a vacancy for embedding"""
+    parts = [
+        vacancy.title,
+        vacancy.description,
+        vacancy.requirements,
+        ", ".join(skills_list(vacancy.skills)),
+    ]
+    return "\n".join(part for part in parts if part)
+
+
+def dedupe_people(suggestions: List[Dict]) -> List[Dict]:
+    """Keep the best-scoring application per person (shared email or phone)"""
+    seen_emails = set()
+    seen_phones = set()
+    unique = []
+
+    for suggestion in sorted(suggestions, key=lambda s: -s["score"]):
+        email = normalize_email(suggestion["email"])
+        phone = normalize_phone(suggestion["phone"])
+        duplicate = (email and email in seen_emails) or (phone and phone in seen_phones)
+
+        # Remember keys of skipped rows too, so email/phone links chain transitively
+        if email:
+            seen_emails.add(email)
+        if phone:
+            seen_phones.add(phone)
+        if not duplicate:
+            unique.append(suggestion)
+
+    return unique
+
+
+class TalentPoolService:
+    """Rank already-parsed, already-embedded applicants of other vacancies"""
+
+    @staticmethod
+    async def ensure_vacancy_embedding(
+        session: AsyncSession,
+        vacancy: Vacancy,
+    ) -> Optional[List[float]]:
+        """Embed the vacancy once; candidates are never re-embedded"""
+        if vacancy.embedding is None:
+            text = vacancy_embedding_text(vacancy)
+            if not text:
+                return None
+            ai_service = AIService(
+                organization_id=vacancy.organization_id,
+                wait_for_quota=True,
+                vacancy_id=vacancy.id,
+            )
+            vacancy.embedding = await ai_service.generate_embedding(text)
+            session.add(vacancy)
+        return list(vacancy.embedding)
+
+    @staticmethod
+    async def semantic_similarities(
+        session: AsyncSession,
+        vacancy: Vacancy,
+        embedding: List[float],
+        limit: int,
+    ) -> Dict[int, float]:
+        """Nearest historical resumes of the same organization by cosine distance (HNSW index)"""
+        distance = Resume.embedding.cosine_distance(embedding).label("distance")
+        result = await session.execute(
+            select(Resume.candidate_id, distance)
+            .join(Candidate, Candidate.id == Resume.candidate_id)
+            .where(Resume.embedding.isnot(None))
+            .where(Candidate.organization_id == vacancy.organization_id)
+            .where(Candidate.vacancy_id != vacancy.id)
+            .order_by(distance)
+            .limit(limit)
+        )
+        similarities: Dict[int, float] = {}
+        for candidate_id, row_distance in result.all():
+            similarities.setdefault(candidate_id, round(1.0 - row_distance, 4))
+        return similarities
+
+    @staticmethod
+    async def similarities_for(
+        session: AsyncSession,
+        candidate_ids: List[int],
+        embedding: List[float],
+    ) -> Dict[int, float]:
+        """Cosine similarity for specific candidates (skill-only hits)"""
+        if not candidate_ids:
+            return {}
+        distance = Resume.embedding.cosine_distance(embedding).label("distance")
+        result = await session.execute(
+            select(Resume.candidate_id, distance)
+            .where(Resume.candidate_id.in_(candidate_ids))
+            .where(Resume.embedding.isnot(None))
+            .order_by(distance)
+        )
+        similarities: Dict[int, float] = {}
+        for candidate_id, row_distance in result.all():
+            similarities.setdefault(candidate_id, round(1.0 - row_distance, 4))
+        return similarities
+
+    @classmethod
+    async def rediscover(
+        cls,
+        session: AsyncSession,
+        vacancy: Vacancy,
+    ) -> List[TalentSuggestion]:
+        """Recompute and store ranked suggestions for the vacancy. Caller commits.
+
+        If the vacancy cannot be embedded (provider outage, open circuit,
+        quota), candidates are ranked by skill overlap alone.
+        """
+        per_leg = settings.TALENT_POOL_CANDIDATES_PER_LEG
+        vacancy_skills = skills_list(vacancy.skills)
+
+        try:
+            embedding = await cls.ensure_vacancy_embedding(session, vacancy)
+        except (LLMError, QuotaExceededError) as e:
+            logger.warning("Vacancy %s not embedded, rediscovering by skills only: %s", vacancy.id, e)
+            embedding = None
+        similarities = (
+            await cls.semantic_similarities(session, vacancy, embedding, per_leg)
+            if embedding else {}
+        )
+        skill_hits = await SkillService.rank_by_overlap(
+            session,
+            vacancy.organization_id,
+            vacancy_skills,
+            exclude_vacancy_id=vacancy.id,
+            limit=per_leg,
+        )
+
+        candidate_ids = set(similarities) | {hit["candidate_id"] for hit in skill_hits}
+        if embedding:
+            skill_only = [cid for cid in candidate_ids if cid not in similarities]
+            similarities.update(await cls.similarities_for(session, skill_only, embedding))
+
+        rows = []
+        if candidate_ids:
+            result = await session.execute(
+                select(
+                    Candidate.id,
+                    Candidate.vacancy_id,
+                    Candidate.email,
+                    Candidate.phone,
+                    Candidate.skills,
+                ).where(Candidate.id.in_(candidate_ids))
+            )
+            rows = result.all()
+
+        # Blend semantic similarity with skill overlap; fall back to whichever signal exists
+        if not embedding:
+            weight = 0.0
+        elif not vacancy_skills:
+            weight = 1.0
+        else:
+            weight = settings.TALENT_POOL_SEMANTIC_WEIGHT
+
+        scored = []
+        for candidate_id, source_vacancy_id, email, phone, skills in rows:
+            overlap = skill_overlap(skills, vacancy_skills)
+            similarity = similarities.get(candidate_id)
+            score = weight * 100.0 * (similarity or 0.0) + (1.0 - weight) * overlap["score"]
+            scored.append({
+                "candidate_id": candidate_id,
+                "source_vacancy_id": source_vacancy_id,
+                "email": email,
+                "phone": phone,
+                "score": round(score, 1),
+                "similarity": similarity,
+                "overlap": overlap,
+            })
+
+        suggestions = [
+            TalentSuggestion(
+                vacancy_id=vacancy.id,
+                candidate_id=item["candidate_id"],
+                source_vacancy_id=item["source_vacancy_id"],
+                identity_key=identity_key(item["email"], item["phone"], item["candidate_id"]),
+                score=item["score"],
+                semantic_similarity=item["similarity"],
+                skill_score=item["overlap"]["score"] if vacancy_skills else None,
+                matched_skills=item["overlap"]["matched"],
+                missing_skills=item["overlap"]["missing"],
+            )
+            for item in dedupe_people(scored)
+            if item["score"] >= settings.TALENT_POOL_MIN_SCORE
+        ][:settings.TALENT_POOL_MAX_SUGGESTIONS]
+
+        await session.execute(
+            delete(TalentSuggestion).where(TalentSuggestion.vacancy_id == vacancy.id)
+        )
+        session.add_all(suggestions)
+        return suggestions
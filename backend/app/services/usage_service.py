@@ -0,0 +1,276 @@
+"""LLM usage ledger, cost reports and per-vacancy AI budgets
+
+Every chat and embedding call is written to `llm_usage` with its tokens,
+cost (LLM_PRICES_PER_MILLION) and latency, attributed to the organization,
+vacancy, candidate and requesting user when known. Rows are written in
+their own session: the tokens are spent even if the caller rolls back.
+
+A vacancy's allowance (`ai_budget_usd`, default LLM_VACANCY_BUDGET_USD)
+moves chat calls to LLM_FALLBACK_MODEL past LLM_BUDGET_FALLBACK_RATIO of
+the budget and refuses them with BudgetExceededError once it is spent.
+"""
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import Date, cast, func
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.core.config import settings
+from app.core.database import async_session
+from app.models.llm_usage import LLMUsage
+from app.models.vacancy import Vacancy
+
+logger = logging.getLogger(__name__)
+
+GROUP_BY_COLUMNS = {
+    "vacancy": LLMUsage.vacancy_id,
+    "candidate": LLMUsage.candidate_id,
+    "user": LLMUsage.user_id,
+    "model": LLMUsage.model,
+    "operation": LLMUsage.operation,
+    "day": cast(LLMUsage.created_at, Date),
+}
+
+
+class BudgetExceededError(Exception):
+    def __init__(self, vacancy_id: int, budget_usd: float, spent_usd: float):
+        self.vacancy_id = vacancy_id
+        self.budget_usd = budget_usd
+        self.spent_usd = spent_usd
+        super().__init__(
+            f"Vacancy {vacancy_id} spent ${spent_usd:.2f} of its ${budget_usd:.2f} AI budget"
+        )
+
+    def as_http(self) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_402_PAYMENT_REQUIRED,
+            detail="AI budget of the vacancy is exhausted",
+        )
+
+
+def llm_cost(model: str, prompt_tokens: int, completion_tokens: int, price_factor: float = 1.0) -> float:
+    """USD cost of a call; unknown models are counted as free (and logged)"""
+    prices = settings.LLM_PRICES_PER_MILLION.get(model)
+    if prices is None:
+        logger.warning("No price configured for model %s", model)
+        return 0.0
+    prompt_price, completion_price = prices
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000 * price_factor
+
+
+def _totals(row: Any) -> Dict:
+    return {
+        "calls": int(row.calls or 0),
+        "prompt_tokens": int(row.prompt_tokens or 0),
+        "completion_tokens": int(row.completion_tokens or 0),
+        "cost_usd": round(float(row.cost_usd or 0), 4),
+        "avg_latency_ms": round(float(row.avg_latency_ms), 1) if row.avg_latency_ms is not None else None,
+    }
+
+
+_AGGREGATES = (
+    func.count().label("calls"),
+    func.sum(LLMUsage.prompt_tokens).label("prompt_tokens"),
+    func.sum(LLMUsage.completion_tokens).label("completion_tokens"),
+    func.sum(LLMUsage.cost_usd).label("cost_usd"),
+    func.avg(LLMUsage.latency_ms).label("avg_latency_ms"),
+)
+
+
+class UsageService:
+    """Record LLM calls and report spend against budgets"""
+
+    @staticmethod
+    def entry(
+        organization_id: Optional[int],
+        operation: str,
+        model: str,
+        usage: Any,
+        latency_ms: int,
+        vacancy_id: Optional[int] = None,
+        candidate_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+        price_factor: float = 1.0,
+    ) -> LLMUsage:
+        """Ledger row for a call; `usage` is an OpenAI usage object or dict"""
+        if isinstance(usage, dict):
+            prompt_tokens, completion_tokens = usage.get("prompt_tokens"), usage.get("completion_tokens")
+        else:
+            prompt_tokens = getattr(usage, "prompt_tokens", None)
+            completion_tokens = getattr(usage, "completion_tokens", None)
+        prompt_tokens, completion_tokens = prompt_tokens or 0, completion_tokens or 0
+
+        return LLMUsage(
+            organization_id=organization_id,
+            vacancy_id=vacancy_id,
+            candidate_id=candidate_id,
+            user_id=user_id,
+            operation=operation,
+            model=model,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            cost_usd=llm_cost(model, prompt_tokens, completion_tokens, price_factor),
+            latency_ms=latency_ms,
+        )
+
+    @classmethod
+    async def record(
+        cls,
+        organization_id: Optional[int],
+        operation: str,
+        model: str,
+        usage: Any,
+        latency_ms: int,
+        vacancy_id: Optional[int] = None,
+        candidate_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+    ) -> None:
+        """Write one ledger row; accounting failures never fail the call"""
+        entry = cls.entry(
+            organization_id,
+            operation,
+            model,
+            usage,
+            latency_ms,
+            vacancy_id=vacancy_id,
+            candidate_id=candidate_id,
+            user_id=user_id,
+        )
+        try:
+            async with async_session() as session:
+                session.add(entry)
+                await session.commit()
+        except SQLAlchemyError:
+            logger.warning("Failed to record LLM usage for %s", operation, exc_info=True)
+
+    @staticmethod
+    def budget_of(vacancy: Vacancy) -> Optional[float]:
+        if vacancy.ai_budget_usd is not None:
+            return vacancy.ai_budget_usd
+        return settings.LLM_VACANCY_BUDGET_USD
+
+    @staticmethod
+    async def vacancy_spend(session: AsyncSession, vacancy_id: int) -> float:
+        result = await session.execute(
+            select(func.coalesce(func.sum(LLMUsage.cost_usd), 0.0))
+            .where(LLMUsage.vacancy_id == vacancy_id)
+        )
+        return float(result.scalar_one())
+
+    @classmethod
+    async def chat_model(cls, vacancy_id: Optional[int], default_model: str) -> str:
+        """Model for the next chat call on behalf of a vacancy
+
+        Raises BudgetExceededError when the vacancy's allowance is spent.
+        """
+        if vacancy_id is None:
+            return default_model
+
+        async with async_session() as session:
+            vacancy = await session.get(Vacancy, vacancy_id)
+            budget = cls.budget_of(vacancy) if vacancy else None
+            if budget is None:
+                return default_model
+            spent = await cls.vacancy_spend(session, vacancy_id)
+
+        if spent >= budget:
+            raise BudgetExceededError(vacancy_id, budget, spent)
+        if spent >= budget * settings.LLM_BUDGET_FALLBACK_RATIO:
+            return settings.LLM_FALLBACK_MODEL
+        return default_model
+
+    @classmethod
+    async def budget_status(cls, session: AsyncSession, vacancy: Vacancy) -> Dict:
+        """Allowance, spend and the mode chat calls currently run in"""
+        budget = cls.budget_of(vacancy)
+        spent = await cls.vacancy_spend(session, vacancy.id)
+
+        if budget is None:
+            mode = "unlimited"
+        elif spent >= budget:
+            mode = "exhausted"
+        elif spent >= budget * settings.LLM_BUDGET_FALLBACK_RATIO:
+            mode = "fallback"
+        else:
+            mode = "normal"
+
+        return {
+            "budget_usd": budget,
+            "spent_usd": round(spent, 4),
+            "remaining_usd": round(max(budget - spent, 0.0), 4) if budget is not None else None,
+            "mode": mode,
+        }
+
+    @staticmethod
+    def _period(query, date_from: Optional[date], date_to: Optional[date]):
+        if date_from:
+            query = query.where(LLMUsage.created_at >= datetime.combine(date_from, time.min))
+        if date_to:
+            query = query.where(LLMUsage.created_at < datetime.combine(date_to + timedelta(days=1), time.min))
+        return query
+
+    @classmethod
+    async def summary(
+        cls,
+        session: AsyncSession,
+        organization_id: int,
+        group_by: str = "vacancy",
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+    ) -> Dict:
+        """Calls, tokens and cost of the organization grouped by one dimension"""
+        column = GROUP_BY_COLUMNS.get(group_by)
+        if column is None:
+            raise ValueError(f"group_by must be one of: {', '.join(GROUP_BY_COLUMNS)}")
+        if date_from and date_to and date_from > date_to:
+            raise ValueError("date_from must not be after date_to")
+
+        key = column.label("key")
+        query = cls._period(
+            select(key, *_AGGREGATES).where(LLMUsage.organization_id == organization_id),
+            date_from,
+            date_to,
+        ).group_by(key).order_by(func.sum(LLMUsage.cost_usd).desc())
+
+        result = await session.execute(query)
+        groups: List[Dict] = [{group_by: row.key, **_totals(row)} for row in result.all()]
+
+        return {
+            "group_by": group_by,
+            "date_from": date_from,
+            "date_to": date_to,
+            "total_cost_usd": round(sum(g["cost_usd"] for g in groups), 4),
+            "groups": groups,
+        }
+
+    @classmethod
+    async def breakdown(
+        cls,
+        session: AsyncSession,
+        organization_id: int,
+        vacancy_id: Optional[int] = None,
+        candidate_id: Optional[int] = None,
+    ) -> Dict:
+        """Totals of a vacancy or candidate, split by operation and model"""
+        filters = [LLMUsage.organization_id == organization_id]
+        if vacancy_id is not None:
+            filters.append(LLMUsage.vacancy_id == vacancy_id)
+        if candidate_id is not None:
+            filters.append(LLMUsage.candidate_id == candidate_id)
+
+        result = await session.execute(select(*_AGGREGATES).where(*filters))
+        totals = _totals(result.one())
+
+        split: Dict[str, List[Dict]] = {}
+        for name in ("operation", "model"):
+            key = GROUP_BY_COLUMNS[name].label("key")
+            result = await session.execute(
+                select(key, *_AGGREGATES).where(*filters).group_by(key).order_by(key)
+            )
+            split[name] = [{name: row.key, **_totals(row)} for row in result.all()]
+
+        return {**totals, "by_operation": split["operation"], "by_model": split["model"]}
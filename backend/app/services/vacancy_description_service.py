@@ -0,0 +1,191 @@
+"""AI vacancy descriptions with a per-organization semantic cache
+
+Recruiters regenerate near-identical descriptions for the same title and
+skills. A generated description is stored under a key of the normalized
+title, sorted canonical skills and a hash of the requirements; the next
+request with the same inputs reuses it without an LLM call. On a key
+miss, the embedding of the inputs is compared with the organization's
+cached entries (DESCRIPTION_CACHE_SIMILARITY), so a slightly reworded
+vacancy also hits. `fresh` skips the lookup and regenerates.
+
+Descriptions are persisted to `Vacancy.ai_generated_description`, also
+when streamed: the relay saves the full text once the stream completes.
+"""
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import AsyncIterator, List, Optional
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.core.cache import response_cache, vacancies_scope, vacancy_scope
+from app.core.config import settings
+from app.core.database import async_session
+from app.core.quotas import QuotaExceededError
+from app.core.telemetry import DESCRIPTION_CACHE_LOOKUPS
+from app.models.description_cache import DescriptionCacheEntry
+from app.models.vacancy import Vacancy
+from app.services.ai_service import AIService
+from app.services.skill_service import normalize_skills, skills_list
+
+logger = logging.getLogger(__name__)
+
+
+def _normalized(text: Optional[str]) -> str:
+    return " ".join((text or "").casefold().split())
+
+
+@dataclass
+class DescriptionLookup:
+    """Cache key of a vacancy's inputs and what the lookup found"""
+    cache_key: str
+    embedding: Optional[List[float]] = None
+    description: Optional[str] = None
+    source: str = "generated"  # exact | similar | generated
+
+
+class VacancyDescriptionService:
+    """Generate, cache and persist vacancy descriptions"""
+
+    @staticmethod
+    def cache_key(title: str, skills: List[str], requirements: Optional[str]) -> str:
+        requirements_hash = hashlib.sha256(_normalized(requirements).encode()).hexdigest()
+        payload = json.dumps([_normalized(title), sorted(normalize_skills(skills)), requirements_hash])
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    @staticmethod
+    def similarity_text(title: str, skills: List[str], requirements: Optional[str]) -> str:
+        return f"{title}\n{', '.join(sorted(normalize_skills(skills)))}\n{requirements or ''}"
+
+    @classmethod
+    async def lookup(
+        cls,
+        session: AsyncSession,
+        ai_service: AIService,
+        vacancy: Vacancy,
+        fresh: bool = False,
+    ) -> DescriptionLookup:
+        skills = skills_list(vacancy.skills)
+        probe = DescriptionLookup(cls.cache_key(vacancy.title, skills, vacancy.requirements))
+        if not settings.DESCRIPTION_CACHE_ENABLED or fresh:
+            return probe
+
+        cutoff = datetime.utcnow() - timedelta(seconds=settings.DESCRIPTION_CACHE_TTL_SECONDS)
+        result = await session.execute(
+            select(DescriptionCacheEntry)
+            .where(DescriptionCacheEntry.organization_id == vacancy.organization_id)
+            .where(DescriptionCacheEntry.cache_key == probe.cache_key)
+            .where(DescriptionCacheEntry.created_at >= cutoff)
+        )
+        entry = result.scalar_one_or_none()
+        if entry is not None:
+            probe.source = "exact"
+
+        elif settings.DESCRIPTION_CACHE_SIMILARITY is not None:
+            try:
+                probe.embedding = await ai_service.generate_embedding(
+                    cls.similarity_text(vacancy.title, skills, vacancy.requirements)
+                )
+            except QuotaExceededError:
+                raise
+            except Exception:
+                # A failing embedding only costs the similarity lookup
+                logger.warning("Description cache: embedding lookup failed", exc_info=True)
+            else:
+                distance = DescriptionCacheEntry.embedding.cosine_distance(probe.embedding).label("distance")
+                result = await session.execute(
+                    select(DescriptionCacheEntry, distance)
+                    .where(DescriptionCacheEntry.organization_id == vacancy.organization_id)
+                    .where(DescriptionCacheEntry.embedding.isnot(None))
+                    .where(DescriptionCacheEntry.created_at >= cutoff)
+                    .order_by(distance)
+                    .limit(1)
+                )
+                row = result.first()
+                if row is not None and 1 - row.distance >= settings.DESCRIPTION_CACHE_SIMILARITY:
+                    entry, probe.source = row[0], "similar"
+
+        DESCRIPTION_CACHE_LOOKUPS.labels(probe.source if entry is not None else "miss").inc()
+        if entry is not None:
+            probe.description = entry.description
+            entry.hits += 1
+            entry.last_hit_at = datetime.utcnow()
+            session.add(entry)
+        return probe
+
+    @staticmethod
+    async def save(
+        session: AsyncSession,
+        vacancy: Vacancy,
+        probe: DescriptionLookup,
+        description: str,
+    ) -> None:
+        """Persist the description on the vacancy and cache a newly generated one"""
+        vacancy.ai_generated_description = description
+        session.add(vacancy)
+
+        if probe.source == "generated" and settings.DESCRIPTION_CACHE_ENABLED:
+            now = datetime.utcnow()
+            values = {
+                "title": vacancy.title[:255],
+                "embedding": probe.embedding,
+                "description": description,
+                "hits": 0,
+                "created_at": now,
+                "last_hit_at": None,
+            }
+            await session.execute(
+                insert(DescriptionCacheEntry)
+                .values(organization_id=vacancy.organization_id, cache_key=probe.cache_key, **values)
+                .on_conflict_do_update(constraint="uq_description_cache_org_key", set_=values)
+            )
+
+        await session.commit()
+        await response_cache.invalidate(vacancies_scope(vacancy.organization_id), vacancy_scope(vacancy.id))
+
+    @classmethod
+    async def generate(
+        cls,
+        session: AsyncSession,
+        ai_service: AIService,
+        vacancy: Vacancy,
+        fresh: bool = False,
+    ) -> DescriptionLookup:
+        """Cached or newly generated description, persisted on the vacancy"""
+        probe = await cls.lookup(session, ai_service, vacancy, fresh)
+        description = probe.description
+        if description is None:
+            description = await ai_service.generate_vacancy_description(
+                title=vacancy.title,
+                requirements=vacancy.requirements,
+                skills=skills_list(vacancy.skills),
+            )
+        await cls.save(session, vacancy, probe, description)
+        probe.description = description
+        return probe
+
+    @classmethod
+    async def relay(
+        cls,
+        vacancy_id: int,
+        probe: DescriptionLookup,
+        chunks: AsyncIterator[str],
+    ) -> AsyncIterator[str]:
+        """Forward streamed text; save it once the stream completes
+
+        Runs after the endpoint has returned, so it saves in its own session.
+        An interrupted stream is not saved.
+        """
+        parts = []
+        async for chunk in chunks:
+            parts.append(chunk)
+            yield chunk
+
+        async with async_session() as session:
+            vacancy = await session.get(Vacancy, vacancy_id)
+            if vacancy is not None:
+                await cls.save(session, vacancy, probe, "".join(parts))
@@ -0,0 +1,30 @@
+"""Background tasks for recruiting analytics"""
+from typing import List, Optional
+from sqlmodel import select
+
+from app.core.database import async_session
+from app.models.vacancy import Vacancy
+from app.services.analytics_service import AnalyticsService
+from app.services.stage_service import StageService
+
+
+async def rebuild_analytics_task(vacancy_ids: Optional[List[int]] = None) -> int:
+    """Recompute stage intervals and analytics aggregates from history
+
+    Runs for all vacancies by default. Used to backfill and after bulk
+    imports, which write stage history without going through the move
+    endpoints.
+    """
+    if vacancy_ids is None:
+        async with async_session() as session:
+            result = await session.execute(select(Vacancy.id).order_by(Vacancy.id))
+            vacancy_ids = list(result.scalars().all())
+
+    for vacancy_id in vacancy_ids:
+        # One transaction per vacancy keeps locks short on large histories
+        async with async_session() as session:
+            await StageService.rebuild_intervals(session, vacancy_id)
+            await AnalyticsService.rebuild(session, vacancy_id)
+            await session.commit()
+
+    return len(vacancy_ids)
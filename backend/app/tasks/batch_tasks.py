@@ -0,0 +1,72 @@
+"""Offline batch scoring
+
+Submit overnight re-scoring of all active vacancies, then poll until the
+batches are applied. Schedule both (cron, RQ scheduler) from the backend
+directory:
+
+    python -m app.tasks.batch_tasks submit
+    python -m app.tasks.batch_tasks poll
+"""
+import asyncio
+import json
+import logging
+import sys
+from typing import Dict
+
+from sqlmodel import select
+
+from app.core.database import async_session
+from app.models.scoring_batch import ScoringBatch, ScoringBatchStatus
+from app.models.vacancy import Vacancy, VacancyStatus
+from app.services.batch_scoring_service import BatchScoringService
+from app.services.usage_service import BudgetExceededError
+
+logger = logging.getLogger(__name__)
+
+
+async def submit_rescoring_task(operation: str = "score") -> Dict[str, int]:
+    """One batch per active vacancy that has no batch in flight"""
+    submitted = skipped = 0
+    async with async_session() as session:
+        in_flight = select(ScoringBatch.vacancy_id).where(
+            ScoringBatch.status == ScoringBatchStatus.SUBMITTED
+        )
+        result = await session.execute(
+            select(Vacancy)
+            .where(Vacancy.status == VacancyStatus.ACTIVE)
+            .where(Vacancy.id.not_in(in_flight))
+        )
+        for vacancy in result.scalars().all():
+            try:
+                await BatchScoringService.submit(session, vacancy, operation)
+                submitted += 1
+            except (ValueError, BudgetExceededError) as e:
+                logger.info("Vacancy %s not submitted: %s", vacancy.id, e)
+                skipped += 1
+    
+    return {"submitted": submitted, "skipped": skipped}
+
+
+async def poll_scoring_batches_task() -> Dict[str, int]:
+    """Poll submitted batches and apply finished ones"""
+    counts = {status.value: 0 for status in ScoringBatchStatus}
+    async with async_session() as session:
+        result = await session.execute(
+            select(ScoringBatch).where(ScoringBatch.status == ScoringBatchStatus.SUBMITTED)
+        )
+        for batch in result.scalars().all():
+            try:
+                batch = await BatchScoringService.poll(session, batch)
+            except Exception:
+                logger.exception("Polling scoring batch %s failed", batch.id)
+                await session.rollback()
+                continue
+            counts[batch.status.value] += 1
+    
+    return counts
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "poll"
+    task = submit_rescoring_task() if command == "submit" else poll_scoring_batches_task()
+    print(json.dumps(asyncio.run(task)))
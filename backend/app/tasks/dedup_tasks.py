@@ -0,0 +1,39 @@
+"""Background tasks for candidate deduplication"""
+from sqlmodel import select
+
+from app.core.database import async_session
+from app.models.candidate import Candidate
+from app.services.dedup_service import DedupService
+
+
+async def rebuild_duplicates_task(batch_size: int = 500) -> int:
+    """Index blocking keys and record suggestions for all candidates
+
+    Candidates are processed in id order, so every pair is compared once
+    the later of the two is checked; block lookups are index-bounded,
+    keeping the full pass near-linear in the number of candidates.
+    """
+    last_id = 0
+    checked = 0
+
+    while True:
+        async with async_session() as session:
+            result = await session.execute(
+                select(Candidate)
+                .where(Candidate.id > last_id)
+                .order_by(Candidate.id)
+                .limit(batch_size)
+            )
+            candidates = result.scalars().all()
+            if not candidates:
+                break
+
+            for candidate in candidates:
+                await DedupService.check_candidate(session, candidate)
+
+            await session.commit()
+
+        last_id = candidates[-1].id
+        checked += len(candidates)
+
+    return checked
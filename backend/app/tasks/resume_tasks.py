@@ -1,19 +1,147 @@
-"""Background tasks for resume processing"""
+"""Background tasks for resume processing
+
+Resumes whose AI stages were deferred during a provider outage are
+replayed by a scheduled run (cron, RQ scheduler) from the backend
+directory:
+
+    python -m app.tasks.resume_tasks
+"""
 import asyncio
+import json
+from collections import defaultdict
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
 from sqlmodel import select
 from sqlalchemy.ext.asyncio import AsyncSession
-import json
 
+from app.core.cache import response_cache, vacancy_scope
+from app.core.config import settings
 from app.core.database import async_session
-from app.models.candidate import Candidate, Resume
+from app.core.task_queue import Lane, task_queue
+from app.core.quotas import tenant_quotas
+from app.models.candidate import Candidate
+from app.models.resume import FINAL_RESUME_STATUSES, Resume, ResumeStatus
 from app.models.vacancy import Vacancy
 from app.services.storage_service import StorageService
 from app.services.resume_parser import ResumeParser
 from app.services.ai_service import AIService
+from app.services.skill_service import SkillService
+from app.services.dedup_service import DedupService
+from app.services.screening_service import ScreeningService
+from app.services.processing_status import processing_status
+from app.services.circuit_breaker import CircuitBreaker, chat_circuit, embedding_circuit
+from app.services.llm_errors import LLMTransientError, is_retryable, with_retries
+
+T = TypeVar("T")
+
+
+async def resume_organization_id(resume_id: int) -> Optional[int]:
+    """Organization owning the resume, None if the resume is gone"""
+    async with async_session() as session:
+        result = await session.execute(
+            select(Candidate.organization_id)
+            .join(Resume, Resume.candidate_id == Candidate.id)
+            .where(Resume.id == resume_id)
+        )
+        return result.scalar_one_or_none()
+
+
+async def resume_status(resume_id: int) -> Optional[ResumeStatus]:
+    """Stored status of the resume, None if the resume is gone"""
+    async with async_session() as session:
+        result = await session.execute(select(Resume.status).where(Resume.id == resume_id))
+        return result.scalar_one_or_none()
 
 
-async def process_resume_task(resume_id: int):
-    """Process resume: parse, extract data, calculate match score"""
+async def fail_unfinished_resumes(resume_ids: List[int], error: str) -> None:
+    """Mark resumes not yet in a final status as failed, e.g. when their queued job is given up"""
+    async with async_session() as session:
+        result = await session.execute(
+            select(Resume, Candidate.organization_id)
+            .join(Candidate, Candidate.id == Resume.candidate_id)
+            .where(Resume.id.in_(resume_ids))
+            .where(Resume.status.notin_(FINAL_RESUME_STATUSES))
+        )
+        for resume, organization_id in result.all():
+            resume.error_message = error
+            await _set_status(session, organization_id, resume, ResumeStatus.ERROR)
+
+
+async def process_resume_task(resume_id: int) -> Optional[ResumeStatus]:
+    """Process resume within the organization's task concurrency quota
+    
+    Transient LLM failures are retried with backoff, outside the slot;
+    an extraction stored by a failed attempt is reused by the next one.
+    Invalid output and refused requests fail the resume at once. While
+    the provider's circuit is open, or once retries run out, the AI
+    stages are deferred instead (see _process_resume).
+    
+    Returns the final resume status, None if the resume is gone.
+    """
+    organization_id = await resume_organization_id(resume_id)
+    if organization_id is None:
+        return None
+    
+    attempts = 0
+    
+    async def attempt():
+        nonlocal attempts
+        attempts += 1
+        async with tenant_quotas.task_slot(organization_id):
+            return await _process_resume(
+                resume_id, organization_id, last_attempt=attempts >= settings.LLM_TASK_MAX_ATTEMPTS
+            )
+    
+    return await with_retries(attempt, f"Processing resume {resume_id}")
+
+
+async def _unless_degraded(
+    circuit: CircuitBreaker,
+    call: Callable[[], Awaitable[T]],
+    last_attempt: bool,
+) -> Optional[T]:
+    """Result of an AI stage, None to defer it while the provider is failing
+    
+    A transient failure is raised for a retry while the circuit is closed
+    and attempts remain.
+    """
+    if not circuit.available:
+        return None
+    try:
+        return await call()
+    except LLMTransientError:
+        if circuit.available and not last_attempt:
+            raise
+        return None
+
+
+async def _set_status(
+    session: AsyncSession,
+    organization_id: int,
+    resume: Resume,
+    status: ResumeStatus,
+    candidate: Optional[Candidate] = None,
+) -> None:
+    """Commit a stage transition and announce it to status streams"""
+    resume.status = status
+    resume.updated_at = datetime.utcnow()
+    await session.commit()
+    await processing_status.publish(organization_id, resume, candidate)
+
+
+async def _process_resume(
+    resume_id: int,
+    organization_id: int,
+    last_attempt: bool = True,
+) -> Optional[ResumeStatus]:
+    """Process resume: parse, extract data, calculate match score
+    
+    Only the missing stages run, so a replay does no work twice. In
+    degraded mode (AI provider unavailable) the resume is still parsed and
+    stored, the candidate gets a deterministic skill-overlap pre-score,
+    and the AI stages are marked for replay_deferred_resumes_task.
+    Each stage transition is committed and published for status streams.
+    """
     async with async_session() as session:
         # Get resume
         result = await session.execute(
@@ -22,25 +150,21 @@ async def process_resume_task(resume_id: int):
         resume = result.scalar_one_or_none()
         
         if not resume:
-            return
+            return None
         
         try:
-            # Update status
-            resume.parse_status = "processing"
-            await session.commit()
+            # Parse resume, unless an earlier attempt already did
+            if resume.raw_text is None:
+                await _set_status(session, organization_id, resume, ResumeStatus.PARSING)
+                storage_service = StorageService()
+                file_content = await storage_service.download_resume(resume.file_path)
+                
+                parser = ResumeParser()
+                parsed_data = await parser.parse_resume(file_content)
+                resume.raw_text = parsed_data["raw_text"]
             
-            # Download file from storage
-            storage_service = StorageService()
-            file_content = await storage_service.download_resume(resume.file_path)
-            
-            # Parse resume
-            parser = ResumeParser()
-            parsed_data = await parser.parse_resume(file_content)
-            resume.raw_text = parsed_data["raw_text"]
-            
-            # Extract structured data with AI
-            ai_service = AIService()
-            structured_data = await ai_service.extract_resume_data(parsed_data["raw_text"])
+            # Stored with the status, so retries and replays skip parsing
+            await _set_status(session, organization_id, resume, ResumeStatus.SCREENING)
             
             # Get candidate and vacancy
             candidate_result = await session.execute(
@@ -53,40 +177,176 @@ async def process_resume_task(resume_id: int):
             )
             vacancy = vacancy_result.scalar_one()
             
-            # Update candidate with structured data
-            candidate.full_name = structured_data.get("full_name", "Unknown")
-            candidate.email = structured_data.get("email")
-            candidate.phone = structured_data.get("phone")
-            candidate.location = structured_data.get("location")
-            candidate.skills = json.dumps(structured_data.get("skills", []))
-            candidate.experience_years = structured_data.get("experience_years")
-            candidate.education = json.dumps(structured_data.get("education", []))
-            candidate.work_experience = json.dumps(structured_data.get("work_experience", []))
-            
-            # Calculate match score
-            vacancy_skills = json.loads(vacancy.skills) if vacancy.skills else []
-            match_result = await ai_service.calculate_match_score(
-                resume_text=parsed_data["raw_text"],
-                vacancy_requirements=vacancy.requirements or "",
-                vacancy_skills=vacancy_skills,
+            # Extract and score with AI, billed to the vacancy and uploader
+            ai_service = AIService(
+                organization_id=organization_id,
+                wait_for_quota=True,
+                vacancy_id=vacancy.id,
+                candidate_id=candidate.id,
+                user_id=candidate.uploaded_by,
             )
+            deferred = False
             
-            candidate.match_score = match_result.get("match_score", 0)
-            candidate.ai_summary = match_result.get("summary")
-            candidate.ai_strengths = json.dumps(match_result.get("strengths", []))
-            candidate.ai_weaknesses = json.dumps(match_result.get("weaknesses", []))
+            if candidate.match_score is None or candidate.match_score_preliminary:
+                screening = await _unless_degraded(
+                    chat_circuit,
+                    lambda: ScreeningService.screen_resume(ai_service, resume, vacancy),
+                    last_attempt,
+                )
+                if screening is None:
+                    deferred = True
+                    ScreeningService.prescreen(candidate, resume.raw_text, vacancy)
+                else:
+                    # Update candidate with structured data and match analysis
+                    structured_data, match_result = screening
+                    ScreeningService.apply_profile(candidate, structured_data)
+                    ScreeningService.apply_match(candidate, match_result)
+                await SkillService.index_candidate(session, candidate.id, candidate.skills)
             
             # Generate embedding
-            embedding = await ai_service.generate_embedding(parsed_data["raw_text"])
-            candidate.embedding = json.dumps(embedding)
+            if resume.embedding is None:
+                embedding = await _unless_degraded(
+                    embedding_circuit,
+                    lambda: ai_service.generate_embedding(resume.raw_text),
+                    last_attempt,
+                )
+                if embedding is None:
+                    deferred = True
+                resume.embedding = embedding
+            
+            # Flag possible duplicates of this person incrementally, once
+            # the extracted contacts are known
+            if not candidate.match_score_preliminary:
+                await DedupService.check_candidate(session, candidate)
             
             # Update resume status
-            resume.parse_status = "completed"
+            if deferred:
+                resume.llm_deferred_at = resume.llm_deferred_at or datetime.utcnow()
+            else:
+                resume.llm_deferred_at = None
+                resume.error_message = None
             
-            await session.commit()
+            status = ResumeStatus.DEFERRED if deferred else ResumeStatus.PARSED
+            await _set_status(session, organization_id, resume, status, candidate)
+            await response_cache.invalidate(vacancy_scope(candidate.vacancy_id))
+            return status
             
         except Exception as e:
-            resume.parse_status = "failed"
             resume.error_message = str(e)
-            await session.commit()
+            if is_retryable(e) and not last_attempt:
+                # Retried shortly: keep the stage, status streams stay open
+                await session.commit()
+            else:
+                await _set_status(session, organization_id, resume, ResumeStatus.ERROR)
             raise
+
+
+async def replay_deferred_resumes_task(limit: Optional[int] = None) -> Dict[str, int]:
+    """Run the AI stages deferred during a provider outage, oldest first
+    
+    Queued in the rescoring lane when the worker queue is available (they
+    replace preliminary scores); processed here otherwise, stopping early
+    while the circuit is open again - the rest waits for the next run.
+    """
+    async with async_session() as session:
+        result = await session.execute(
+            select(Resume.id)
+            .where(Resume.llm_deferred_at.isnot(None))
+            .order_by(Resume.llm_deferred_at)
+            .limit(limit or settings.LLM_REPLAY_BATCH_SIZE)
+        )
+        resume_ids = result.scalars().all()
+    
+    if not (chat_circuit.available and embedding_circuit.available):
+        return {"queued": 0, "remaining": len(resume_ids)}
+    queued = await task_queue.enqueue("process_resume", resume_ids, Lane.RESCORING)
+    if queued is not None:
+        return {"queued": queued}
+    
+    counts = {status.value: 0 for status in (ResumeStatus.PARSED, ResumeStatus.DEFERRED, ResumeStatus.ERROR)}
+    for resume_id in resume_ids:
+        if not (chat_circuit.available and embedding_circuit.available):
+            break
+        try:
+            status = await process_resume_task(resume_id)
+        except Exception:
+            status = ResumeStatus.ERROR
+        if status is not None:
+            counts[status.value] += 1
+    counts["remaining"] = len(resume_ids) - sum(counts.values())
+    return counts
+
+
+async def embed_resume_task(resume_id: int):
+    """Generate the embedding of a resume whose text is already known"""
+    organization_id = await resume_organization_id(resume_id)
+    if organization_id is None:
+        return
+    
+    async with tenant_quotas.task_slot(organization_id), async_session() as session:
+        result = await session.execute(
+            select(Resume).where(Resume.id == resume_id)
+        )
+        resume = result.scalar_one_or_none()
+        
+        if not resume or not resume.raw_text or resume.embedding is not None:
+            return
+        
+        candidate = await session.get(Candidate, resume.candidate_id)
+        ai_service = AIService(
+            organization_id=organization_id,
+            wait_for_quota=True,
+            vacancy_id=candidate.vacancy_id,
+            candidate_id=candidate.id,
+        )
+        resume.embedding = await with_retries(
+            lambda: ai_service.generate_embedding(resume.raw_text),
+            f"Embedding resume {resume_id}",
+        )
+        await session.commit()
+
+
+async def embed_resumes_task(resume_ids: List[int]) -> List[int]:
+    """Embed many resumes with batched embedding calls, one vacancy at a time
+    
+    Returns IDs of resumes whose batch failed.
+    """
+    async with async_session() as session:
+        result = await session.execute(
+            select(Resume, Candidate.organization_id, Candidate.vacancy_id)
+            .join(Candidate, Candidate.id == Resume.candidate_id)
+            .where(Resume.id.in_(resume_ids))
+            .where(Resume.raw_text.isnot(None))
+            .where(Resume.embedding.is_(None))
+        )
+        groups: Dict[Tuple[int, int], List[Resume]] = defaultdict(list)
+        for resume, organization_id, vacancy_id in result.all():
+            groups[(organization_id, vacancy_id)].append(resume)
+        
+        failed: List[int] = []
+        for (organization_id, vacancy_id), resumes in groups.items():
+            # Spend is attributed to the vacancy: a call embeds several candidates
+            ai_service = AIService(
+                organization_id=organization_id,
+                wait_for_quota=True,
+                vacancy_id=vacancy_id,
+            )
+            async with tenant_quotas.task_slot(organization_id):
+                try:
+                    embeddings = await with_retries(
+                        lambda: ai_service.generate_embeddings([resume.raw_text for resume in resumes]),
+                        f"Embedding {len(resumes)} resumes of vacancy {vacancy_id}",
+                    )
+                except Exception:
+                    failed.extend(resume.id for resume in resumes)
+                    continue
+            
+            for resume, embedding in zip(resumes, embeddings):
+                resume.embedding = embedding
+            await session.commit()
+    
+    return failed
+
+
+if __name__ == "__main__":
+    print(json.dumps(asyncio.run(replay_deferred_resumes_task())))
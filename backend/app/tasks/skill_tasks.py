@@ -0,0 +1,34 @@
+"""Background tasks for the skill inverted index"""
+from sqlmodel import select
+
+from app.core.database import async_session
+from app.models.candidate import Candidate
+from app.services.skill_service import SkillService
+
+
+async def reindex_candidate_skills_task(batch_size: int = 1000) -> int:
+    """Rebuild the skill index for all candidates, in keyset-paginated batches"""
+    last_id = 0
+    indexed = 0
+
+    while True:
+        async with async_session() as session:
+            result = await session.execute(
+                select(Candidate.id, Candidate.skills)
+                .where(Candidate.id > last_id)
+                .order_by(Candidate.id)
+                .limit(batch_size)
+            )
+            rows = result.all()
+            if not rows:
+                break
+
+            for candidate_id, skills in rows:
+                await SkillService.index_candidate(session, candidate_id, skills)
+
+            await session.commit()
+
+        last_id = rows[-1][0]
+        indexed += len(rows)
+
+    return indexed
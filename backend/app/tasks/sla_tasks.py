@@ -0,0 +1,25 @@
+"""Periodic stage SLA scanning
+
+Schedule it (cron, RQ scheduler) to run from the backend directory:
+
+    python -m app.tasks.sla_tasks
+"""
+import asyncio
+import json
+from typing import Dict
+
+from app.core.config import settings
+from app.core.database import async_session
+from app.services.stage_service import StageService
+
+
+async def scan_stage_sla_task() -> Dict[str, int]:
+    """Flag candidates who stayed in a stage longer than its SLA"""
+    async with async_session() as session:
+        return await StageService.flag_sla_breaches(
+            session, batch_size=settings.SLA_SCAN_BATCH_SIZE
+        )
+
+
+if __name__ == "__main__":
+    print(json.dumps(asyncio.run(scan_stage_sla_task())))
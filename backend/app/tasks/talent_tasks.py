@@ -0,0 +1,34 @@
+"""Background tasks for talent rediscovery"""
+from sqlmodel import select
+
+from app.core.database import async_session
+from app.core.quotas import tenant_quotas
+from app.models.vacancy import Vacancy
+from app.services.talent_pool_service import TalentPoolService
+
+
+async def rediscover_talent_task(vacancy_id: int) -> int:
+    """Search historical candidates for a (new) vacancy and store suggestions"""
+    async with async_session() as session:
+        result = await session.execute(
+            select(Vacancy.organization_id).where(Vacancy.id == vacancy_id)
+        )
+        organization_id = result.scalar_one_or_none()
+    
+    if organization_id is None:
+        return 0
+    
+    # Wait for a slot before opening the session that does the work
+    async with tenant_quotas.task_slot(organization_id), async_session() as session:
+        result = await session.execute(
+            select(Vacancy).where(Vacancy.id == vacancy_id)
+        )
+        vacancy = result.scalar_one_or_none()
+        
+        if not vacancy:
+            return 0
+        
+        suggestions = await TalentPoolService.rediscover(session, vacancy)
+        await session.commit()
+        
+        return len(suggestions)
@@ -0,0 +1,188 @@
+"""Resume processing worker
+
+Serves the task queue (app/core/task_queue.py): interactive uploads
+first, then rescoring, bulk imports and backfill, fair-shared across
+organizations and vacancies within a lane. Each job runs in its
+organization's task slot, so tenant concurrency limits hold across all
+workers; a job of an organization at its limit goes back to the queue
+instead of holding a worker loop. A failed job is re-queued, and after
+TASK_QUEUE_MAX_ATTEMPTS runs its unfinished resumes are marked as
+errors. Jobs are acknowledged only once done with, so a crash at any
+point leaves them to be reclaimed. Run from the backend directory:
+
+    python -m app.tasks.worker --concurrency 8
+"""
+import argparse
+import asyncio
+import logging
+import random
+import time
+from typing import Awaitable, Callable, Dict, List
+
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.quotas import QuotaExceededError, tenant_quotas
+from app.core.task_queue import Job, Lane, task_queue
+from app.core.telemetry import TASK_QUEUE_DEPTH, TASK_QUEUE_WAIT, span
+from app.models.resume import ResumeStatus
+from app.tasks.resume_tasks import (
+    embed_resumes_task,
+    fail_unfinished_resumes,
+    process_resume_task,
+    resume_status,
+)
+
+logger = logging.getLogger(__name__)
+
+RECLAIM_INTERVAL_SECONDS = 60
+# Running jobs are touched several times per visibility timeout
+HEARTBEATS_PER_VISIBILITY = 3
+
+
+async def _process_resumes(resume_ids: List[int]) -> None:
+    for resume_id in resume_ids:
+        try:
+            await process_resume_task(resume_id)
+        except Exception:
+            # Marked as failed: done with, like a parsed one
+            if await resume_status(resume_id) != ResumeStatus.ERROR:
+                raise
+            logger.warning("Resume %s failed", resume_id, exc_info=True)
+
+
+async def _give_up_resumes(resume_ids: List[int]) -> None:
+    await fail_unfinished_resumes(
+        resume_ids, f"Processing failed {settings.TASK_QUEUE_MAX_ATTEMPTS} times"
+    )
+
+
+# Queue task name -> coroutine over the job's resume IDs
+JOB_TASKS: Dict[str, Callable[[List[int]], Awaitable]] = {
+    "process_resume": _process_resumes,
+    "embed_resumes": embed_resumes_task,
+}
+
+# Run when a job has failed every attempt; missing embeddings are simply
+# left for the next backfill
+JOB_GIVE_UP: Dict[str, Callable[[List[int]], Awaitable]] = {
+    "process_resume": _give_up_resumes,
+}
+
+
+async def _heartbeat(job: Job) -> None:
+    """Keep a running job's entry fresh so it is not re-queued as stale"""
+    interval = settings.TASK_QUEUE_VISIBILITY_SECONDS / HEARTBEATS_PER_VISIBILITY
+    while True:
+        await asyncio.sleep(interval)
+        if not await task_queue.touch(job):
+            logger.warning("Job %s was reclaimed while running", job.key)
+            return
+
+
+async def _run(job: Job) -> bool:
+    """Run the job, keeping it fresh in the running set; False if it failed"""
+    heartbeat = asyncio.create_task(_heartbeat(job))
+    try:
+        with span(f"task.{job.task}", lane=job.lane.value, resumes=len(job.resume_ids)):
+            await JOB_TASKS[job.task](job.resume_ids)
+        return True
+    except Exception:
+        logger.exception(
+            "Job %s failed (attempt %d of %d)", job.key, job.attempts + 1, settings.TASK_QUEUE_MAX_ATTEMPTS
+        )
+        return False
+    finally:
+        heartbeat.cancel()
+
+
+async def _give_up(job: Job) -> None:
+    """Fail what the job left unfinished, then drop it
+
+    If that fails too the job stays running and is reclaimed later.
+    """
+    give_up = JOB_GIVE_UP.get(job.task)
+    try:
+        if give_up is not None:
+            await give_up(job.resume_ids)
+    except Exception:
+        logger.exception("Failed to give up job %s", job.key)
+        return
+    await task_queue.ack(job)
+
+
+async def _handle(job: Job) -> bool:
+    """Run a popped job and settle it in the queue
+
+    False if its organization was at its task limit and the job went back
+    to the queue untouched.
+    """
+    try:
+        # Held for the whole job; the task's own slot request reuses it
+        async with tenant_quotas.task_slot(job.organization_id, wait=False):
+            TASK_QUEUE_WAIT.labels(job.lane.value).observe(max(0.0, time.time() - job.enqueued_at))
+            done = await _run(job)
+    except QuotaExceededError:
+        await task_queue.requeue(job)
+        return False
+    except Exception:
+        logger.exception("Job %s could not start", job.key)
+        done = False
+
+    if done:
+        await task_queue.ack(job)
+    elif job.attempts + 1 < settings.TASK_QUEUE_MAX_ATTEMPTS:
+        await task_queue.requeue(job, failed=True)
+    else:
+        await _give_up(job)
+    return True
+
+
+async def _serve() -> None:
+    """Run jobs until cancelled; one of the worker's concurrent loops"""
+    while True:
+        try:
+            popped = await task_queue.pop()
+        except RedisError:
+            logger.warning("Task queue unavailable", exc_info=True)
+            popped = None
+        if popped is not None:
+            job, depth = popped
+            TASK_QUEUE_DEPTH.labels(job.lane.value).set(depth)
+            # A busy organization's job is back in the queue; serve other tenants meanwhile
+            if await _handle(job):
+                continue
+        await asyncio.sleep(settings.TASK_QUEUE_POLL_SECONDS * random.uniform(0.5, 1.5))
+
+
+async def _maintain() -> None:
+    """Re-queue jobs of dead workers and refresh the lane depth gauges"""
+    while True:
+        try:
+            await task_queue.reclaim()
+            for lane, depth in (await task_queue.depths()).items():
+                TASK_QUEUE_DEPTH.labels(lane).set(depth)
+        except RedisError:
+            logger.warning("Task queue maintenance failed", exc_info=True)
+        await asyncio.sleep(RECLAIM_INTERVAL_SECONDS)
+
+
+async def run_worker(concurrency: int) -> None:
+    logger.info("Worker serving lanes %s with %d loops", [lane.value for lane in Lane], concurrency)
+    await asyncio.gather(_maintain(), *(_serve() for _ in range(concurrency)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve the resume processing queue")
+    parser.add_argument(
+        "--concurrency", type=int, default=settings.TASK_QUEUE_WORKER_CONCURRENCY,
+        help="Jobs run at once by this process",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_worker(args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Bandwidth vs CPU tradeoff of compressing board payloads
+
+Encodes a pipeline-board-sized candidate list with the fast JSON path,
+then compresses it with gzip and brotli at several levels and reports
+the compressed size, compression time and the estimated time to first
+usable byte (compression + transfer) over typical links. The streamed
+case compresses the same payload in export-sized chunks with a flush per
+chunk, as the middleware does for exports.
+
+Run from the backend directory (settings must be loadable from env/.env):
+
+    python -m benchmarks.compression_bench --rows 500 --repeat 10
+"""
+import argparse
+import statistics
+import time
+import zlib
+from typing import Callable, List, Optional, Tuple
+
+from app.core.compression import _Compressor, brotli
+from app.core.responses import dump_rows, dumps
+from app.models.candidate import CandidateRead
+
+from benchmarks.serialization_bench import make_candidates
+
+# Link speeds in megabits per second
+LINKS = (("3g", 1.5), ("4g", 10.0), ("office", 100.0))
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def gzip_level(level: int) -> Callable[[bytes], bytes]:
+    def compress(data: bytes) -> bytes:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        return compressor.compress(data) + compressor.flush()
+    return compress
+
+
+def brotli_quality(quality: int) -> Callable[[bytes], bytes]:
+    def compress(data: bytes) -> bytes:
+        return brotli.compress(data, quality=quality)
+    return compress
+
+
+def streamed(encoding: str, level: int) -> Callable[[bytes], bytes]:
+    def compress(data: bytes) -> bytes:
+        compressor = _Compressor(encoding, gzip_level=level, brotli_quality=level)
+        chunks = [data[i:i + STREAM_CHUNK_SIZE] for i in range(0, len(data), STREAM_CHUNK_SIZE)]
+        return b"".join(
+            compressor.compress(chunk, final=i == len(chunks) - 1) for i, chunk in enumerate(chunks)
+        )
+    return compress
+
+
+def codecs() -> List[Tuple[str, Optional[Callable[[bytes], bytes]]]]:
+    result: List[Tuple[str, Optional[Callable[[bytes], bytes]]]] = [
+        ("identity", None),
+        ("gzip-1", gzip_level(1)),
+        ("gzip-6", gzip_level(6)),
+        ("gzip-9", gzip_level(9)),
+        ("gzip-6 streamed", streamed("gzip", 6)),
+    ]
+    if brotli is not None:
+        result += [
+            ("br-1", brotli_quality(1)),
+            ("br-4", brotli_quality(4)),
+            ("br-11", brotli_quality(11)),
+            ("br-4 streamed", streamed("br", 4)),
+        ]
+    return result
+
+
+def measure(fn: Callable[[bytes], bytes], payload: bytes, repeat: int) -> Tuple[int, float]:
+    size = len(fn(payload))
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(payload)
+        timings.append(time.perf_counter() - started)
+    return size, statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    payload = dumps(dump_rows(CandidateRead, make_candidates(args.rows)))
+    print(f"payload: {args.rows} candidates, {len(payload) / 1024:.1f} KiB")
+
+    header = f"{'codec':>16} {'KiB':>8} {'ratio':>6} {'cpu ms':>7}"
+    header += "".join(f" {name + ' ms':>10}" for name, _ in LINKS)
+    print(header)
+
+    for name, fn in codecs():
+        if fn is None:
+            size, seconds = len(payload), 0.0
+        else:
+            size, seconds = measure(fn, payload, args.repeat)
+        transfer = [size * 8 / (mbps * 1e6) for _, mbps in LINKS]
+        line = f"{name:>16} {size / 1024:8.1f} {len(payload) / size:6.1f} {seconds * 1000:7.2f}"
+        line += "".join(f" {(seconds + t) * 1000:10.1f}" for t in transfer)
+        print(line)
+
+    if brotli is None:
+        print("brotli: skipped (install the `brotli` package)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""Throughput and cost of resume screening: two calls vs one combined call
+
+Screens synthetic resumes with AIService against a simulated chat backend
+(no network): latency grows with prompt and completion tokens, usage is
+reported like the OpenAI API. Compares
+
+- two-call: extract_resume_data + calculate_match_score (resume sent twice)
+- combined: extract_and_score (one call)
+
+and re-scoring the same candidates against extra vacancies, either from
+the resume text (calculate_match_score) or from the stored extraction
+(score_profile).
+
+Run from the backend directory (settings must be loadable from env/.env):
+
+    python -m benchmarks.screening_bench --resumes 50 --concurrency 8 --extra-vacancies 2
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Any, Dict, List
+
+from app.core.config import settings
+from app.services.ai_service import AIService
+from app.services.llm_backends import ChatBackend, ChatResult, TokenUsage
+from app.services.prompt_builder import count_tokens
+from app.services.usage_service import llm_cost
+
+SKILLS = ["python", "fastapi", "postgresql", "redis", "docker", "kubernetes", "react", "go", "sql", "aws"]
+
+PROFILE = {
+    "full_name": "Candidate",
+    "email": "candidate@example.com",
+    "phone": "+79991234567",
+    "location": "Moscow",
+    "skills": SKILLS[:6],
+    "experience_years": 7,
+    "education": [{"degree": "MSc", "institution": "University", "year": 2015}],
+    "work_experience": [
+        {"company": f"Company {i}", "position": "Engineer", "duration": "2 years",
+         "responsibilities": "Built and operated backend services"}
+        for i in range(3)
+    ],
+    "summary": "Backend engineer with distributed systems experience.",
+}
+MATCH = {
+    "match_score": 78,
+    "strengths": ["Python expertise", "System design"],
+    "weaknesses": ["Limited frontend experience"],
+    "summary": "Strong backend fit; frontend skills are thin.",
+}
+
+
+def make_resume(index: int, rng: random.Random) -> str:
+    jobs = "\n".join(
+        f"Company {j}\nSenior Engineer, 20{10 + j}-20{12 + j}\n"
+        + "\n".join(f"- Built {rng.choice(SKILLS)} services handling {rng.randint(1, 50)}k RPS" for _ in range(6))
+        for j in range(rng.randint(3, 8))
+    )
+    return (
+        f"Candidate {index}\ncandidate{index}@example.com | +7 999 123 45 67\n\n"
+        f"Summary\nBackend engineer, {rng.randint(2, 15)} years of experience.\n\n"
+        f"Experience\n{jobs}\n\nEducation\nMSc, University, 2015\n\n"
+        f"Skills\n{', '.join(rng.sample(SKILLS, 6))}\n"
+    )
+
+
+class SimulatedChatBackend(ChatBackend):
+    """Blocking chat API stand-in: sleeps like a real call, reports usage"""
+
+    def __init__(self, model: str, latency_base: float, per_prompt_token: float, per_output_token: float):
+        self.model = model
+        self.latency_base = latency_base
+        self.per_prompt_token = per_prompt_token
+        self.per_output_token = per_output_token
+
+    def complete(
+        self,
+        operation: str,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        json_mode: bool = False,
+    ) -> ChatResult:
+        prompt = "\n".join(message["content"] for message in messages)
+        if '"candidate"' in prompt:
+            content = json.dumps({"candidate": PROFILE, "match": MATCH})
+        elif "extract structured information" in prompt:
+            content = json.dumps(PROFILE)
+        else:
+            content = json.dumps(MATCH)
+
+        usage = TokenUsage(
+            prompt_tokens=count_tokens(prompt, model),
+            completion_tokens=count_tokens(content, model),
+        )
+        time.sleep(
+            self.latency_base
+            + usage.prompt_tokens * self.per_prompt_token
+            + usage.completion_tokens * self.per_output_token
+        )
+        return ChatResult(content, usage)
+
+
+class BenchAIService(AIService):
+    """AIService with the simulated API and an in-memory ledger"""
+
+    def __init__(self, chat_backend: SimulatedChatBackend, ledger: List[Dict]):
+        super().__init__()
+        self.chat_backend = chat_backend
+        self.ledger = ledger
+
+    async def _chat_model(self) -> str:
+        return self.model
+
+    async def _record_usage(self, operation: str, model: str, usage: Any, started: float) -> None:
+        self.ledger.append({
+            "operation": operation,
+            "prompt_tokens": usage.prompt_tokens,
+            "completion_tokens": usage.completion_tokens,
+            "cost_usd": llm_cost(model, usage.prompt_tokens, usage.completion_tokens),
+        })
+
+
+async def run(mode: str, resumes: List[str], args: argparse.Namespace) -> Dict:
+    chat_backend = SimulatedChatBackend(
+        settings.OPENAI_MODEL, args.latency_base, args.per_prompt_token, args.per_output_token
+    )
+    ledger: List[Dict] = []
+    service = BenchAIService(chat_backend, ledger)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    requirements = "Backend engineer: Python, PostgreSQL, distributed systems, 5+ years."
+
+    async def screen(text: str) -> None:
+        async with semaphore:
+            if mode == "combined":
+                profile, _ = await service.extract_and_score(text, requirements, SKILLS[:5])
+            else:
+                profile = await service.extract_resume_data(text)
+                await service.calculate_match_score(text, requirements, SKILLS[:5])
+            for _ in range(args.extra_vacancies):
+                if mode == "combined":
+                    await service.score_profile(profile, requirements, SKILLS[3:8])
+                else:
+                    await service.calculate_match_score(text, requirements, SKILLS[3:8])
+
+    started = time.perf_counter()
+    await asyncio.gather(*(screen(text) for text in resumes))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "mode": mode,
+        "calls": len(ledger),
+        "prompt_tokens": sum(entry["prompt_tokens"] for entry in ledger),
+        "completion_tokens": sum(entry["completion_tokens"] for entry in ledger),
+        "cost_usd": sum(entry["cost_usd"] for entry in ledger),
+        "seconds": elapsed,
+        "resumes_per_minute": len(resumes) / elapsed * 60,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resumes", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--extra-vacancies", type=int, default=2, help="re-scores per candidate")
+    parser.add_argument("--latency-base", type=float, default=0.3, help="seconds per call")
+    parser.add_argument("--per-prompt-token", type=float, default=0.00002)
+    parser.add_argument("--per-output-token", type=float, default=0.004)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    resumes = [make_resume(i, rng) for i in range(args.resumes)]
+    print(
+        f"{args.resumes} resumes, {args.extra_vacancies} extra vacancies each, "
+        f"concurrency {args.concurrency}, model {settings.OPENAI_MODEL}"
+    )
+
+    for mode in ("two-call", "combined"):
+        r = asyncio.run(run(mode, resumes, args))
+        print(
+            f"{r['mode']:>9}: {r['calls']:5d} calls  {r['prompt_tokens']:8d} prompt  "
+            f"{r['completion_tokens']:7d} completion tokens  ${r['cost_usd']:.4f}  "
+            f"{r['seconds']:6.1f}s  {r['resumes_per_minute']:7.1f} resumes/min"
+        )
+
+
+if __name__ == "__main__":
+    main()
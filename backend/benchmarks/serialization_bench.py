@@ -0,0 +1,100 @@
+"""Per-row cost of serializing candidate list responses
+
+Compares FastAPI's default path for `response_model=List[CandidateRead]`
+(validate ORM rows from attributes, dump to JSON-compatible Python,
+encode with the stdlib json module) with the fast path used by list
+endpoints (copy read-model fields off the rows, encode with orjson).
+
+Run from the backend directory (settings must be loadable from env/.env):
+
+    python -m benchmarks.serialization_bench --rows 500 --repeat 20
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List
+
+from pydantic import TypeAdapter
+
+from app.core.responses import dump_rows, dumps
+from app.models.candidate import Candidate, CandidateRead, CandidateStatus
+
+SKILLS = ["python", "fastapi", "postgresql", "redis", "docker", "kubernetes", "react", "go", "sql", "aws"]
+
+
+def make_candidates(count: int) -> List[Candidate]:
+    """Board-sized candidates with realistic list/text payloads"""
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    return [
+        Candidate(
+            id=i,
+            full_name=f"Candidate {i}",
+            email=f"candidate{i}@example.com",
+            phone="+79991234567",
+            vacancy_id=1,
+            source="upload",
+            status=rng.choice(list(CandidateStatus)),
+            skills=rng.sample(SKILLS, 6),
+            experience_years=rng.randint(0, 15),
+            education=[{"institution": "University", "degree": "MSc", "year": 2015}],
+            work_experience=[
+                {"company": f"Company {j}", "position": "Engineer", "description": "Built services " * 10}
+                for j in range(3)
+            ],
+            match_score=rng.uniform(0, 100),
+            ai_summary="Strong backend engineer with distributed systems experience. " * 4,
+            strengths=["Python expertise", "System design", "Mentoring"],
+            weaknesses=["Limited frontend experience"],
+            created_at=now - timedelta(days=i),
+            updated_at=now,
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def default_path(rows: List[Candidate]) -> bytes:
+    adapter = TypeAdapter(List[CandidateRead])
+    validated = adapter.validate_python(rows, from_attributes=True)
+    content = adapter.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def fast_path(rows: List[Candidate]) -> bytes:
+    return dumps(dump_rows(CandidateRead, rows))
+
+
+def measure(fn: Callable[[List[Candidate]], bytes], rows: List[Candidate], repeat: int) -> List[float]:
+    fn(rows)  # warm up caches (TypeAdapter schema, field tuples)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(rows)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = make_candidates(args.rows)
+    assert json.loads(default_path(rows)) == json.loads(fast_path(rows)), "paths disagree"
+
+    results = {}
+    for name, fn in (("default", default_path), ("fast", fast_path)):
+        timings = measure(fn, rows, args.repeat)
+        per_row_us = statistics.median(timings) / len(rows) * 1e6
+        results[name] = per_row_us
+        print(f"{name:>8}: {per_row_us:7.2f} us/row  ({statistics.median(timings) * 1000:.2f} ms per {len(rows)} rows)")
+
+    print(f"speedup: {results['default'] / results['fast']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Shared fixtures
+
+Database tests run against a disposable PostgreSQL database with the
+pgvector extension available; its tables are dropped and recreated for
+every test:
+
+    TEST_DATABASE_URL=postgresql+asyncpg://postgres@localhost/hr_test pytest
+
+Without TEST_DATABASE_URL they are skipped. AI calls go to the
+deterministic stub backends, and the Redis-backed queue, quotas and
+response cache are off.
+"""
+import os
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+# Settings are read on import, so before any app module is imported
+os.environ.update({
+    "DATABASE_URL": TEST_DATABASE_URL or "postgresql+asyncpg://localhost/unused",
+    "LLM_BACKEND": "stub",
+    "EMBEDDING_BACKEND": "stub",
+    "TASK_QUEUE_ENABLED": "false",
+    "TENANT_QUOTAS_ENABLED": "false",
+    "RESPONSE_CACHE_ENABLED": "false",
+})
+for name, value in {
+    "SECRET_KEY": "test",
+    "REDIS_URL": "redis://localhost:6379/15",
+    "S3_ENDPOINT_URL": "http://localhost:9000",
+    "S3_ACCESS_KEY": "test",
+    "S3_SECRET_KEY": "test",
+    "OPENAI_API_KEY": "test",
+}.items():
+    os.environ.setdefault(name, value)
+
+from typing import Dict, List  # noqa: E402
+
+import pytest  # noqa: E402
+import pytest_asyncio  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+from sqlmodel import SQLModel  # noqa: E402
+
+import app.models  # noqa: E402,F401  (registers the tables)
+import app.models.pipeline  # noqa: E402,F401
+from app.core.database import async_session, engine  # noqa: E402
+from app.models.organization import Organization  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.models.vacancy import Vacancy, VacancyStatus  # noqa: E402
+from app.services.processing_status import processing_status, status_item  # noqa: E402
+
+
+@pytest_asyncio.fixture
+async def db():
+    """Fresh schema; yields the application's session factory"""
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        await conn.run_sync(SQLModel.metadata.drop_all)
+        await conn.run_sync(SQLModel.metadata.create_all)
+    yield async_session
+    # Pooled connections belong to this test's event loop
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def recruiter(db) -> User:
+    async with db() as session:
+        organization = Organization(name="Acme")
+        session.add(organization)
+        await session.flush()
+
+        user = User(
+            email="recruiter@acme.test",
+            hashed_password="-",
+            full_name="Recruiter",
+            organization_id=organization.id,
+        )
+        session.add(user)
+        await session.commit()
+        return user
+
+
+@pytest_asyncio.fixture
+async def vacancy(db, recruiter: User) -> Vacancy:
+    async with db() as session:
+        vacancy = Vacancy(
+            organization_id=recruiter.organization_id,
+            title="Backend developer",
+            requirements="Python services on PostgreSQL",
+            skills=["python", "postgresql", "kubernetes"],
+            status=VacancyStatus.ACTIVE,
+            created_by=recruiter.id,
+        )
+        session.add(vacancy)
+        await session.commit()
+        return vacancy
+
+
+@pytest.fixture
+def published(monkeypatch) -> List[Dict]:
+    """Status items processing publishes, captured instead of sent to Redis"""
+    items: List[Dict] = []
+
+    async def publish(organization_id, resume, candidate=None):
+        items.append(status_item(resume, candidate))
+
+    monkeypatch.setattr(processing_status, "publish", publish)
+    return items
@@ -0,0 +1,35 @@
+import pytest
+
+from app.core import compression
+from app.core.compression import choose_encoding
+
+
+@pytest.fixture
+def with_brotli(monkeypatch):
+    # Only availability matters for negotiation
+    monkeypatch.setattr(compression, "brotli", object())
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip;q=1, br;q=0.1", "gzip"),
+    ("gzip, br", "br"),
+    ("br;q=0.5, gzip;q=0.5", "br"),
+    ("*", "br"),
+    ("br;q=0, *", "gzip"),
+    ("gzip;q=0, *", "br"),
+    ("br;q=0, gzip;q=0, *", None),
+    ("*;q=0.5, gzip;q=0.8", "gzip"),
+    ("identity", None),
+    (None, None),
+])
+def test_choose_encoding_follows_q_values(with_brotli, header, expected):
+    assert choose_encoding(header) == expected
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("br, gzip;q=0.5", "gzip"),
+    ("gzip;q=0, *", None),
+    ("br", None),
+])
+def test_choose_encoding_without_brotli(with_brotli, header, expected):
+    assert choose_encoding(header, brotli_enabled=False) == expected
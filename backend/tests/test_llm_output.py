@@ -0,0 +1,130 @@
+"""Structured LLM output: schema validation and the repair loop"""
+import json
+from typing import List
+
+import pytest
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.models.resume import Resume
+from app.services.ai_service import AIService
+from app.services.llm_backends import ChatResult, StubChatBackend, TokenUsage
+from app.services.llm_errors import LLMOutputError
+from app.services.llm_schemas import MatchResult, ResumeExtraction, coerce_output, invalid_fields
+from app.services.screening_service import ScreeningService
+from app.services.usage_service import UsageService
+
+RESUME_TEXT = "Ivan Petrov\nBackend engineer\nivan.petrov@example.com\n7 years of experience with Python and Docker"
+
+PROFILE = {"full_name": "Ivan Petrov", "email": "ivan.petrov@example.com", "skills": ["python", "docker"]}
+MATCH = {"match_score": 70, "strengths": ["Has python"], "weaknesses": [], "summary": "Good fit."}
+
+
+class ScriptedChatBackend(StubChatBackend):
+    """Gives the scripted answers in order (the last one repeats) and keeps the requests"""
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.requests: List[str] = []
+
+    def complete(self, operation, model, messages, temperature, json_mode=False):
+        self.requests.append(messages[-1]["content"])
+        answer = self.answers.pop(0) if len(self.answers) > 1 else self.answers[0]
+        content = answer if isinstance(answer, str) else json.dumps(answer)
+        return ChatResult(content, TokenUsage(prompt_tokens=1, completion_tokens=1), model="scripted")
+
+
+@pytest.fixture
+def no_ledger(monkeypatch):
+    async def record(*args, **kwargs):
+        return None
+
+    monkeypatch.setattr(UsageService, "record", record)
+
+
+def scripted(*answers) -> AIService:
+    ai_service = AIService()
+    ai_service.chat_backend = ScriptedChatBackend(*answers)
+    return ai_service
+
+
+def test_invalid_fields_reports_top_level_fields():
+    with pytest.raises(ValidationError) as error:
+        MatchResult.model_validate({"match_score": "high", "strengths": 5, "summary": "ok"})
+    assert set(invalid_fields(error.value)) == {"match_score", "strengths"}
+
+
+def test_coerce_output_defaults_invalid_optional_fields():
+    data = {"full_name": "Ivan Petrov", "email": "not an address", "experience_years": -3}
+    assert coerce_output(ResumeExtraction, data) == ResumeExtraction(full_name="Ivan Petrov").model_dump()
+
+    # A required field cannot be defaulted
+    assert coerce_output(MatchResult, {"match_score": 150, "summary": "ok"}) is None
+    assert coerce_output(MatchResult, None) is None
+
+
+@pytest.mark.asyncio
+async def test_partial_repair_is_merged_into_the_answer(no_ledger):
+    ai_service = scripted({**MATCH, "match_score": "high"}, {"match_score": 70})
+
+    result = await ai_service.calculate_match_score(RESUME_TEXT, "Python services", ["python"])
+
+    assert result == MATCH
+    # Only the invalid field is asked for again
+    repair = ai_service.chat_backend.requests[1]
+    assert "- match_score:" in repair and "- strengths:" not in repair
+
+
+@pytest.mark.asyncio
+async def test_required_field_still_invalid_raises(no_ledger):
+    ai_service = scripted({**MATCH, "match_score": "high"})
+
+    with pytest.raises(LLMOutputError):
+        await ai_service.calculate_match_score(RESUME_TEXT, "Python services", ["python"])
+    assert len(ai_service.chat_backend.requests) == 1 + settings.LLM_REPAIR_ATTEMPTS
+
+
+@pytest.mark.asyncio
+async def test_missing_half_is_repaired_alone(no_ledger):
+    # The model answers the repair with the half wrapped under its key
+    ai_service = scripted({"match": MATCH}, {"candidate": PROFILE})
+
+    profile, match = await ai_service.extract_and_score(RESUME_TEXT, "Python services", ["python"])
+
+    assert profile["full_name"] == "Ivan Petrov" and profile["skills"] == ["python", "docker"]
+    assert match == MATCH
+    assert 'Respond with the "candidate" object only' in ai_service.chat_backend.requests[1]
+
+
+@pytest.mark.asyncio
+async def test_missing_half_is_never_taken_from_the_whole_answer(no_ledger):
+    # The repair repeats the whole answer, still without the candidate
+    ai_service = scripted({"match": MATCH})
+
+    with pytest.raises(LLMOutputError):
+        await ai_service.extract_and_score(RESUME_TEXT, "Python services", ["python"])
+
+
+@pytest.mark.asyncio
+async def test_answer_that_is_not_json_is_repaired_once_for_both_halves(no_ledger):
+    ai_service = scripted("Sure! Here is the analysis.", {"candidate": PROFILE, "match": MATCH})
+
+    profile, match = await ai_service.extract_and_score(RESUME_TEXT, "Python services", ["python"])
+
+    assert profile["full_name"] == "Ivan Petrov"
+    assert match == MATCH
+    assert len(ai_service.chat_backend.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_screening_stores_the_repaired_extraction(db, recruiter, vacancy, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_COMBINED_SCREENING", True)
+    ai_service = AIService(organization_id=recruiter.organization_id, vacancy_id=vacancy.id)
+    ai_service.chat_backend = ScriptedChatBackend({"match": MATCH}, {"candidate": PROFILE})
+    resume = Resume(candidate_id=0, filename="cv.pdf", file_path="-", mime_type="application/pdf", file_size=1)
+    resume.raw_text = RESUME_TEXT
+
+    await ScreeningService.screen_resume(ai_service, resume, vacancy)
+
+    assert resume.extracted_data["full_name"] == "Ivan Petrov"
+    assert resume.extracted_data["skills"] == ["python", "docker"]
@@ -0,0 +1,200 @@
+"""process_resume_task end to end on the stub AI backends, without network"""
+import io
+import json
+from typing import Dict
+
+import docx
+import pytest
+from fastapi import BackgroundTasks, UploadFile
+from sqlmodel import select
+from starlette.datastructures import Headers
+
+from app.api.v1.endpoints import candidates as candidates_endpoints
+from app.models.candidate import Candidate
+from app.models.llm_usage import LLMUsage
+from app.models.resume import Resume, ResumeStatus
+from app.models.skill import CandidateSkill
+from app.services.processing_status import processing_status
+from app.tasks import resume_tasks
+from app.tasks.resume_tasks import process_resume_task
+
+DOCX_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+RESUME_LINES = [
+    "Ivan Petrov",
+    "Backend engineer building payment services",
+    "ivan.petrov@example.com",
+    "+7 999 123-45-67",
+    "7 years of experience with Python, PostgreSQL and Docker",
+]
+
+
+def resume_docx(lines) -> bytes:
+    document = docx.Document()
+    for line in lines:
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+class FakeStorage:
+    """In-memory stand-in for the S3 StorageService"""
+
+    files: Dict[str, bytes] = {}
+
+    async def upload_resume(self, file_content: bytes, file_name: str, candidate_id: int) -> str:
+        file_path = f"resumes/{candidate_id}/{file_name}"
+        self.files[file_path] = file_content
+        return file_path
+
+    async def download_resume(self, file_path: str) -> bytes:
+        return self.files[file_path]
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    FakeStorage.files = {}
+    monkeypatch.setattr(resume_tasks, "StorageService", FakeStorage)
+    monkeypatch.setattr(candidates_endpoints, "StorageService", FakeStorage)
+    return FakeStorage.files
+
+
+async def upload(db, vacancy, user, storage, content: bytes):
+    """Candidate and resume as created by the upload endpoint"""
+    async with db() as session:
+        candidate = Candidate(
+            full_name="Parsing...",
+            organization_id=vacancy.organization_id,
+            vacancy_id=vacancy.id,
+            uploaded_by=user.id,
+        )
+        session.add(candidate)
+        await session.flush()
+
+        file_path = f"resumes/{candidate.id}/resume.docx"
+        storage[file_path] = content
+        resume = Resume(
+            candidate_id=candidate.id,
+            filename="resume.docx",
+            file_path=file_path,
+            mime_type=DOCX_TYPE,
+            file_size=len(content),
+            upload_batch="batch-1",
+        )
+        session.add(resume)
+        await session.commit()
+        return candidate, resume
+
+
+@pytest.mark.asyncio
+async def test_process_resume_task_parses_screens_and_embeds(db, recruiter, vacancy, storage, published):
+    candidate, resume = await upload(db, vacancy, recruiter, storage, resume_docx(RESUME_LINES))
+
+    assert await process_resume_task(resume.id) == ResumeStatus.PARSED
+
+    async with db() as session:
+        resume = await session.get(Resume, resume.id)
+        candidate = await session.get(Candidate, candidate.id)
+        result = await session.execute(
+            select(CandidateSkill.skill).where(CandidateSkill.candidate_id == candidate.id)
+        )
+        indexed_skills = set(result.scalars().all())
+        result = await session.execute(select(LLMUsage))
+        usage = result.scalars().all()
+
+    assert resume.status == ResumeStatus.PARSED
+    assert "Backend engineer" in resume.raw_text
+    assert resume.embedding is not None
+    assert resume.llm_deferred_at is None
+    assert resume.error_message is None
+
+    assert candidate.full_name == "Ivan Petrov"
+    assert candidate.email == "ivan.petrov@example.com"
+    assert candidate.experience_years == 7
+    assert {"python", "postgresql", "docker"} <= set(candidate.skills)
+    assert indexed_skills == set(candidate.skills)
+    # Two of the three vacancy skills
+    assert candidate.match_score == 67
+    assert not candidate.match_score_preliminary
+    assert candidate.strengths and candidate.weaknesses
+
+    # AI calls are billed to the vacancy and the uploader
+    assert usage
+    assert {(row.vacancy_id, row.candidate_id, row.user_id) for row in usage} == {
+        (vacancy.id, candidate.id, recruiter.id)
+    }
+
+
+@pytest.mark.asyncio
+async def test_process_resume_task_marks_unreadable_resume_as_error(db, recruiter, vacancy, storage, published):
+    _, resume = await upload(db, vacancy, recruiter, storage, b"not a resume")
+
+    with pytest.raises(ValueError):
+        await process_resume_task(resume.id)
+
+    async with db() as session:
+        resume = await session.get(Resume, resume.id)
+    assert resume.status == ResumeStatus.ERROR
+    assert resume.error_message
+
+
+def sse_events(chunks):
+    """(event, data) pairs of server-sent events; comments are skipped"""
+    events = []
+    for chunk in chunks:
+        lines = chunk.decode().strip().splitlines()
+        if lines and lines[0].startswith("event: "):
+            events.append((lines[0][len("event: "):], json.loads(lines[1][len("data: "):])))
+    return events
+
+
+@pytest.mark.asyncio
+async def test_uploaded_batch_reports_each_stage(db, recruiter, vacancy, storage, published, monkeypatch):
+    background_tasks = BackgroundTasks()
+    async with db() as session:
+        uploaded = await candidates_endpoints.upload_resume(
+            background_tasks,
+            vacancy_id=vacancy.id,
+            file=UploadFile(
+                io.BytesIO(resume_docx(RESUME_LINES)),
+                filename="petrov.docx",
+                headers=Headers({"content-type": DOCX_TYPE}),
+            ),
+            batch="upload-1",
+            session=session,
+            current_user=recruiter,
+        )
+    assert uploaded["batch"] == "upload-1"
+
+    async with db() as session:
+        candidate = await session.get(Candidate, uploaded["candidate_id"])
+        resume = await session.get(Resume, uploaded["resume_id"])
+    assert candidate.uploaded_by == recruiter.id
+    assert (resume.filename, resume.mime_type, resume.upload_batch) == ("petrov.docx", DOCX_TYPE, "upload-1")
+
+    # Without the queue the upload processes in the background of the request
+    await background_tasks()
+
+    assert [(item["candidate_id"], item["status"]) for item in published] == [
+        (candidate.id, "parsing"),
+        (candidate.id, "screening"),
+        (candidate.id, "parsed"),
+    ]
+    assert published[-1]["full_name"] == "Ivan Petrov"
+    assert published[-1]["match_score"] == 67
+
+    summary = await processing_status.summary(recruiter.organization_id, batch="upload-1")
+    assert summary["done"] and summary["total"] == 1
+    assert summary["counts"]["parsed"] == 1
+
+    # Redis unavailable: the stream reads the snapshot and ends once all are final
+    async def no_channel(organization_id):
+        return None
+
+    monkeypatch.setattr(processing_status, "_subscribe", no_channel)
+    chunks = [chunk async for chunk in processing_status.stream(recruiter.organization_id, batch="upload-1")]
+    events = sse_events(chunks)
+    assert [event for event, _ in events] == ["status", "done"]
+    assert events[0][1]["status"] == "parsed"
+    assert events[1][1]["counts"]["parsed"] == 1
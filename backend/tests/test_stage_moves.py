@@ -0,0 +1,154 @@
+"""Stage moves through the API: history, time-in-stage intervals and daily aggregates"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+from sqlmodel import select
+
+from app.api.v1.endpoints.candidates import create_candidate, move_candidate_stage
+from app.models.analytics import SourceDailyStat, StageDailyStat, StageDurationBucket
+from app.models.candidate import Candidate, CandidateCreate
+from app.models.pipeline import CandidateStage, CandidateStageInterval
+from app.services.import_service import ImportService
+from app.services.stage_service import StageService
+
+
+async def stage_stats(session, vacancy_id):
+    result = await session.execute(
+        select(StageDailyStat).where(StageDailyStat.vacancy_id == vacancy_id)
+    )
+    return {row.stage_slug: row for row in result.scalars().all()}
+
+
+@pytest.mark.asyncio
+async def test_new_candidate_enters_initial_stage(db, recruiter, vacancy):
+    async with db() as session:
+        candidate = await create_candidate(
+            CandidateCreate(vacancy_id=vacancy.id, full_name="Anna Smirnova"),
+            session=session,
+            current_user=recruiter,
+        )
+
+        assert candidate.uploaded_by == recruiter.id
+
+        result = await session.execute(select(CandidateStageInterval))
+        intervals = result.scalars().all()
+        assert [(i.candidate_id, i.stage_slug, i.exited_at) for i in intervals] == [
+            (candidate.id, "new", None)
+        ]
+
+        stats = await stage_stats(session, vacancy.id)
+        assert stats["new"].entries == 1
+
+        result = await session.execute(select(SourceDailyStat))
+        assert [row.applications for row in result.scalars().all()] == [1]
+
+
+@pytest.mark.asyncio
+async def test_move_updates_history_intervals_and_stage_stats(db, recruiter, vacancy):
+    async with db() as session:
+        candidate = await create_candidate(
+            CandidateCreate(vacancy_id=vacancy.id, full_name="Anna Smirnova"),
+            session=session,
+            current_user=recruiter,
+        )
+        # Two hours in "new"
+        await session.execute(
+            update(CandidateStageInterval)
+            .where(CandidateStageInterval.candidate_id == candidate.id)
+            .values(entered_at=datetime.utcnow() - timedelta(hours=2))
+        )
+        await session.commit()
+
+        response = await move_candidate_stage(
+            stage="screening",
+            notes="Strong Python background",
+            candidate=candidate,
+            session=session,
+            current_user=recruiter,
+        )
+        assert response["stage"] == "screening"
+
+    async with db() as session:
+        result = await session.execute(
+            select(CandidateStage.stage_slug, CandidateStage.moved_by)
+            .where(CandidateStage.candidate_id == candidate.id)
+            .order_by(CandidateStage.created_at)
+        )
+        assert result.all() == [("new", recruiter.id), ("screening", recruiter.id)]
+
+        result = await session.execute(
+            select(CandidateStageInterval)
+            .where(CandidateStageInterval.candidate_id == candidate.id)
+            .order_by(CandidateStageInterval.entered_at)
+        )
+        new, screening = result.scalars().all()
+        assert new.stage_slug == "new" and new.exited_at is not None
+        assert screening.stage_slug == "screening" and screening.exited_at is None
+
+        stats = await stage_stats(session, vacancy.id)
+        assert (stats["new"].entries, stats["new"].exits) == (1, 1)
+        assert stats["new"].time_in_stage_seconds == pytest.approx(2 * 3600, abs=60)
+        assert (stats["screening"].entries, stats["screening"].exits) == (1, 0)
+
+        result = await session.execute(
+            select(StageDurationBucket.stage_slug, StageDurationBucket.count)
+        )
+        assert result.all() == [("new", 1)]
+
+
+@pytest.mark.asyncio
+async def test_candidate_left_in_new_is_stale(db, recruiter, vacancy):
+    async with db() as session:
+        candidate = await create_candidate(
+            CandidateCreate(vacancy_id=vacancy.id, full_name="Anna Smirnova"),
+            session=session,
+            current_user=recruiter,
+        )
+        await session.execute(
+            update(CandidateStageInterval)
+            .where(CandidateStageInterval.candidate_id == candidate.id)
+            .values(entered_at=datetime.utcnow() - timedelta(days=30))
+        )
+        await session.commit()
+
+        stale = await StageService.stale_candidates(
+            session, recruiter.organization_id, "new", older_than_days=7
+        )
+        assert [row["candidate_id"] for row in stale] == [candidate.id]
+
+        # Another organization's SLA view does not see it
+        assert await StageService.stale_candidates(
+            session, recruiter.organization_id + 1, "new", older_than_days=7
+        ) == []
+
+
+@pytest.mark.asyncio
+async def test_imported_candidate_without_stage_enters_initial_stage(db, recruiter, vacancy):
+    rows = [
+        {"external_id": "17", "vacancy_id": vacancy.id, "full_name": "Anna Smirnova"},
+        {"external_id": "18", "vacancy_id": vacancy.id, "full_name": "Oleg Ivanov", "stage_slug": "interview"},
+    ]
+    async with db() as session:
+        await ImportService.import_candidates(
+            session, rows, recruiter.organization_id, "greenhouse", moved_by=recruiter.id
+        )
+        await session.commit()
+        await StageService.rebuild_intervals(session, vacancy.id)
+        await session.commit()
+
+        result = await session.execute(
+            select(Candidate.external_id, Candidate.uploaded_by, CandidateStageInterval.stage_slug)
+            .join(CandidateStageInterval, CandidateStageInterval.candidate_id == Candidate.id)
+            .where(CandidateStageInterval.exited_at.is_(None))
+            .order_by(Candidate.external_id)
+        )
+        assert result.all() == [("17", recruiter.id, "new"), ("18", recruiter.id, "interview")]
+
+        # Re-importing does not add a second initial entry
+        await ImportService.import_candidates(
+            session, rows[:1], recruiter.organization_id, "greenhouse", moved_by=recruiter.id
+        )
+        await session.commit()
+        result = await session.execute(select(CandidateStage.stage_slug))
+        assert sorted(result.scalars().all()) == ["interview", "new"]
@@ -0,0 +1,138 @@
+"""How the queue worker settles jobs: busy tenants, retries and giving up"""
+from contextlib import asynccontextmanager
+from typing import List, Tuple
+
+import pytest
+
+from app.core.config import settings
+from app.core.quotas import QuotaExceededError
+from app.core.task_queue import Job, Lane
+from app.models.candidate import Candidate
+from app.models.resume import Resume, ResumeStatus
+from app.tasks import worker
+from app.tasks.resume_tasks import fail_unfinished_resumes
+
+
+class FakeQueue:
+    """Records how jobs are settled instead of talking to Redis"""
+
+    def __init__(self):
+        self.acked: List[Job] = []
+        self.requeued: List[Tuple[Job, bool]] = []
+
+    async def ack(self, job: Job) -> None:
+        self.acked.append(job)
+
+    async def requeue(self, job: Job, failed: bool = False) -> bool:
+        self.requeued.append((job, failed))
+        return True
+
+    async def touch(self, job: Job) -> bool:
+        return True
+
+
+@pytest.fixture
+def queue(monkeypatch) -> FakeQueue:
+    queue = FakeQueue()
+    monkeypatch.setattr(worker, "task_queue", queue)
+    return queue
+
+
+@pytest.fixture
+def runs(monkeypatch) -> List[List[int]]:
+    """Resume IDs of each process_resume job run; the task fails"""
+    calls: List[List[int]] = []
+
+    async def failing_task(resume_ids):
+        calls.append(resume_ids)
+        raise RuntimeError("database went away")
+
+    monkeypatch.setitem(worker.JOB_TASKS, "process_resume", failing_task)
+    return calls
+
+
+def job(resume_ids, attempts=0) -> Job:
+    return Job("process_resume", resume_ids, Lane.BULK, organization_id=1, vacancy_id=1, attempts=attempts)
+
+
+async def uploaded_resume(db, vacancy, user) -> Resume:
+    async with db() as session:
+        candidate = Candidate(
+            full_name="Parsing...",
+            organization_id=vacancy.organization_id,
+            vacancy_id=vacancy.id,
+            uploaded_by=user.id,
+        )
+        session.add(candidate)
+        await session.flush()
+        resume = Resume(
+            candidate_id=candidate.id,
+            filename="resume.pdf",
+            file_path=f"resumes/{candidate.id}/resume.pdf",
+            mime_type="application/pdf",
+            file_size=1,
+        )
+        session.add(resume)
+        await session.commit()
+        return resume
+
+
+@pytest.mark.asyncio
+async def test_busy_organization_job_goes_back_without_running(queue, runs, monkeypatch):
+    class BusyQuotas:
+        @asynccontextmanager
+        async def task_slot(self, organization_id, wait=True):
+            assert not wait
+            raise QuotaExceededError(organization_id, "concurrent tasks", 0.5)
+            yield
+
+    monkeypatch.setattr(worker, "tenant_quotas", BusyQuotas())
+    busy = job([1])
+
+    assert not await worker._handle(busy)
+    assert runs == []
+    assert queue.requeued == [(busy, False)]
+    assert queue.acked == []
+
+
+@pytest.mark.asyncio
+async def test_failed_job_is_requeued_not_acked(queue, runs):
+    failed = job([1])
+
+    assert await worker._handle(failed)
+    assert runs == [[1]]
+    assert queue.requeued == [(failed, True)]
+    assert queue.acked == []
+
+
+@pytest.mark.asyncio
+async def test_last_failed_attempt_marks_resumes_as_errors(db, recruiter, vacancy, queue, runs, published):
+    resume = await uploaded_resume(db, vacancy, recruiter)
+    last = job([resume.id], attempts=settings.TASK_QUEUE_MAX_ATTEMPTS - 1)
+
+    assert await worker._handle(last)
+    assert queue.requeued == []
+    assert queue.acked == [last]
+
+    async with db() as session:
+        resume = await session.get(Resume, resume.id)
+    assert resume.status == ResumeStatus.ERROR
+    assert resume.error_message
+    # Status streams get the final status
+    assert [item["status"] for item in published] == ["error"]
+
+
+@pytest.mark.asyncio
+async def test_resume_marked_as_error_completes_the_job(db, recruiter, vacancy, queue, published, monkeypatch):
+    resume = await uploaded_resume(db, vacancy, recruiter)
+
+    async def unreadable(resume_id):
+        await fail_unfinished_resumes([resume_id], "Unsupported file")
+        raise ValueError("Unsupported file")
+
+    monkeypatch.setattr(worker, "process_resume_task", unreadable)
+    done = job([resume.id])
+
+    assert await worker._handle(done)
+    assert queue.requeued == []
+    assert queue.acked == [done]